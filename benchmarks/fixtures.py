@@ -0,0 +1,75 @@
+"""Synthesize large API responses from the fixtures in tests/xml/.
+
+The rows of each rowset directly under <result> are used as templates,
+and repeated (nested rowsets and all) until the response holds the
+requested number of rows. Any attribute named as a rowset's key is
+renumbered so that every row stays unique.
+"""
+
+import copy
+import itertools
+import os
+from xml.etree import ElementTree
+
+XML_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       'tests', 'xml')
+
+_ENVELOPE = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+             '<eveapi version="2">'
+             '<currentTime>2013-01-01 00:00:00</currentTime>'
+             '%s'
+             '<cachedUntil>2013-01-01 01:00:00</cachedUntil>'
+             '</eveapi>')
+
+
+def load_result(xml_path):
+    """Parse a fixture from tests/xml/, returning its <result> element."""
+    return ElementTree.parse(os.path.join(XML_DIR, xml_path)).getroot()
+
+
+def count_rows(elem):
+    """Count the row elements anywhere beneath elem."""
+    return sum(1 for _ in elem.iter('row'))
+
+
+def _renumber(row, key, ids):
+    if key:
+        row.set(key, str(next(ids)))
+    for rowset in row.findall('rowset'):
+        for child in rowset.findall('row'):
+            _renumber(child, rowset.get('key'), ids)
+
+
+def scale_result(result, rows):
+    """Return a copy of a <result> element with about 'rows' rows.
+
+    The count includes nested rows, so a 500000 row asset tree has
+    500000 items in total rather than 500000 top-level items.
+    """
+    result = copy.deepcopy(result)
+    rowsets = [rs for rs in result.findall('rowset') if rs.find('row') is not None]
+    if not rowsets:
+        return result
+
+    ids = itertools.count(1000000000)
+    per_rowset = max(1, rows // len(rowsets))
+    for rowset in rowsets:
+        templates = rowset.findall('row')
+        for row in templates:
+            rowset.remove(row)
+
+        total = 0
+        for template in itertools.cycle(templates):
+            if total >= per_rowset:
+                break
+            row = copy.deepcopy(template)
+            _renumber(row, rowset.get('key'), ids)
+            rowset.append(row)
+            total += count_rows(template)
+    return result
+
+
+def make_response(xml_path, rows):
+    """Build a full API response body (as bytes) with about 'rows' rows."""
+    result = scale_result(load_result(xml_path), rows)
+    return (_ENVELOPE % ElementTree.tostring(result).decode('utf-8')).encode('utf-8')
@@ -0,0 +1,298 @@
+"""Measure parsing throughput and cache latency, entirely offline.
+
+Responses are synthesized from the fixtures in tests/xml/ (see
+benchmarks/fixtures.py) and served by an API subclass which never
+touches the network, so results only reflect evelink's own work.
+
+Usage:
+
+    python -m benchmarks.run [--scale 0.1] [--repeat 3] [--only wallet]
+
+For each parser and wrapped API method this reports the number of rows
+handled, the best wall time over --repeat runs, rows/sec, and the peak
+memory allocated during one extra run (via tracemalloc, where
+available). Cache benchmarks report the mean latency of put(), get()
+hits and get() misses.
+"""
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from xml.etree import ElementTree
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from evelink import api
+from evelink.cache.filecache import FileCache
+from evelink.cache.lru import LRUCache
+from evelink.cache.shelf import ShelveCache
+from evelink.cache.sqlite import SqliteCache
+from evelink.cache.tiered import TieredCache
+from evelink.char import Char
+from evelink.corp import Corp
+from evelink.eve import EVE
+from evelink.map import Map
+from evelink.parsing.assets import parse_assets
+from evelink.parsing.contact_list import parse_contact_list
+from evelink.parsing.contract_bids import parse_contract_bids
+from evelink.parsing.contract_items import parse_contract_items
+from evelink.parsing.contracts import parse_contracts
+from evelink.parsing.industry_jobs import parse_industry_jobs
+from evelink.parsing.kills import parse_kills
+from evelink.parsing.orders import parse_market_orders
+from evelink.parsing.planetary_interactions import (parse_planetary_colonies,
+    parse_planetary_links, parse_planetary_pins, parse_planetary_routes)
+from evelink.parsing.wallet_journal import parse_wallet_journal, parse_wallet_journal_records
+from evelink.parsing.wallet_transactions import parse_wallet_transactions
+
+from benchmarks import fixtures
+
+_timer = getattr(time, 'perf_counter', time.time)
+
+# (name, function, fixture, rows at --scale 1)
+PARSERS = [
+    ('parse_assets', parse_assets, 'corp/assets.xml', 500000),
+    ('parse_contact_list', parse_contact_list, 'char/contact_list.xml', 100000),
+    ('parse_contract_bids', parse_contract_bids, 'char/contract_bids.xml', 100000),
+    ('parse_contract_items', parse_contract_items, 'char/contract_items.xml', 100000),
+    ('parse_contracts', parse_contracts, 'corp/contracts.xml', 100000),
+    ('parse_industry_jobs', parse_industry_jobs, 'char/industry_jobs.xml', 100000),
+    ('parse_kills', parse_kills, 'char/kills.xml', 100000),
+    ('parse_market_orders', parse_market_orders, 'char/orders.xml', 100000),
+    ('parse_planetary_colonies', parse_planetary_colonies, 'char/planetary_colonies.xml', 10000),
+    ('parse_planetary_links', parse_planetary_links, 'char/planetary_links.xml', 10000),
+    ('parse_planetary_pins', parse_planetary_pins, 'char/planetary_pins.xml', 10000),
+    ('parse_planetary_routes', parse_planetary_routes, 'char/planetary_routes.xml', 10000),
+    ('parse_wallet_journal', parse_wallet_journal, 'char/wallet_journal.xml', 100000),
+    ('parse_wallet_journal_records', parse_wallet_journal_records, 'char/wallet_journal.xml', 100000),
+    ('parse_wallet_transactions', parse_wallet_transactions, 'char/wallet_transactions.xml', 100000),
+]
+
+
+def _consume(iterable):
+    count = 0
+    for _ in iterable:
+        count += 1
+    return count
+
+
+# (name, fixture, rows at --scale 1, function of an API object)
+METHODS = [
+    ('Char.assets', 'corp/assets.xml', 500000,
+        lambda a: Char(1, a).assets()),
+    ('Char.stream_assets', 'corp/assets.xml', 500000,
+        lambda a: _consume(Char(1, a).stream_assets())),
+    ('Char.contacts', 'char/contact_list.xml', 100000,
+        lambda a: Char(1, a).contacts()),
+    ('Char.contracts', 'corp/contracts.xml', 100000,
+        lambda a: Char(1, a).contracts()),
+    ('Char.industry_jobs', 'char/industry_jobs.xml', 100000,
+        lambda a: Char(1, a).industry_jobs()),
+    ('Char.kills', 'char/kills.xml', 100000,
+        lambda a: Char(1, a).kills()),
+    ('Char.stream_kills', 'char/kills.xml', 100000,
+        lambda a: _consume(Char(1, a).stream_kills())),
+    ('Char.orders', 'char/orders.xml', 100000,
+        lambda a: Char(1, a).orders()),
+    ('Char.wallet_journal', 'char/wallet_journal.xml', 100000,
+        lambda a: Char(1, a).wallet_journal()),
+    ('Char.wallet_journal(records)', 'char/wallet_journal.xml', 100000,
+        lambda a: Char(1, a).wallet_journal(result_mode='records')),
+    ('Char.stream_wallet_journal', 'char/wallet_journal.xml', 100000,
+        lambda a: _consume(Char(1, a).stream_wallet_journal())),
+    ('Char.wallet_transactions', 'char/wallet_transactions.xml', 100000,
+        lambda a: Char(1, a).wallet_transactions()),
+    ('Corp.assets', 'corp/assets.xml', 500000,
+        lambda a: Corp(a).assets()),
+    ('Corp.members', 'corp/members.xml', 100000,
+        lambda a: Corp(a).members()),
+    ('Corp.stream_members', 'corp/members.xml', 100000,
+        lambda a: _consume(Corp(a).stream_members())),
+    ('Corp.wallet_journal', 'corp/wallet_journal.xml', 100000,
+        lambda a: Corp(a).wallet_journal()),
+    ('EVE.alliances', 'eve/alliances.xml', 100000,
+        lambda a: EVE(a).alliances()),
+    ('EVE.conquerable_stations', 'eve/conquerable_stations.xml', 100000,
+        lambda a: EVE(a).conquerable_stations()),
+    ('EVE.reference_types', 'eve/reference_types.xml', 100000,
+        lambda a: EVE(a).reference_types()),
+    ('Map.jumps_by_system', 'map/jumps_by_system.xml', 100000,
+        lambda a: Map(a).jumps_by_system()),
+    ('Map.kills_by_system', 'map/kills_by_system.xml', 100000,
+        lambda a: Map(a).kills_by_system()),
+    ('Map.sov_by_system', 'map/sov_by_system.xml', 100000,
+        lambda a: Map(a).sov_by_system()),
+]
+
+
+class NullCache(api.APICache):
+    """A cache which never holds anything, so every call does full work."""
+
+    def put(self, key, value, duration):
+        pass
+
+
+class FixtureAPI(api.API):
+    """An API which answers every request with a canned response body."""
+
+    def __init__(self, response):
+        super(FixtureAPI, self).__init__(cache=NullCache())
+        self.response = response
+
+    def send_request(self, full_path, params):
+        return self.response, None
+
+
+def measure(func, repeat, trace_memory=True):
+    """Return (best wall time, peak bytes allocated or None) for func()."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = _timer()
+        func()
+        elapsed = _timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if trace_memory and tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def _selected(name, only):
+    return not only or any(o.lower() in name.lower() for o in only)
+
+
+def bench_parsers(scale, repeat, only=None, trace_memory=True):
+    for name, parser, fixture, rows in PARSERS:
+        if not _selected(name, only):
+            continue
+        body = fixtures.make_response(fixture, max(1, int(rows * scale)))
+        result = ElementTree.fromstring(body).find('result')
+        count = fixtures.count_rows(result)
+        elapsed, peak = measure(lambda: parser(result), repeat, trace_memory)
+        yield name, count, elapsed, peak
+
+
+def bench_methods(scale, repeat, only=None, trace_memory=True):
+    for name, fixture, rows, call in METHODS:
+        if not _selected(name, only):
+            continue
+        body = fixtures.make_response(fixture, max(1, int(rows * scale)))
+        count = fixtures.count_rows(ElementTree.fromstring(body))
+        api_obj = FixtureAPI(body)
+        elapsed, peak = measure(lambda: call(api_obj), repeat, trace_memory)
+        yield name, count, elapsed, peak
+
+
+def _close(cache):
+    close = getattr(cache, 'close', None)
+    if close is not None:
+        close()
+
+
+def bench_caches(ops, only=None):
+    """Yield (name, put, hit, miss) mean latencies in seconds."""
+    value = fixtures.make_response('char/wallet_journal.xml', 50)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        caches = [
+            ('APICache', lambda: api.APICache()),
+            ('LRUCache', lambda: LRUCache()),
+            ('SqliteCache', lambda: SqliteCache(os.path.join(tmpdir, 'sqlite'))),
+            ('ShelveCache', lambda: ShelveCache(os.path.join(tmpdir, 'shelve'))),
+            ('FileCache', lambda: FileCache(os.path.join(tmpdir, 'files'))),
+            ('TieredCache(SqliteCache)',
+                lambda: TieredCache(SqliteCache(os.path.join(tmpdir, 'tiered')))),
+        ]
+        keys = ['key-%d' % i for i in range(ops)]
+        misses = ['missing-%d' % i for i in range(ops)]
+        for name, make_cache in caches:
+            if not _selected(name, only):
+                continue
+            cache = make_cache()
+            try:
+                start = _timer()
+                for key in keys:
+                    cache.put(key, value, 3600)
+                put = (_timer() - start) / ops
+
+                start = _timer()
+                for key in keys:
+                    cache.get(key)
+                hit = (_timer() - start) / ops
+
+                start = _timer()
+                for key in misses:
+                    cache.get(key)
+                miss = (_timer() - start) / ops
+            finally:
+                _close(cache)
+            yield name, put, hit, miss
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def _format_row(name, count, elapsed, peak):
+    rate = count / elapsed if elapsed else float('inf')
+    peak = '%.1f' % (peak / 1048576.0) if peak is not None else 'n/a'
+    return '%-32s %10d %10.3f %12.0f %10s' % (name, count, elapsed, rate, peak)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplier for the number of synthesized rows')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed runs per benchmark; the best is reported')
+    parser.add_argument('--cache-ops', type=int, default=2000,
+                        help='operations per cache benchmark')
+    parser.add_argument('--only', action='append', default=[],
+                        help='only run benchmarks whose name contains this (repeatable)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the tracemalloc run')
+    parser.add_argument('--json', metavar='PATH',
+                        help='also write the results to PATH as JSON')
+    args = parser.parse_args(argv)
+
+    trace_memory = not args.no_memory
+    report = {'parsers': [], 'methods': [], 'caches': []}
+    header = '%-32s %10s %10s %12s %10s' % ('benchmark', 'rows', 'best s', 'rows/s', 'peak MiB')
+
+    for section, bench in (('parsers', bench_parsers), ('methods', bench_methods)):
+        print(header)
+        for name, count, elapsed, peak in bench(args.scale, args.repeat, args.only, trace_memory):
+            print(_format_row(name, count, elapsed, peak))
+            sys.stdout.flush()
+            report[section].append({'name': name, 'rows': count,
+                                    'seconds': elapsed, 'peak_bytes': peak})
+        print('')
+
+    print('%-32s %10s %10s %10s' % ('cache', 'put us', 'hit us', 'miss us'))
+    for name, put, hit, miss in bench_caches(args.cache_ops, args.only):
+        print('%-32s %10.1f %10.1f %10.1f' % (name, put * 1e6, hit * 1e6, miss * 1e6))
+        report['caches'].append({'name': name, 'put': put, 'hit': hit, 'miss': miss})
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
+
+# vim: set ts=4 sts=4 sw=4 et:
@@ -4,11 +4,15 @@ import logging
 
 from evelink import account
 from evelink import api
+from evelink import batch
 from evelink import char
 from evelink import constants
 from evelink import corp
 from evelink import eve
+from evelink import hooks
 from evelink import map
+from evelink import metrics
+from evelink import prefetch
 from evelink import server
 
 __version__ = "0.7.0"
@@ -28,11 +32,15 @@ api._user_agent = 'evelink v%s' % __version__
 __all__ = [
   "account",
   "api",
+  "batch",
   "char",
   "constants",
   "corp",
   "eve",
+  "hooks",
   "map",
+  "metrics",
   "parsing",
+  "prefetch",
   "server",
 ]
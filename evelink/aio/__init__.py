@@ -0,0 +1,30 @@
+"""asyncio support for EVELink (Python 3.5+).
+
+Each wrapper class has a coroutine '<name>_async' twin for every
+method of its evelink counterpart, e.g.:
+
+    api = AsyncAPI(api_key=(12345, 'vcode'))
+    result = await char.Char(1234, api).assets_async()
+"""
+
+from evelink.aio.api import AiohttpTransport
+from evelink.aio.api import AsyncAPI
+from evelink.aio.api import ExecutorTransport
+from evelink.aio import account
+from evelink.aio import char
+from evelink.aio import corp
+from evelink.aio import eve
+from evelink.aio import map
+from evelink.aio import server
+
+__all__ = [
+  "AiohttpTransport",
+  "AsyncAPI",
+  "ExecutorTransport",
+  "account",
+  "char",
+  "corp",
+  "eve",
+  "map",
+  "server",
+]
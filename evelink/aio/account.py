@@ -0,0 +1,6 @@
+from evelink import account
+from evelink.aio.api import auto_async
+
+@auto_async
+class Account(account.Account):
+    __doc__ = account.Account.__doc__
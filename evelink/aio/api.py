@@ -0,0 +1,169 @@
+import asyncio
+import functools
+import logging
+
+from evelink import api
+
+_log = logging.getLogger('evelink.aio.api')
+
+try:
+    import aiohttp
+    _has_aiohttp = True
+except ImportError:
+    _has_aiohttp = False
+
+
+class ExecutorTransport(object):
+    """Transport running the blocking HTTP code of api.API in an executor.
+
+    This needs nothing beyond the standard library (and `requests`, if
+    it is available), but every in-flight request occupies a thread of
+    the executor; size it for the number of concurrent requests wanted.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+
+    def send(self, api_obj, full_path, params):
+        """Return an awaitable resolving to a (response body, robj) tuple."""
+        loop = asyncio.get_event_loop()
+        return loop.run_in_executor(
+            self.executor, api_obj.send_request, full_path, params)
+
+
+class AiohttpTransport(object):
+    """Transport issuing requests through an aiohttp ClientSession.
+
+    Requires the `aiohttp` library. The session is created lazily on
+    first use, with at most 'limit' simultaneous connections.
+    """
+
+    def __init__(self, session=None, limit=100):
+        if not _has_aiohttp:
+            raise ImportError("AiohttpTransport requires `aiohttp`")
+        self.session = session
+        self.limit = limit
+
+    async def send(self, api_obj, full_path, params):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers={'User-Agent': api_obj.user_agent},
+                connector=aiohttp.TCPConnector(limit=self.limit),
+            )
+
+        timeout = aiohttp.ClientTimeout(total=api.http_request_timeout)
+        if params:
+            _log.debug("POSTing request")
+            robj = await self.session.post(full_path, data=params, timeout=timeout)
+        else:
+            _log.debug("GETting request")
+            robj = await self.session.get(full_path, timeout=timeout)
+        _log.debug("Response status code: %s" % robj.status)
+        try:
+            return await robj.read(), robj
+        finally:
+            robj.release()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncAPI(api.API):
+    """Subclass of api.API adding an asyncio based get_async method.
+
+    The actual HTTP requests are delegated to 'transport', an object
+    with a send(api, full_path, params) method returning an awaitable
+    for a (response body, robj) tuple. Defaults to ExecutorTransport.
+
+    Note that the cache is still accessed synchronously.
+    """
+
+    def __init__(self, base_url="api.eveonline.com", cache=None, api_key=None,
+                 user_agent=None, transport=None, metrics=None, hooks=None, error_ttl=None,
+                 result_mode='dict'):
+        super(AsyncAPI, self).__init__(base_url=base_url, cache=cache,
+                api_key=api_key, user_agent=user_agent, metrics=metrics, hooks=hooks,
+                error_ttl=error_ttl, result_mode=result_mode)
+        self.transport = transport or ExecutorTransport()
+
+    async def get_async(self, path, params=None):
+        """Asynchronously request a specific path from the EVE API.
+
+        See api.API.get.
+        """
+        _log.debug("Calling %s with params=%r", path, params)
+        params = self._prepare_params(params)
+
+        key = self._cache_key(path, params)
+        if self.hooks:
+            self._call_hooks('before_request', path, key)
+        fetch_start = api._timer()
+        response = self._cache_get(path, key, params)
+        cached = response is not None
+        robj = None
+
+        if not cached:
+            start = api._timer()
+            try:
+                response, robj = await self.transport.send(
+                    self, self._full_path(path), params)
+            finally:
+                if self.metrics is not None:
+                    self.metrics.observe('http_request_seconds', api._timer() - start, path=path)
+                    self.metrics.inc('http_requests_total', path=path)
+        else:
+            _log.debug("Cache hit, returning cached payload")
+        self._fetched(path, key, fetch_start, cached)
+
+        return self._process_response(path, key, response, robj, cached)
+
+    def maybe_raise_http_error(self, response):
+        # Both requests and aiohttp responses know how to do this.
+        raise_for_status = getattr(response, 'raise_for_status', None)
+        if raise_for_status is not None:
+            raise_for_status()
+        else:
+            super(AsyncAPI, self).maybe_raise_http_error(response)
+
+
+def auto_async_api(func):
+    """A decorator to automatically provide an AsyncAPI instance."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        defaultargs, defaultkwargs = api.get_args_and_defaults(func)
+        mapped_args = api.map_func_args(args, kwargs, defaultargs, defaultkwargs)
+        if mapped_args.get('api') is None:
+            kwargs['api'] = AsyncAPI()
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def _make_async(method):
+    specs = method._request_specs
+
+    async def _async(self, *args, **kw):
+        result_mode = kw.pop('result_mode', None)
+        params = api.request_params(self, specs, args, kw)
+        kw['api_result'] = await self.api.get_async(specs['path'], params=params)
+        return method(self, *args, result_mode=result_mode, **kw)
+    return _async
+
+
+def auto_async(cls):
+    """Class decorator which adds a coroutine version of any method with
+    a '_request_specs' attribute (metadata added by api.auto_call).
+    """
+    for method_name in dir(cls):
+        method = getattr(cls, method_name)
+        if not hasattr(method, '_request_specs'):
+            continue
+
+        async_method = _make_async(method)
+        async_method.__doc__ = """Asynchronous version of %s.""" % method_name
+        async_method.__name__ = '%s_async' % method_name
+        setattr(cls, async_method.__name__, async_method)
+
+    return cls
@@ -0,0 +1,16 @@
+from evelink import char, api
+from evelink.aio.api import auto_async
+
+@auto_async
+class Char(char.Char):
+    __doc__ = char.Char.__doc__
+
+    async def wallet_balance_async(self):
+        """Asynchronous version of wallet_balance."""
+        api_result = await self.wallet_info_async()
+        return api.APIResult(api_result.result['balance'], api_result.timestamp, api_result.expires)
+
+    async def event_attendees_async(self, event_id):
+        """Asynchronous version of event_attendees."""
+        api_result = await self.calendar_attendees_async([event_id])
+        return api.APIResult(api_result.result[int(event_id)], api_result.timestamp, api_result.expires)
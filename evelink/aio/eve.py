@@ -0,0 +1,30 @@
+from evelink import eve, api
+from evelink.aio.api import auto_async, auto_async_api
+
+@auto_async
+class EVE(eve.EVE):
+    __doc__ = eve.EVE.__doc__
+
+    @auto_async_api
+    def __init__(self, api=None):
+        self.api = api
+
+    async def character_name_from_id_async(self, char_id):
+        """Asynchronous version of character_name_from_id."""
+        resp = await self.character_names_from_ids_async([char_id])
+        return api.APIResult(resp.result.get(int(char_id)), resp.timestamp, resp.expires)
+
+    async def character_id_from_name_async(self, name):
+        """Asynchronous version of character_id_from_name."""
+        resp = await self.character_ids_from_names_async([name])
+        return api.APIResult(list(resp.result.values())[0], resp.timestamp, resp.expires)
+
+    async def affiliations_for_character_async(self, char_id):
+        """Asynchronous version of affiliations_for_character."""
+        resp = await self.affiliations_for_characters_async([char_id])
+        return api.APIResult(resp.result[char_id], resp.timestamp, resp.expires)
+
+    async def type_name_from_id_async(self, type_id):
+        """Asynchronous version of type_name_from_id."""
+        resp = await self.type_names_from_ids_async([type_id])
+        return api.APIResult(resp.result.get(int(type_id)), resp.timestamp, resp.expires)
@@ -0,0 +1,11 @@
+from evelink import map as map_
+from evelink.aio.api import auto_async, auto_async_api
+
+
+@auto_async
+class Map(map_.Map):
+    __doc__ = map_.Map.__doc__
+
+    @auto_async_api
+    def __init__(self, api=None):
+        self.api = api
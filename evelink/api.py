@@ -1,19 +1,27 @@
 import calendar
 import collections
+import datetime
 import functools
 import zlib
 import inspect
 import logging
+import os
 import re
+import threading
 import time
 import hashlib
 from xml.etree import ElementTree
 
+from evelink.hooks import Hooks
+from evelink.metrics import Metrics
 from evelink.thirdparty import six
+from evelink.thirdparty.six.moves import queue
 from evelink.thirdparty.six.moves import urllib
 
 _log = logging.getLogger('evelink.api')
 
+_timer = getattr(time, 'perf_counter', time.time)
+
 # Python 2.6's ElementTree raises xml.parsers.expat.ExpatError instead
 # of ElementTree.ParseError
 _xml_error = getattr(ElementTree, 'ParseError', None)
@@ -25,6 +33,9 @@ if _xml_error is None:
 # From zlib.h header file, not documented in Python.
 ZLIB_DECODE_AUTO = 32 + zlib.MAX_WBITS
 
+# Ways in which wrapped methods can return rows; see API's result_mode.
+RESULT_MODES = ('dict', 'records', 'columns')
+
 # Set by evelink/__init__.py to the evelink version. Use the user_agent
 # parameter when constructing an API object if you want to add additional
 # information to the user agent string. (Technically, you *can* override
@@ -57,13 +68,48 @@ def decompress(s):
     return zlib.decompress(s, ZLIB_DECODE_AUTO)
 
 
+_TS_RE = re.compile(r'(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)\Z')
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# Recently parsed timestamps; responses tend to repeat the same few
+# values (e.g. dataTime, or many rows sharing a date) over and over.
+_ts_cache = {}
+_TS_CACHE_SIZE = 4096
+
+
+def _parse_ts(v):
+    match = _TS_RE.match(v)
+    if match is not None:
+        year, month, day, hour, minute, second = [int(g) for g in match.groups()]
+        if hour < 24 and minute < 60 and second < 62:
+            try:
+                days = datetime.date(year, month, day).toordinal() - _EPOCH_ORDINAL
+            except ValueError:
+                pass
+            else:
+                return days * 86400 + hour * 3600 + minute * 60 + second
+    # Anything unusual gets the slow, but more lenient (or properly
+    # failing) treatment.
+    return calendar.timegm(time.strptime(v, "%Y-%m-%d %H:%M:%S"))
+
+
 def parse_ts(v):
     """Parse a timestamp from EVE API XML into a unix-ish timestamp."""
+    try:
+        return _ts_cache[v]
+    except KeyError:
+        pass
+
     if v == '':
         return None
-    ts = calendar.timegm(time.strptime(v, "%Y-%m-%d %H:%M:%S"))
+    ts = _parse_ts(v)
     # Deal with EVE's nonexistent 0001-01-01 00:00:00 timestamp
-    return ts if ts > 0 else None
+    ts = ts if ts > 0 else None
+
+    if len(_ts_cache) >= _TS_CACHE_SIZE:
+        _ts_cache.clear()
+    _ts_cache[v] = ts
+    return ts
 
 
 def get_named_value(elem, field):
@@ -201,6 +247,103 @@ class APICache(object):
         expiration = time.time() + duration
         self.cache[key] = (value, expiration)
 
+    def get_entry(self, key):
+        """Return a (value, expiration) tuple for 'key' if it is cached.
+
+        expiration is the time the entry expires, as a unix timestamp, or
+        None if the cache can't tell. Subclasses which store their
+        entries elsewhere than in self.cache should override this.
+        """
+        if type(self).get is not APICache.get:
+            # Entries are stored elsewhere, so their expiration is unknown.
+            value = self.get(key)
+            if value is None:
+                return None
+            return value, None
+        entry = self.cache.get(key)
+        if not entry:
+            return None
+        if entry[1] < time.time():
+            del self.cache[key]
+            return None
+        return entry
+
+
+def _reports_expiration(cache):
+    """Whether cache.get_entry can tell when entries expire."""
+    cache_type = type(cache)
+    return cache_type.get_entry is not APICache.get_entry or cache_type.get is APICache.get
+
+
+class _Flight(object):
+    """An HTTP request in progress, which identical requests can wait on."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.response = None
+        self.robj = None
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self):
+        """Wait for the request to complete, returning (response, robj)."""
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response, self.robj
+
+
+# Requests currently being made to the EVE API, keyed by (base_url, cache key).
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _join_flight(flight_key, cache):
+    """Return (flight, leader) for the given request.
+
+    If no identical request is in flight, a new one is registered and
+    'leader' is True; the caller must then make the request and call
+    _finish_flight when done.
+    """
+    with _in_flight_lock:
+        flight = _in_flight.get(flight_key)
+        if flight is not None:
+            return flight, False
+        flight = _in_flight[flight_key] = _Flight(cache)
+        return flight, True
+
+
+def _finish_flight(flight_key, flight):
+    with _in_flight_lock:
+        del _in_flight[flight_key]
+    flight._done.set()
+
+
+# Stale responses are refreshed one at a time, by a single background
+# thread started when first needed. As each key is only queued once (see
+# _join_flight), the queue holds at most one refresh per stale key.
+_refresh_queue = queue.Queue()
+_refresh_thread = None
+_refresh_thread_lock = threading.Lock()
+
+
+def _refresh_worker():
+    while True:
+        refresh = _refresh_queue.get()
+        refresh()
+
+
+def _queue_refresh(refresh):
+    """Call 'refresh' in the background refresh thread."""
+    global _refresh_thread
+    with _refresh_thread_lock:
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=_refresh_worker,
+                                               name='evelink-refresh')
+            _refresh_thread.daemon = True
+            _refresh_thread.start()
+    _refresh_queue.put(refresh)
+
 
 APIResult = collections.namedtuple("APIResult", [
         "result",
@@ -212,19 +355,79 @@ APIResult = collections.namedtuple("APIResult", [
 class API(object):
     """A wrapper around the EVE API."""
 
-    def __init__(self, base_url="api.eveonline.com", cache=None, api_key=None, user_agent=None):
+    def __init__(self, base_url="api.eveonline.com", cache=None, api_key=None, user_agent=None,
+                 result_cache=None, metrics=None, hooks=None, stale_while_revalidate=0,
+                 error_ttl=None, result_mode='dict'):
+        """Create an API object.
+
+        result_cache:
+            Optional APICache instance (which may be the same as 'cache')
+            used by the wrapped access layer to cache the final, parsed
+            results of its methods until the response's cachedUntil.
+            Cached results are shared between callers and must not be
+            modified.
+        metrics:
+            Optional evelink.metrics.Metrics instance in which to record
+            cache, HTTP and parsing statistics for each API path.
+        hooks:
+            Optional list of evelink.hooks.Hooks instances to notify of
+            the progress of each request.
+        stale_while_revalidate:
+            Optional. Number of seconds after a cached response's
+            cachedUntil during which it is still returned, while a
+            background thread fetches a fresh one to replace it. Only
+            works with caches which know when their entries expire (see
+            APICache.get_entry); responses are kept in the cache for
+            this much longer.
+        error_ttl:
+            Optional. Maximum number of seconds to cache error responses
+            for, if less than their cachedUntil. Errors are cached already
+            parsed, and raised again without parsing any XML.
+        result_mode:
+            How the wrapped access layer returns rows: as dicts (the
+            default), with 'records' as compact record objects with the
+            same fields (see evelink.parsing.records), or with 'columns'
+            as a dict of typed columns (see evelink.parsing.columns),
+            for methods which support it. Can also be passed to each
+            call.
+        """
         self.base_url = base_url
         self.user_agent = _user_agent
 
         if user_agent is not None:
             self.user_agent += ' %s' % user_agent
 
-        cache = cache or default_cache or APICache()
+        # Not 'cache or ...': an empty cache may well be falsy.
+        if cache is None:
+            cache = default_cache if default_cache is not None else APICache()
         if not isinstance(cache, APICache):
             raise ValueError("The provided cache must subclass from APICache.")
         self.cache = cache
         self.CACHE_VERSION = '1'
 
+        if result_cache is not None and not isinstance(result_cache, APICache):
+            raise ValueError("The provided result cache must subclass from APICache.")
+        self.result_cache = result_cache
+
+        if metrics is not None and not isinstance(metrics, Metrics):
+            raise ValueError("The provided metrics must be an evelink.metrics.Metrics instance.")
+        self.metrics = metrics
+
+        if stale_while_revalidate and not _reports_expiration(cache):
+            raise ValueError("stale_while_revalidate needs a cache which can tell "
+                             "when its entries expire (see APICache.get_entry).")
+        self.stale_while_revalidate = stale_while_revalidate
+        self.error_ttl = error_ttl
+
+        if result_mode not in RESULT_MODES:
+            raise ValueError("The result mode must be one of %s." % ', '.join(RESULT_MODES))
+        self.result_mode = result_mode
+
+        self.hooks = list(hooks or ())
+        for hook in self.hooks:
+            if not isinstance(hook, Hooks):
+                raise ValueError("The provided hooks must subclass from evelink.hooks.Hooks.")
+
         if api_key and len(api_key) != 2:
             raise ValueError("The provided API key must be a tuple of (keyID, vCode).")
         self.api_key = api_key
@@ -241,6 +444,133 @@ class API(object):
         # Paradoxically, Shelve doesn't like integer keys.
         return '%s-%s' % (self.CACHE_VERSION, hashlib.sha1(str([path,sorted_params]).encode("utf-8")).hexdigest())
 
+    def _prepare_params(self, params):
+        """Clean the supplied parameters and add the API key, if any."""
+        params = params or {}
+        params = dict((k, _clean(v)) for k,v in params.items())
+
+        if self.api_key:
+            _log.debug("keyID and vCode added")
+            params['keyID'] = self.api_key[0]
+            params['vCode'] = self.api_key[1]
+        return params
+
+    def _full_path(self, path):
+        return "https://%s/%s.xml.aspx" % (self.base_url, path)
+
+    def _cache_get(self, path, key, params):
+        start = _timer()
+        stale = False
+        if self.stale_while_revalidate:
+            response = None
+            entry = self.cache.get_entry(key)
+            if entry is not None:
+                response, expiration = entry
+                if expiration is None:
+                    # There's no telling whether the response is past its
+                    # cachedUntil (e.g. when read through a TieredCache
+                    # from an L2 which doesn't report expirations), so a
+                    # fresh one is fetched instead.
+                    response = None
+                else:
+                    stale = expiration - self.stale_while_revalidate < time.time()
+        else:
+            response = self.cache.get(key)
+
+        if self.metrics is not None:
+            self.metrics.observe('cache_get_seconds', _timer() - start,
+                                 path=path, cache=type(self.cache).__name__)
+            self.metrics.inc('cache_misses_total' if response is None else 'cache_hits_total', path=path)
+            if stale:
+                self.metrics.inc('cache_stale_total', path=path)
+        if stale:
+            _log.debug("Serving stale response for %s while it is refreshed", path)
+            self._revalidate(path, params, key)
+        return response
+
+    def _revalidate(self, path, params, key):
+        """Refresh a cached response in the background."""
+        flight_key = (self.base_url, key)
+        flight, leader = _join_flight(flight_key, self.cache)
+        if not leader:
+            # Already being fetched, or queued to be.
+            return
+        _queue_refresh(functools.partial(self._refresh, path, params, key, flight_key, flight))
+
+    def _refresh(self, path, params, key, flight_key, flight):
+        try:
+            response, robj = self._send(path, params)
+            flight.response, flight.robj = response, robj
+            tree = ElementTree.fromstring(response)
+            current_time = get_ts_value(tree, 'currentTime')
+            expires_time = get_ts_value(tree, 'cachedUntil')
+            error = tree.find('error')
+            if error is not None:
+                self._cache_error(path, key, APIError(error.attrib['code'], error.text.strip(),
+                                                      current_time, expires_time))
+            else:
+                self._cache_put(path, key, response, expires_time - current_time)
+        except Exception as e:
+            _log.warning("Failed to refresh %s: %r", path, e)
+            if flight.response is None:
+                flight.error = e
+        except BaseException as e:
+            if flight.response is None:
+                flight.error = e
+            raise
+        finally:
+            _finish_flight(flight_key, flight)
+
+    def _cache_put(self, path, key, response, duration):
+        duration += self.stale_while_revalidate
+        if self.metrics is None:
+            self.cache.put(key, response, duration)
+            return
+        start = _timer()
+        self.cache.put(key, response, duration)
+        self.metrics.observe('cache_put_seconds', _timer() - start,
+                             path=path, cache=type(self.cache).__name__)
+        if isinstance(response, six.binary_type):
+            self.metrics.inc('cache_bytes_stored_total', len(response), path=path)
+
+    def _cache_error(self, path, key, exc):
+        """Cache an APIError in place of the response it was parsed from."""
+        duration = exc.expires - exc.timestamp
+        if self.error_ttl is not None:
+            duration = min(duration, self.error_ttl)
+        self._cache_put(path, key, exc, duration)
+
+    def _raise_cached_error(self, path, cached_error):
+        self._set_last_timestamps(cached_error.timestamp, cached_error.expires)
+        if self.metrics is not None:
+            self.metrics.inc('api_errors_total', path=path, code=cached_error.code)
+        # Raise a copy, as the cached one may be shared with other threads.
+        exc = APIError(cached_error.code, cached_error.message,
+                       cached_error.timestamp, cached_error.expires)
+        _log.debug("Raising cached API error: %r" % exc)
+        raise exc
+
+    def _send(self, path, params):
+        if self.metrics is None:
+            return self.send_request(self._full_path(path), params)
+        start = _timer()
+        try:
+            return self.send_request(self._full_path(path), params)
+        finally:
+            self.metrics.observe('http_request_seconds', _timer() - start, path=path)
+            self.metrics.inc('http_requests_total', path=path)
+
+    def _call_hooks(self, name, *args):
+        for hook in self.hooks:
+            try:
+                getattr(hook, name)(*args)
+            except Exception:
+                _log.exception("Hook %r failed in %s", hook, name)
+
+    def _fetched(self, path, key, start, cached):
+        if self.hooks:
+            self._call_hooks('after_fetch', path, key, _timer() - start, cached)
+
     def get(self, path, params=None):
         """Request a specific path from the EVE API.
 
@@ -249,26 +579,61 @@ class API(object):
         of the API url in between the root / and the .xml bit.)
         """
 
-        params = params or {}
-        params = dict((k, _clean(v)) for k,v in params.items())
-
         _log.debug("Calling %s with params=%r", path, params)
-        if self.api_key:
-            _log.debug("keyID and vCode added")
-            params['keyID'] = self.api_key[0]
-            params['vCode'] = self.api_key[1]
+        params = self._prepare_params(params)
 
         key = self._cache_key(path, params)
-        response = self.cache.get(key)
+        if self.hooks:
+            self._call_hooks('before_request', path, key)
+        start = _timer()
+        response = self._cache_get(path, key, params)
         cached = response is not None
+        robj = None
 
-        if not cached:
-            # no cached response body found, call the API for one.
-            full_path = "https://%s/%s.xml.aspx" % (self.base_url, path)
-            response, robj = self.send_request(full_path, params)
-        else:
+        if cached:
             _log.debug("Cache hit, returning cached payload")
+            self._fetched(path, key, start, cached)
+            return self._process_response(path, key, response, robj, cached)
+
+        # No cached response body found, call the API for one - unless
+        # another thread is already doing so, in which case its response
+        # is shared rather than making the same request again.
+        flight_key = (self.base_url, key)
+        flight, leader = _join_flight(flight_key, self.cache)
+        if not leader:
+            _log.debug("Waiting on identical request already in flight")
+            response, robj = flight.wait()
+            self._fetched(path, key, start, False)
+            return self._process_response(path, key, response, robj, flight.cache is self.cache)
+
+        # The flight must be finished whatever happens, even on
+        # KeyboardInterrupt or greenlet kills, or identical requests
+        # would wait on it forever. Waiters are only released once the
+        # response has been cached, so that no new request for the same
+        # key can sneak in between.
+        try:
+            response, robj = self._send(path, params)
+            self._fetched(path, key, start, cached)
+            flight.response, flight.robj = response, robj
+            return self._process_response(path, key, response, robj, cached)
+        except BaseException as e:
+            # Waiters given the response parse it themselves.
+            if flight.response is None:
+                flight.error = e
+            raise
+        finally:
+            _finish_flight(flight_key, flight)
 
+    def _process_response(self, path, key, response, robj, cached):
+        """Parse a response body, caching it if it was freshly fetched.
+
+        Returns an APIResult, or raises an APIError if the response
+        body describes an API error.
+        """
+        if isinstance(response, APIError):
+            self._raise_cached_error(path, response)
+
+        start = _timer()
         try:
             tree = ElementTree.fromstring(response)
         except _xml_error as e:
@@ -276,27 +641,112 @@ class API(object):
             self.maybe_raise_http_error(robj)
             # otherwise, raise the parse error
             raise e
+        if self.metrics is not None or self.hooks:
+            seconds = _timer() - start
+            if self.metrics is not None:
+                self.metrics.observe('xml_parse_seconds', seconds, path=path)
+            if self.hooks:
+                self._call_hooks('after_xml_parse', path, key, seconds)
 
         current_time = get_ts_value(tree, 'currentTime')
         expires_time = get_ts_value(tree, 'cachedUntil')
         self._set_last_timestamps(current_time, expires_time)
 
-        if not cached:
-            # Have to split this up from above as timestamps have to be
-            # extracted.
-            self.cache.put(key, response, expires_time - current_time)
-
         error = tree.find('error')
         if error is not None:
             code = error.attrib['code']
             message = error.text.strip()
+            if self.metrics is not None:
+                self.metrics.inc('api_errors_total', path=path, code=code)
             exc = APIError(code, message, current_time, expires_time)
+            if not cached:
+                self._cache_error(path, key, exc)
             _log.debug("Raising API error: %r" % exc)
             raise exc
 
+        if not cached:
+            # Have to split this up from above as timestamps have to be
+            # extracted.
+            self._cache_put(path, key, response, expires_time - current_time)
+
         result = tree.find('result')
         return APIResult(result, current_time, expires_time)
 
+    def iter_rows(self, path, params=None):
+        """Request a path from the EVE API, incrementally yielding its rows.
+
+        This is a generator yielding each top-level row element of the
+        rowsets in the response's <result> (along with any nested
+        rowsets), as soon as it has been parsed. Rows are discarded from
+        the tree once the next one is requested, so memory use does not
+        grow with the number of rows in the response.
+
+        Raises an APIError once the response has been read if it turns
+        out to be an API error. The response is only cached (and
+        last_timestamps updated) once all rows have been consumed.
+        """
+
+        _log.debug("Streaming %s with params=%r", path, params)
+        params = self._prepare_params(params)
+
+        key = self._cache_key(path, params)
+        if self.hooks:
+            self._call_hooks('before_request', path, key)
+        start = _timer()
+        response = self._cache_get(path, key, params)
+        cached = response is not None
+        robj = None
+
+        if not cached:
+            response, robj = self._send(path, params)
+        else:
+            _log.debug("Cache hit, streaming cached payload")
+        self._fetched(path, key, start, cached)
+        if isinstance(response, APIError):
+            self._raise_cached_error(path, response)
+
+        current_time = expires_time = None
+        error = None
+        stack = []
+        try:
+            for event, elem in ElementTree.iterparse(six.BytesIO(response), events=('start', 'end')):
+                if event == 'start':
+                    stack.append(elem)
+                    continue
+
+                stack.pop()
+                depth = len(stack)
+                if depth == 1:
+                    if elem.tag == 'currentTime':
+                        current_time = parse_ts(elem.text)
+                    elif elem.tag == 'cachedUntil':
+                        expires_time = parse_ts(elem.text)
+                    elif elem.tag == 'error':
+                        error = (elem.attrib['code'], elem.text.strip())
+                elif depth == 3 and elem.tag == 'row' and stack[1].tag == 'result':
+                    yield elem
+                    elem.clear()
+                    stack[-1].remove(elem)
+        except _xml_error as e:
+            # If this is due to an HTTP error, raise the HTTP error
+            self.maybe_raise_http_error(robj)
+            # otherwise, raise the parse error
+            raise e
+
+        self._set_last_timestamps(current_time, expires_time)
+
+        if error is not None:
+            if self.metrics is not None:
+                self.metrics.inc('api_errors_total', path=path, code=error[0])
+            exc = APIError(error[0], error[1], current_time, expires_time)
+            if not cached:
+                self._cache_error(path, key, exc)
+            _log.debug("Raising API error: %r" % exc)
+            raise exc
+
+        if not cached:
+            self._cache_put(path, key, response, expires_time - current_time)
+
     def maybe_raise_http_error(self, response):
         """Called if a XML parse error is raised for the response.
 
@@ -440,6 +890,130 @@ def map_func_args(args, kw, args_names, defaults):
     return map_
 
 
+def request_params(client, request_specs, args, kw):
+    """Build the API request parameters for a call to an auto_call method.
+
+    'request_specs' is the '_request_specs' dict of the decorated
+    method, and 'args'/'kw' the arguments it is being called with.
+    """
+    args_map = map_func_args(
+        args, kw, request_specs['args'], request_specs['defaults'])
+    for attr_name in request_specs['prop_to_param']:
+        args_map[attr_name] = getattr(client, attr_name, None)
+
+    params = translate_args(args_map, request_specs['map_params'])
+    return dict((k, v,) for k, v in params.items() if v is not None)
+
+
+def stream_rows(client, method, row_parser, *args, **kw):
+    """Stream the rows of the response to an auto_call method.
+
+    Makes the same request as calling method(*args, **kw) on 'client'
+    would, but yields row_parser(row) for each row of the response as
+    it is parsed (see API.iter_rows) instead of parsing it as a whole.
+    """
+    specs = method._request_specs
+    params = request_params(client, specs, args, kw)
+    for row in client.api.iter_rows(specs['path'], params=params):
+        yield row_parser(row)
+
+
+class Checkpoint(object):
+    """Remembers the id of the newest entry seen by a walk_pages() walk.
+
+    This basic implementation simply holds the id in memory; see
+    FileCheckpoint for one which persists it.
+    """
+
+    def __init__(self, last_id=None):
+        self.last_id = last_id
+
+    def get(self):
+        """Return the id of the newest entry seen so far, or None."""
+        return self.last_id
+
+    def set(self, last_id):
+        self.last_id = last_id
+
+
+class FileCheckpoint(Checkpoint):
+    """A Checkpoint persisted to a small text file at 'path'."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def get(self):
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip())
+        except (IOError, OSError, ValueError):
+            return None
+
+    def set(self, last_id):
+        # Write to a temporary file first, so the checkpoint is never
+        # left half-written.
+        tmp_path = '%s.tmp' % self.path
+        with open(tmp_path, 'w') as f:
+            f.write('%d\n' % last_id)
+        getattr(os, 'replace', os.rename)(tmp_path, self.path)
+
+
+def walk_pages(fetch_page, page_size=None, stop_id=None, stop_ts=None, ts_field='timestamp',
+               checkpoint=None):
+    """Lazily walk backwards through a paged API method.
+
+    fetch_page(before_id) should return an iterable of the entries
+    (dicts with an 'id' key) with ids lower than before_id, or of the
+    most recent entries if before_id is None. Pages are requested one
+    at a time as the entries are consumed, until a page comes back with
+    fewer than 'page_size' entries (or none at all, if page_size is
+    None).
+
+    stop_id:
+        Optional. Stop at entries with an id less than or equal to this,
+        e.g. the most recent one seen by a previous walk.
+    stop_ts:
+        Optional. Stop at entries with a ts_field timestamp older than
+        this.
+    checkpoint:
+        Optional. A Checkpoint; the walk stops at the entry id it holds
+        (unless stop_id is given) and, once all entries have been
+        consumed, it is updated to the id of the newest entry seen. This
+        lets successive walks only return new entries.
+    """
+    if checkpoint is not None and stop_id is None:
+        stop_id = checkpoint.get()
+
+    before_id = None
+    max_id = None
+    while True:
+        count = 0
+        min_id = None
+        stopped = False
+        for entry in fetch_page(before_id):
+            count += 1
+            if min_id is None or entry['id'] < min_id:
+                min_id = entry['id']
+            if max_id is None or entry['id'] > max_id:
+                max_id = entry['id']
+            # Pages aren't guaranteed to be sorted, so finish the current
+            # one before stopping.
+            if ((stop_id is not None and entry['id'] <= stop_id) or
+                    (stop_ts is not None and entry[ts_field] < stop_ts)):
+                stopped = True
+                continue
+            yield entry
+
+        if stopped or count == 0 or (page_size is not None and count < page_size):
+            break
+        before_id = min_id
+
+    if checkpoint is not None and max_id is not None:
+        last_id = checkpoint.get()
+        if last_id is None or max_id > last_id:
+            checkpoint.set(max_id)
+
+
 class auto_call(object):
     """A decorator to automatically provide an api response to a method.
 
@@ -462,9 +1036,23 @@ class auto_call(object):
     paramater name. They will be added to 'evelink.api._args_map' to
     translate argument names to parameter names.
 
+    - 'result_modes': the result modes (see API's result_mode) the
+    method supports. The decorated method takes an extra 'result_mode'
+    keyword argument to pick one of them for a single call. Methods
+    supporting 'records' need a 'record_parser' too, which is used in
+    place of the method to parse the API response's result straight
+    into records (see evelink.parsing.schema.Schema.record_parser), and
+    likewise methods supporting 'columns' need a 'column_parser' to
+    parse it into Columns (see evelink.parsing.columns.column_parser).
+
     """
 
-    def __init__(self, path, prop_to_param=tuple(), map_params=None):
+    def __init__(self, path, prop_to_param=tuple(), map_params=None, result_modes=('dict',),
+                 record_parser=None, column_parser=None):
+        if ('records' in result_modes) != (record_parser is not None):
+            raise TypeError("Methods supporting the 'records' result mode need a record_parser.")
+        if ('columns' in result_modes) != (column_parser is not None):
+            raise TypeError("Methods supporting the 'columns' result mode need a column_parser.")
         self.method = None
 
         self.path = path
@@ -472,6 +1060,8 @@ class auto_call(object):
         self.defaults = None
         self.prop_to_param = prop_to_param
         self.map_params = map_params if map_params else {}
+        self.result_modes = result_modes
+        self.parsers = {'records': record_parser, 'columns': column_parser}
 
     def __call__(self, method):
         if self.method is not None:
@@ -486,32 +1076,86 @@ class auto_call(object):
         self.args.remove('api_result')
         self.defaults.pop('api_result')  # TODO: better exception
 
-        wrapper._request_specs = {
+        self.request_specs = {
             'path': self.path,
             'args': self.args,
             'defaults': self.defaults,
             'prop_to_param': self.prop_to_param,
-            'map_params': self.map_params
+            'map_params': self.map_params,
+            'result_modes': self.result_modes,
         }
+        wrapper._request_specs = self.request_specs
 
         return wrapper
 
+    def _result_mode(self, client, mode):
+        if mode is None:
+            # Methods which don't support the API's default mode fall
+            # back to dicts.
+            mode = getattr(client.api, 'result_mode', 'dict')
+            return mode if mode in self.result_modes else 'dict'
+        if mode not in self.result_modes:
+            raise ValueError("%s doesn't support the %r result mode." % (self.method.__name__, mode))
+        return mode
+
+    def _call(self, client, args, kw, mode):
+        if mode != 'dict':
+            api_result = kw['api_result']
+            return APIResult(self.parsers[mode](api_result.result),
+                             api_result.timestamp, api_result.expires)
+        return self.method(client, *args, **kw)
+
     def _wrapped_method(self):
 
         @functools.wraps(self.method)
         def wrapper(client, *args, **kw):
+            mode = self._result_mode(client, kw.pop('result_mode', None))
             if 'api_result' in kw:
-                return self.method(client, *args, **kw)
-
-            args_map = map_func_args(args, kw, self.args, self.defaults)
-            for attr_name in self.prop_to_param:
-                args_map[attr_name] = getattr(client, attr_name, None)
-
-            params = translate_args(args_map, self.map_params)
-            params =  dict((k, v,) for k, v in params.items() if v is not None)
+                return self._call(client, args, kw, mode)
+
+            params = request_params(client, self.request_specs, args, kw)
+
+            result_cache = getattr(client.api, 'result_cache', None)
+            if not isinstance(result_cache, APICache):
+                # e.g. a mocked-up API object
+                result_cache = None
+            metrics = getattr(client.api, 'metrics', None)
+            if not isinstance(metrics, Metrics):
+                metrics = None
+            hooks = getattr(client.api, 'hooks', None)
+            if not isinstance(hooks, list):
+                hooks = None
+            if result_cache is not None:
+                key = '%s-%s.%s' % (
+                    client.api._cache_key(self.path, client.api._prepare_params(params)),
+                    self.method.__module__,
+                    self.method.__name__,
+                )
+                if mode != 'dict':
+                    key += '-' + mode
+                result = result_cache.get(key)
+                if metrics is not None:
+                    metrics.inc('result_cache_misses_total' if result is None
+                                else 'result_cache_hits_total', path=self.path)
+                if result is not None:
+                    _log.debug("Result cache hit for %s", self.path)
+                    client.api._set_last_timestamps(result.timestamp, result.expires)
+                    return result
 
             kw['api_result'] = client.api.get(self.path, params=params)
-            return self.method(client, *args, **kw)
+            start = _timer()
+            result = self._call(client, args, kw, mode)
+            seconds = _timer() - start
+            if metrics is not None:
+                metrics.observe('result_parse_seconds', seconds, path=self.path)
+            if hooks:
+                client.api._call_hooks('after_result_parse', self.path,
+                    client.api._cache_key(self.path, client.api._prepare_params(params)),
+                    seconds)
+
+            if result_cache is not None and isinstance(result, APIResult):
+                result_cache.put(key, result, result.expires - result.timestamp)
+            return result
 
         return wrapper
 
@@ -39,6 +39,9 @@ class AppEngineAPI(api.API):
         key = self._cache_key(path, params)
         response = yield self.cache.get_async(key)
         cached = response is not None
+        if isinstance(response, api.APIError):
+            # Cached by get(), which keeps errors already parsed.
+            self._raise_cached_error(path, response)
 
         if not cached:
             # no cached response body found, call the API for one.
@@ -182,21 +185,8 @@ def auto_gae_api(func):
 
 def _make_async(method):
     def _async(self, *args, **kw):
-        # method specs
         path = method._request_specs['path']
-        args_names = method._request_specs['args']
-        defaults = method._request_specs['defaults']
-        prop_to_param = method._request_specs['prop_to_param']
-        map_params = method._request_specs['map_params']
-
-        # build parameter map
-        args_map = api.map_func_args(args, kw, args_names, defaults)
-        for attr_name in prop_to_param:
-            args_map[attr_name] = getattr(self, attr_name, None)
-
-        # fix params name and remove params with None values
-        params = api.translate_args(args_map, map_params)
-        params =  dict((k, v,) for k, v in params.items() if v is not None)
+        params = api.request_params(self, method._request_specs, args, kw)
 
         kw['api_result'] = yield self.api.get_async(path, params=params)
         raise ndb.Return(method(self, *args, **kw))
@@ -0,0 +1,152 @@
+"""Run many EVE API calls concurrently over a bounded pool of threads.
+
+A call is either a callable taking no arguments, or a tuple of
+(callable, arg1, arg2, ...); use functools.partial for keyword
+arguments. For example:
+
+    calls = [(evelink.char.Char(char_id, api).assets,) for char_id in ids]
+    for call, result, error in evelink.batch.run(calls, concurrency=8):
+        ...
+"""
+
+import collections
+import logging
+import threading
+
+from evelink import api
+from evelink.thirdparty.six.moves import queue
+
+_log = logging.getLogger('evelink.batch')
+
+
+BatchResult = collections.namedtuple("BatchResult", [
+        "call",
+        "result",
+        "error",
+    ])
+
+
+def _split_call(call):
+    if isinstance(call, tuple):
+        return call[0], call[1:]
+    return call, ()
+
+
+def _client_api(func):
+    client = getattr(func, '__self__', None)
+    return getattr(client, 'api', None)
+
+
+def _coalesce_key(func, args):
+    """Key identifying calls that would make the same API request.
+
+    Only auto_call methods bound to a wrapper object can be coalesced;
+    returns None for anything else.
+    """
+    specs = getattr(func, '_request_specs', None)
+    api_obj = _client_api(func)
+    if specs is None or api_obj is None:
+        return None
+
+    try:
+        params = api.request_params(func.__self__, specs, args, {})
+    except (KeyError, TypeError):
+        return None
+    return (func.__func__, id(api_obj), api_obj._cache_key(specs['path'], params))
+
+
+def _host(func):
+    return getattr(_client_api(func), 'base_url', None)
+
+
+def _worker(tasks, results, host_limits):
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        task_id, func, args, host = task
+
+        limit = host_limits.get(host)
+        if limit is not None:
+            limit.acquire()
+        try:
+            result, error = func(*args), None
+        except Exception as e:
+            _log.debug("Batch call %r raised %r", func, e)
+            result, error = None, e
+        finally:
+            if limit is not None:
+                limit.release()
+        results.put((task_id, result, error))
+
+
+def as_completed(calls, concurrency=4, per_host=None):
+    """Run the calls concurrently, yielding results as they complete.
+
+    Yields (index, BatchResult) tuples, where index is the position of
+    the call in 'calls'. Errors raised by a call are returned in the
+    BatchResult rather than raised.
+
+    concurrency:
+        The maximum number of calls in progress at once.
+    per_host:
+        Optional. The maximum number of calls in progress at once
+        against any single API base_url.
+
+    Calls to the same auto_call method with the same API object and
+    request parameters are only made once; all of them get the same
+    result object.
+    """
+    calls = list(calls)
+
+    # A dict plus a list of groups rather than an OrderedDict, which
+    # Python 2.6 lacks.
+    task_groups = {}
+    groups = []
+    for index, call in enumerate(calls):
+        func, args = _split_call(call)
+        key = _coalesce_key(func, args)
+        if key is None:
+            key = ('call', index)
+        if key in task_groups:
+            task_groups[key][1].append(index)
+        else:
+            task_groups[key] = ((func, args), [index])
+            groups.append(task_groups[key])
+
+    tasks = queue.Queue()
+    results = queue.Queue()
+    host_limits = {}
+    for task_id, ((func, args), _) in enumerate(groups):
+        host = _host(func)
+        if per_host and host not in host_limits:
+            host_limits[host] = threading.BoundedSemaphore(per_host)
+        tasks.put((task_id, func, args, host))
+
+    num_workers = max(1, min(concurrency, len(groups)))
+    for _ in range(num_workers):
+        tasks.put(None)
+        thread = threading.Thread(target=_worker, args=(tasks, results, host_limits))
+        thread.daemon = True
+        thread.start()
+
+    for _ in range(len(groups)):
+        task_id, result, error = results.get()
+        for index in groups[task_id][1]:
+            yield index, BatchResult(calls[index], result, error)
+
+
+def run(calls, concurrency=4, per_host=None):
+    """Run the calls concurrently and return their results.
+
+    Returns a list of BatchResult tuples in the same order as 'calls'.
+    See as_completed() for the meaning of the arguments.
+    """
+    calls = list(calls)
+    results = [None] * len(calls)
+    for index, batch_result in as_completed(calls, concurrency, per_host):
+        results[index] = batch_result
+    return results
+
+
+# vim: set ts=4 sts=4 sw=4 et:
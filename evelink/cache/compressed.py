@@ -0,0 +1,135 @@
+import pickle
+import struct
+import zlib
+
+from evelink import api
+from evelink.thirdparty import six
+
+# Stored values start with a magic number, flags saying how the rest
+# was encoded, and the Adler-32 checksum of the dictionary it was
+# compressed with (0 for none).
+_HEADER = struct.Struct('<2sBI')
+_MAGIC = b'EZ'
+_COMPRESSED = 1
+_PICKLED = 2
+
+# Boilerplate common to EVE API responses, for use as a preset
+# dictionary; zlib gives the most weight to what comes last.
+EVE_API_ZDICT = (
+    b'corporationName="allianceID="allianceName="factionID="factionName="'
+    b'solarSystemID="stationID="stationName="locationID="typeID="typeName="'
+    b'itemID="quantity="flag="singleton="rawQuantity="price="volEntered="'
+    b'refID="refTypeID="ownerName1="ownerID1="ownerName2="ownerID2="'
+    b'argName1="argID1="amount="balance="reason="taxReceiverID="taxAmount="'
+    b'transactionDateTime="transactionID="clientID="clientName="'
+    b'transactionType="buy" transactionFor="personal" journalTransactionID="'
+    b'characterID="characterName="corporationID="date="'
+    b'<?xml version=\'1.0\' encoding=\'UTF-8\'?>\r\n<eveapi version="2">\r\n'
+    b'  <currentTime></currentTime>\r\n  <result>\r\n'
+    b'    <rowset name="" key="" columns="">\r\n      <row />\r\n'
+    b'    </rowset>\r\n  </result>\r\n  <cachedUntil></cachedUntil>\r\n</eveapi>'
+)
+
+
+def make_zdict(samples, size=32768):
+    """Build a preset dictionary for CompressedCache from sample values.
+
+    zlib's dictionaries are simply text that compressed values are
+    likely to repeat, so this joins the samples (which should be typical
+    responses for the calls being cached) and keeps the last 'size'
+    bytes of them.
+    """
+    return b''.join(samples)[-size:]
+
+
+class CompressedCache(api.APICache):
+    """Wraps another APICache, compressing the values stored in it.
+
+    Byte strings (i.e. raw API responses) are compressed with zlib at
+    the given 'level', and other values are pickled first. Values under
+    'min_size' bytes, or which don't get any smaller, are stored as they
+    are. A preset dictionary ('zdict', see EVE_API_ZDICT and make_zdict;
+    Python 3.3+ only) helps a lot with small and medium sized responses,
+    but the same dictionary must be used to read them back: values
+    written with another one are treated as missing.
+
+    Any other attributes (e.g. purge_expired() or close()) are passed
+    through to the wrapped cache.
+    """
+
+    def __init__(self, cache, level=6, zdict=None, min_size=256):
+        if not isinstance(cache, api.APICache):
+            raise ValueError("The provided cache must subclass from APICache.")
+        if not -1 <= level <= 9:
+            raise ValueError("The compression level must be from -1 to 9.")
+        super(CompressedCache, self).__init__()
+        self.cache = cache
+        self.level = level
+        self.zdict = zdict
+        self.min_size = min_size
+        self._zdict_id = zlib.adler32(zdict) & 0xffffffff if zdict else 0
+
+    def __getattr__(self, name):
+        if name == 'cache':
+            raise AttributeError(name)
+        return getattr(self.cache, name)
+
+    def _compress(self, data):
+        if not self.zdict:
+            return zlib.compress(data, self.level)
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, zlib.MAX_WBITS,
+                                      zlib.DEF_MEM_LEVEL, zlib.Z_DEFAULT_STRATEGY, self.zdict)
+        return compressor.compress(data) + compressor.flush()
+
+    def _decompress(self, data):
+        if not self.zdict:
+            return zlib.decompress(data)
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS, self.zdict)
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def encode(self, value):
+        """Return the byte string stored in the wrapped cache for 'value'."""
+        flags = 0
+        if not isinstance(value, six.binary_type):
+            flags, value = _PICKLED, pickle.dumps(value, 2)
+        if len(value) >= self.min_size:
+            compressed = self._compress(value)
+            if len(compressed) < len(value):
+                flags, value = flags | _COMPRESSED, compressed
+        zdict_id = self._zdict_id if flags & _COMPRESSED else 0
+        return _HEADER.pack(_MAGIC, flags, zdict_id) + value
+
+    def decode(self, data):
+        """Return the value stored as 'data', or None if it isn't readable."""
+        if not isinstance(data, six.binary_type) or data[:2] != _MAGIC:
+            return None
+        _, flags, zdict_id = _HEADER.unpack_from(data)
+        value = data[_HEADER.size:]
+        if flags & _COMPRESSED:
+            if zdict_id != self._zdict_id:
+                return None
+            try:
+                value = self._decompress(value)
+            except zlib.error:
+                return None
+        if flags & _PICKLED:
+            value = pickle.loads(value)
+        return value
+
+    def get(self, key):
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        return self.decode(data)
+
+    def get_entry(self, key):
+        entry = self.cache.get_entry(key)
+        if entry is None:
+            return None
+        value = self.decode(entry[0])
+        if value is None:
+            return None
+        return value, entry[1]
+
+    def put(self, key, value, duration):
+        self.cache.put(key, self.encode(value), duration)
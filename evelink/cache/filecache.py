@@ -0,0 +1,183 @@
+import errno
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+
+from evelink import api
+from evelink.cache.sweeper import Sweeper
+from evelink.thirdparty import six
+
+# Every entry starts with a magic number, its expiration time and
+# whether the rest of the file is a pickle or the raw value.
+_HEADER = struct.Struct('<4sdB')
+_MAGIC = b'EVC1'
+_RAW, _PICKLED = 0, 1
+
+_TMP_PREFIX = '.tmp-'
+# Temporary files older than this were left behind by a crashed writer.
+_STALE_TMP_AGE = 3600
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+def _open(path):
+    try:
+        return open(path, 'rb')
+    except (IOError, OSError) as e:
+        if e.errno == errno.ENOENT:
+            return None
+        raise
+
+
+def _live(magic, expiration):
+    return magic == _MAGIC and expiration >= time.time()
+
+
+class FileCache(api.APICache):
+    """An implementation of APICache keeping one file per entry.
+
+    Any number of threads and processes may share the same directory
+    without locking: entries are written to a temporary file which is
+    then renamed into place, so readers only ever see whole entries.
+    Entries are read through mmap, and get_buffer() gives access to
+    byte string values (i.e. raw API responses) without copying them.
+
+    Expired entries are only deleted by purge_expired(); pass
+    background_sweep=True to have that done every 'sweep_interval'
+    seconds by a background thread.
+    """
+
+    def __init__(self, path, sweep_interval=3600, background_sweep=False):
+        super(FileCache, self).__init__()
+        self.path = path
+        _makedirs(path)
+        self._sweeper = None
+        if background_sweep:
+            self._sweeper = Sweeper(self, sweep_interval)
+            self._sweeper.start()
+
+    def _entry_path(self, key):
+        if isinstance(key, six.text_type):
+            key = key.encode('utf-8')
+        digest = hashlib.sha1(key).hexdigest()
+        return os.path.join(self.path, digest[:2], digest[2:])
+
+    def _map(self, key):
+        """Return (mmap, flag, expiration) for a live entry, or None."""
+        f = _open(self._entry_path(key))
+        if f is None:
+            return None
+        with f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                return None
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, expiration, flag = _HEADER.unpack_from(mapped)
+        if not _live(magic, expiration):
+            mapped.close()
+            return None
+        return mapped, flag, expiration
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        entry = self._map(key)
+        if entry is None:
+            return None
+        mapped, flag, expiration = entry
+        try:
+            value = mapped[_HEADER.size:]
+        finally:
+            mapped.close()
+        return (pickle.loads(value) if flag == _PICKLED else value), expiration
+
+    def get_buffer(self, key):
+        """Like get(), but without copying byte string values.
+
+        Byte string values are returned as a read-only memoryview of the
+        mapped file, which (on POSIX systems) stays valid even if the
+        entry is replaced or deleted in the meantime. Other values are
+        returned as by get().
+        """
+        entry = self._map(key)
+        if entry is None:
+            return None
+        mapped, flag, _ = entry
+        if flag == _PICKLED:
+            try:
+                return pickle.loads(mapped[_HEADER.size:])
+            finally:
+                mapped.close()
+        return memoryview(mapped)[_HEADER.size:]
+
+    def put(self, key, value, duration):
+        if isinstance(value, six.binary_type):
+            flag = _RAW
+        else:
+            flag, value = _PICKLED, pickle.dumps(value, 2)
+
+        path = self._entry_path(key)
+        directory = os.path.dirname(path)
+        _makedirs(directory)
+        fd, tmp_path = tempfile.mkstemp(prefix=_TMP_PREFIX, dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, time.time() + duration, flag))
+                f.write(value)
+            _replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _is_dead(self, path, name):
+        if name.startswith(_TMP_PREFIX):
+            return os.path.getmtime(path) < time.time() - _STALE_TMP_AGE
+        f = _open(path)
+        if f is None:
+            return False
+        with f:
+            header = f.read(_HEADER.size)
+        return len(header) < _HEADER.size or not _live(*_HEADER.unpack(header)[:2])
+
+    def purge_expired(self):
+        """Remove all expired entries, returning the number removed.
+
+        An entry rewritten by another process just as it is found to
+        have expired may be removed too, which only costs a cache miss.
+        """
+        purged = 0
+        for shard in os.listdir(self.path):
+            shard_path = os.path.join(self.path, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for name in os.listdir(shard_path):
+                path = os.path.join(shard_path, name)
+                try:
+                    if self._is_dead(path, name):
+                        os.remove(path)
+                        purged += 1
+                except OSError as e:
+                    # Already gone, e.g. purged by another process.
+                    if e.errno != errno.ENOENT:
+                        raise
+        return purged
+
+    def close(self):
+        if self._sweeper is not None:
+            self._sweeper.stop()
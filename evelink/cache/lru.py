@@ -0,0 +1,151 @@
+import collections
+import sys
+import threading
+import time
+
+from evelink import api
+from evelink.thirdparty import six
+
+
+class _LinkedDict(dict):
+    """The parts of OrderedDict that LRUCache uses, for Python 2.6: a
+    dict which remembers insertion order in a linked list of
+    [prev, next, key] links."""
+
+    def __init__(self):
+        super(_LinkedDict, self).__init__()
+        self._links = {}
+        self._root = root = []
+        root[:] = [root, root, None]
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            root = self._root
+            last = root[0]
+            last[1] = root[0] = self._links[key] = [last, root, key]
+        super(_LinkedDict, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super(_LinkedDict, self).__delitem__(key)
+        prev, next_, _ = self._links.pop(key)
+        prev[1] = next_
+        next_[0] = prev
+
+    def pop(self, key):
+        value = self[key]
+        del self[key]
+        return value
+
+    def __iter__(self):
+        root = self._root
+        link = root[1]
+        while link is not root:
+            yield link[2]
+            link = link[1]
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def clear(self):
+        super(_LinkedDict, self).clear()
+        self._links.clear()
+        root = self._root
+        root[:] = [root, root, None]
+
+
+_OrderedDict = getattr(collections, 'OrderedDict', _LinkedDict)
+
+
+class LRUCache(api.APICache):
+    """A thread-safe, size-bounded, in-memory implementation of APICache.
+
+    Entries are evicted least-recently-used first once the cache holds
+    more than 'max_entries' entries or 'max_bytes' bytes of values (the
+    size of values which aren't strings is estimated with
+    sys.getsizeof). Either limit may be None for no limit.
+
+    Expired entries are dropped when read, and also swept out in bulk
+    every 'sweep_interval' seconds by whichever call to put() comes
+    along next.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=None, sweep_interval=60):
+        super(LRUCache, self).__init__()
+        self.cache = _OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.size = 0
+        self._lock = threading.Lock()
+        self._next_sweep = time.time() + sweep_interval
+
+    def __len__(self):
+        return len(self.cache)
+
+    @staticmethod
+    def _sizeof(value):
+        if isinstance(value, (six.binary_type, six.text_type)):
+            return len(value)
+        return sys.getsizeof(value)
+
+    def _remove(self, key):
+        _, _, size = self.cache.pop(key)
+        self.size -= size
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            value, expiration, _ = entry
+            if expiration < time.time():
+                self._remove(key)
+                return None
+            # Move the entry to the most recently used end.
+            self.cache[key] = self.cache.pop(key)
+            return value, expiration
+
+    def put(self, key, value, duration):
+        now = time.time()
+        expiration = now + duration
+        size = self._sizeof(value)
+
+        with self._lock:
+            if key in self.cache:
+                self._remove(key)
+            if expiration < now or (self.max_bytes is not None and size > self.max_bytes):
+                return
+
+            self.cache[key] = (value, expiration, size)
+            self.size += size
+
+            if now >= self._next_sweep:
+                self._purge_expired(now)
+
+            while ((self.max_entries is not None and len(self.cache) > self.max_entries) or
+                   (self.max_bytes is not None and self.size > self.max_bytes)):
+                self._remove(next(iter(self.cache)))
+
+    def _purge_expired(self, now):
+        expired = [k for k, (_, expiration, _) in self.cache.items() if expiration < now]
+        for key in expired:
+            self._remove(key)
+        self._next_sweep = now + self.sweep_interval
+        return len(expired)
+
+    def purge_expired(self):
+        """Remove all expired entries, returning the number removed."""
+        with self._lock:
+            return self._purge_expired(time.time())
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self.size = 0
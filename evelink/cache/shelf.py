@@ -1,10 +1,111 @@
+import os
 import shelve
+import threading
+import time
 
 from evelink import api
+from evelink.cache.sweeper import Sweeper
+
+# The files a shelf may be made of, depending on the dbm module in use.
+_SHELF_SUFFIXES = ('', '.db', '.dat', '.dir', '.bak', '.pag')
+
+
+def _shelf_files(path):
+    return [path + suffix for suffix in _SHELF_SUFFIXES if os.path.exists(path + suffix)]
+
 
 class ShelveCache(api.APICache):
-    """An implementation of APICache using shelve."""
+    """An implementation of APICache using shelve.
 
-    def __init__(self, path):
+    Expired entries are only removed when read, or in bulk by
+    purge_expired(); pass background_sweep=True to have that done every
+    'sweep_interval' seconds by a background thread. compact() also
+    reclaims the file space they used.
+
+    If 'max_entries' is set, the entries closest to expiring are evicted
+    whenever a put() takes the cache over that size, bringing it down to
+    90% of the limit (so the cost of finding them is amortized).
+    """
+
+    def __init__(self, path, max_entries=None, sweep_interval=3600, background_sweep=False):
         super(ShelveCache, self).__init__()
+        self.path = path
         self.cache = shelve.open(path)
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._sweeper = None
+        if background_sweep:
+            self._sweeper = Sweeper(self, sweep_interval)
+            self._sweeper.start()
+
+    def get(self, key):
+        with self._lock:
+            return super(ShelveCache, self).get(key)
+
+    def get_entry(self, key):
+        with self._lock:
+            # Read once: each read of a shelf unpickles the entry.
+            entry = self.cache.get(key)
+            if not entry:
+                return None
+            if entry[1] < time.time():
+                del self.cache[key]
+                return None
+            return entry
+
+    def put(self, key, value, duration):
+        with self._lock:
+            super(ShelveCache, self).put(key, value, duration)
+            if self.max_entries is not None and len(self.cache) > self.max_entries:
+                self._evict(int(self.max_entries * 0.9))
+
+    def _expirations(self):
+        return [(self.cache[key][1], key) for key in list(self.cache.keys())]
+
+    def _evict(self, max_entries):
+        expirations = sorted(self._expirations())
+        for _, key in expirations[:max(0, len(expirations) - max_entries)]:
+            del self.cache[key]
+
+    def purge_expired(self):
+        """Remove all expired entries, returning the number removed."""
+        with self._lock:
+            now = time.time()
+            expired = [key for expiration, key in self._expirations() if expiration < now]
+            for key in expired:
+                del self.cache[key]
+            self.cache.sync()
+            return len(expired)
+
+    def compact(self):
+        """Purge expired entries and shrink the shelf's files to fit."""
+        with self._lock:
+            self.purge_expired()
+            reorganize = getattr(self.cache.dict, 'reorganize', None)
+            if reorganize is not None:
+                # gdbm can do this in place.
+                reorganize()
+                return
+
+            # Other dbm modules never give space back, so copy the live
+            # entries to a fresh shelf and swap it in.
+            new_path = self.path + '.compact'
+            new_cache = shelve.open(new_path, 'n')
+            try:
+                for key in self.cache.keys():
+                    new_cache[key] = self.cache[key]
+            finally:
+                new_cache.close()
+
+            self.cache.close()
+            for name in _shelf_files(self.path):
+                os.remove(name)
+            for name in _shelf_files(new_path):
+                os.rename(name, self.path + name[len(new_path):])
+            self.cache = shelve.open(self.path)
+
+    def close(self):
+        if self._sweeper is not None:
+            self._sweeper.stop()
+        with self._lock:
+            self.cache.close()
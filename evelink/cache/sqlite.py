@@ -1,37 +1,256 @@
+import atexit
+import logging
 import pickle
-import time
 import sqlite3
+import threading
+import time
+import weakref
 
 from evelink import api
+from evelink.cache.sweeper import Sweeper
+from evelink.thirdparty import six
+
+_log = logging.getLogger('evelink.cache.sqlite')
+
+
+def _close_at_exit(cache_ref):
+    cache = cache_ref()
+    if cache is None:
+        return
+    try:
+        cache.close()
+    except sqlite3.Error as e:
+        _log.warning("Failed to flush cache %r at exit: %r", cache.path, e)
+
+
+class _ConnectionHolder(object):
+    """Holds a thread's connection in its thread-local storage, so that
+    the connection can be closed once the thread exits."""
+
+    __slots__ = ('connection', '__weakref__')
+
+    def __init__(self, connection):
+        self.connection = connection
+
 
 class SqliteCache(api.APICache):
-    """An implementation of APICache using sqlite."""
+    """An implementation of APICache using sqlite.
+
+    The cache may be shared by many threads (each uses a connection of
+    its own, closed when the thread exits) and processes: the database is put in WAL mode, so readers
+    don't block on the writer.
+
+    Puts are buffered, and written out in a single transaction once
+    'max_pending' of them have piled up or 'commit_interval' seconds
+    have passed since the last write. Buffered entries are visible to
+    get() in this process straight away; call flush() to make them
+    visible to other processes sooner, and close() once done with the
+    cache (this also happens at exit).
 
-    def __init__(self, path):
+    Expired entries are deleted in bulk along with a write at most every
+    'sweep_interval' seconds, or by a background thread on that schedule
+    if background_sweep is True; see also purge_expired() and compact().
+    If 'max_entries' is set, the entries closest to expiring are evicted
+    whenever a write takes the cache over that size.
+    """
+
+    def __init__(self, path, commit_interval=1.0, max_pending=100, sweep_interval=60,
+                 timeout=30, max_entries=None, background_sweep=False):
         super(SqliteCache, self).__init__()
-        self.connection = sqlite3.connect(path)
-        cursor = self.connection.cursor()
-        cursor.execute('create table if not exists cache ("key" text primary key on conflict replace,'
-                       'value blob, expiration integer)')
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_pending = max_pending
+        self.sweep_interval = sweep_interval
+        self.timeout = timeout
+        self.max_entries = max_entries
+
+        # _lock guards the buffers and is never held while waiting on
+        # the database; _write_lock makes writes happen one at a time,
+        # in the order they were buffered.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        # The open connections, keyed by a weak reference to the holder
+        # in their thread's local storage.
+        self._connections = {}
+        self._pending = {}
+        # Buffers being written out, oldest first, still read by get().
+        self._flushing = []
+        # An upper bound on the number of rows, when max_entries is set.
+        self._row_count = None
+        self._next_commit = time.time() + commit_interval
+        self._next_sweep = time.time() + sweep_interval
+
+        with self.connection as conn:
+            conn.execute('create table if not exists cache_entries ('
+                         '"key" text primary key, value blob, pickled integer, expiration real)')
+            conn.execute('create index if not exists cache_entries_expiration '
+                         'on cache_entries (expiration)')
+
+        atexit.register(_close_at_exit, weakref.ref(self))
+
+        self._sweeper = None
+        if background_sweep:
+            self._sweeper = Sweeper(self, sweep_interval)
+            self._sweeper.start()
+
+    def _connect(self):
+        # Connections are only ever used by the thread that created them,
+        # but close() may be called from any thread.
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        conn.execute('pragma journal_mode=wal')
+        conn.execute('pragma synchronous=normal')
+        return conn
+
+    @property
+    def connection(self):
+        """The calling thread's connection to the database."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            holder = _ConnectionHolder(self._connect())
+            connections = self._connections
+            # The holder goes away with the thread's local storage; the
+            # callback mustn't take a lock, as that may happen while one
+            # is held (see close()). Dict operations are atomic.
+            def release(ref):
+                conn = connections.pop(ref, None)
+                if conn is not None:
+                    conn.close()
+            connections[weakref.ref(holder, release)] = holder.connection
+            self._local.holder = holder
+        return holder.connection
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, six.binary_type):
+            return sqlite3.Binary(value), 0
+        return sqlite3.Binary(pickle.dumps(value, 2)), 1
+
+    @staticmethod
+    def _decode(value, pickled):
+        if pickled:
+            return pickle.loads(bytes(value))
+        return bytes(value)
 
     def get(self, key):
-        cursor = self.connection.cursor()
-        cursor.execute('select value, expiration from cache where "key"=?',(key,))
-        result = cursor.fetchone()
-        if not result:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                for batch in reversed(self._flushing):
+                    entry = batch.get(key)
+                    if entry is not None:
+                        break
+        if entry is None:
+            cursor = self.connection.execute(
+                'select value, pickled, expiration from cache_entries where "key"=?', (key,))
+            entry = cursor.fetchone()
+            cursor.close()
+        try:
+            self._maybe_flush()
+        except sqlite3.Error as e:
+            # Buffered puts are kept, to be written with the next flush.
+            _log.warning("Failed to flush cache %r: %r", self.path, e)
+
+        if entry is None:
             return None
-        value, expiration = result
+        value, pickled, expiration = entry
         if expiration < time.time():
-            cursor.execute('delete from cache where "key"=?', (key,))
-            self.connection.commit()
             return None
-        cursor.close()
-        return pickle.loads(value)
+        return self._decode(value, pickled), expiration
 
     def put(self, key, value, duration):
-        expiration = time.time() + duration
-        value_tuple = (key, sqlite3.Binary(pickle.dumps(value, 2)), expiration)
-        cursor = self.connection.cursor()
-        cursor.execute('insert into cache values (?, ?, ?)', value_tuple)
-        self.connection.commit()
-        cursor.close()
+        value, pickled = self._encode(value)
+        with self._lock:
+            self._pending[key] = (value, pickled, time.time() + duration)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        with self._lock:
+            due = (len(self._pending) >= self.max_pending or
+                   (self._pending and time.time() >= self._next_commit))
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered puts to the database."""
+        conn = self.connection
+        with self._write_lock:
+            # The buffer is swapped out rather than written under _lock,
+            # so that get() and put() don't wait on the database; its
+            # entries stay visible to get() until they are committed.
+            with self._lock:
+                now = time.time()
+                batch, self._pending = self._pending, {}
+                self._flushing.append(batch)
+                self._next_commit = now + self.commit_interval
+            try:
+                with conn:
+                    if batch:
+                        conn.executemany(
+                            'insert or replace into cache_entries values (?, ?, ?, ?)',
+                            [(k,) + v for k, v in batch.items()])
+                    if self._sweeper is None and now >= self._next_sweep:
+                        self._purge_expired(conn, now)
+                    if self.max_entries is not None:
+                        self._evict(conn, len(batch))
+            except Exception:
+                # Put the entries back, behind any newer puts of the same keys.
+                with self._lock:
+                    self._flushing.remove(batch)
+                    batch.update(self._pending)
+                    self._pending = batch
+                raise
+            with self._lock:
+                self._flushing.remove(batch)
+
+    def _purge_expired(self, conn, now):
+        cursor = conn.execute('delete from cache_entries where expiration < ?', (now,))
+        self._next_sweep = now + self.sweep_interval
+        return cursor.rowcount
+
+    def _evict(self, conn, added):
+        # Only count the rows when the cache may have gone over size.
+        if self._row_count is not None:
+            self._row_count += added
+            if self._row_count <= self.max_entries:
+                return
+        count, = conn.execute('select count(*) from cache_entries').fetchone()
+        if count > self.max_entries:
+            conn.execute('delete from cache_entries where "key" in (select "key" from cache_entries '
+                         'order by expiration limit ?)', (count - self.max_entries,))
+            count = self.max_entries
+        self._row_count = count
+
+    def purge_expired(self):
+        """Remove all expired entries, returning the number removed."""
+        self.flush()
+        conn = self.connection
+        with self._write_lock:
+            with conn:
+                return self._purge_expired(conn, time.time())
+
+    def compact(self):
+        """Purge expired entries and shrink the database file to fit."""
+        self.purge_expired()
+        conn = self.connection
+        with self._write_lock:
+            conn.execute('vacuum')
+            conn.execute('pragma wal_checkpoint(truncate)')
+
+    def close(self):
+        """Flush buffered puts and close every thread's connection."""
+        if self._sweeper is not None:
+            self._sweeper.stop()
+        self.flush()
+        with self._lock:
+            self._local = threading.local()
+        while self._connections:
+            try:
+                _, conn = self._connections.popitem()
+            except KeyError:
+                break
+            conn.close()
@@ -0,0 +1,40 @@
+import logging
+import threading
+import weakref
+
+_log = logging.getLogger('evelink.cache.sweeper')
+
+
+class Sweeper(threading.Thread):
+    """A daemon thread calling purge_expired() on a cache every so often.
+
+    Only a weak reference to the cache is kept, so the thread exits by
+    itself once the cache has been garbage collected, or when stop() is
+    called.
+    """
+
+    def __init__(self, cache, interval):
+        super(Sweeper, self).__init__(name='evelink-cache-sweeper')
+        self.daemon = True
+        self.interval = interval
+        self._cache = weakref.ref(cache)
+        self._stopped = threading.Event()
+
+    def run(self):
+        while True:
+            # Event.wait() returns None rather than the flag on Python 2.6.
+            self._stopped.wait(self.interval)
+            if self._stopped.is_set():
+                return
+            cache = self._cache()
+            if cache is None:
+                return
+            try:
+                purged = cache.purge_expired()
+                _log.debug("Purged %d expired entries from %r", purged, cache)
+            except Exception:
+                _log.exception("Failed to purge expired entries from %r", cache)
+            del cache
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from evelink import api
+from evelink.cache.lru import LRUCache
+
+
+class TieredCache(api.APICache):
+    """An in-process LRU cache (L1) in front of another APICache (L2).
+
+    Reads try L1 first, then L2, copying what L2 has into L1. Writes go
+    to both. An entry never outlives its L2 copy in L1, and lives there
+    for at most 'l1_max_ttl' seconds if that is set; keep it short if
+    other processes may rewrite the same keys in L2, as L1 won't see
+    that until its copy expires.
+
+    l2:
+        The shared cache, e.g. a SqliteCache or FileCache. Caches which
+        can't tell when their entries expire (see APICache.get_entry)
+        need an l1_max_ttl, or entries read from them won't go in L1.
+    l1:
+        Optional. Defaults to an LRUCache of up to 1000 entries.
+
+    Hits and misses on each tier are counted in the 'stats' dict. Any
+    other attributes (e.g. flush() or compact()) are passed through to
+    L2.
+    """
+
+    def __init__(self, l2, l1=None, l1_max_ttl=None):
+        if l1 is None:
+            l1 = LRUCache(max_entries=1000)
+        for cache in (l1, l2):
+            if not isinstance(cache, api.APICache):
+                raise ValueError("The provided cache must subclass from APICache.")
+        super(TieredCache, self).__init__()
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_max_ttl = l1_max_ttl
+        self.stats = dict.fromkeys(['l1_hits', 'l1_misses', 'l2_hits', 'l2_misses'], 0)
+        self._stats_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name == 'l2':
+            raise AttributeError(name)
+        return getattr(self.l2, name)
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _l1_ttl(self, duration):
+        if self.l1_max_ttl is None:
+            return duration
+        if duration is None:
+            return self.l1_max_ttl
+        return min(duration, self.l1_max_ttl)
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        entry = self.l1.get_entry(key)
+        if entry is not None:
+            self._count('l1_hits')
+            return entry
+        self._count('l1_misses')
+
+        entry = self.l2.get_entry(key)
+        if entry is None:
+            self._count('l2_misses')
+            return None
+        self._count('l2_hits')
+
+        value, expiration = entry
+        ttl = self._l1_ttl(expiration - time.time() if expiration is not None else None)
+        if ttl is not None:
+            self.l1.put(key, value, ttl)
+        return entry
+
+    def put(self, key, value, duration):
+        self.l2.put(key, value, duration)
+        self.l1.put(key, value, self._l1_ttl(duration))
+
+    def purge_expired(self):
+        """Remove expired entries from both tiers, returning the number
+        removed from L2."""
+        getattr(self.l1, 'purge_expired', lambda: None)()
+        return getattr(self.l2, 'purge_expired', lambda: 0)()
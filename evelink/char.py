@@ -1,18 +1,97 @@
 from evelink import api, constants
-from evelink.parsing.assets import parse_assets
+from evelink.parsing.assets import parse_asset_index, parse_assets, parse_assets_row
 from evelink.parsing.contact_list import parse_contact_list
 from evelink.parsing.contract_bids import parse_contract_bids
 from evelink.parsing.contract_items import parse_contract_items
-from evelink.parsing.contracts import parse_contracts
-from evelink.parsing.industry_jobs import parse_industry_jobs
+from evelink.parsing.contracts import parse_contracts, parse_contracts_records
+from evelink.parsing.industry_jobs import parse_industry_jobs, parse_industry_jobs_records
 from evelink.parsing.planetary_interactions import parse_planetary_colonies
 from evelink.parsing.planetary_interactions import parse_planetary_links
 from evelink.parsing.planetary_interactions import parse_planetary_pins
 from evelink.parsing.planetary_interactions import parse_planetary_routes
-from evelink.parsing.kills import parse_kills
-from evelink.parsing.orders import parse_market_orders
-from evelink.parsing.wallet_journal import parse_wallet_journal
-from evelink.parsing.wallet_transactions import parse_wallet_transactions
+from evelink.parsing.kills import parse_kills, parse_kills_row
+from evelink.parsing.orders import parse_market_orders, parse_market_orders_columns, parse_market_orders_records
+from evelink.parsing.wallet_journal import parse_wallet_journal, parse_wallet_journal_columns, parse_wallet_journal_records, parse_wallet_journal_row
+from evelink.parsing.wallet_transactions import parse_wallet_transactions, parse_wallet_transactions_columns, parse_wallet_transactions_records, parse_wallet_transactions_row
+from evelink.parsing import schema as s
+
+
+def _or_none(value):
+    return value or None
+
+
+_parse_notification_row = s.Schema([
+    ('id', s.Int('notificationID')),
+    ('type_id', s.Int('typeID')),
+    ('sender_id', s.Int('senderID')),
+    ('timestamp', s.Ts('sentDate')),
+    ('read', s.Bool('read')),
+]).row_parser()
+
+_parse_standing_row = s.Schema([
+    ('id', s.Int('fromID')),
+    ('name', s.Str('fromName')),
+    ('standing', s.Float('standing')),
+]).row_parser()
+
+_parse_research_row = s.Schema([
+    ('id', s.Int('agentID')),
+    ('skill_id', s.Int('skillTypeID')),
+    ('timestamp', s.Ts('researchStartDate')),
+    ('per_day', s.Float('pointsPerDay')),
+    ('remaining', s.Float('remainderPoints')),
+]).row_parser()
+
+_parse_skill_queue_row = s.Schema([
+    ('position', s.Int('queuePosition')),
+    ('type_id', s.Int('typeID')),
+    ('level', s.Int('level')),
+    ('start_sp', s.Int('startSP')),
+    ('end_sp', s.Int('endSP')),
+    ('start_ts', s.Ts('startTime')),
+    ('end_ts', s.Ts('endTime')),
+]).row_parser()
+
+_parse_calendar_event_row = s.Schema([
+    ('id', s.Int('eventID')),
+    ('owner', [
+        ('id', s.Int('ownerID')),
+        ('name', s.Map('ownerName', _or_none)),
+    ]),
+    ('start_ts', s.Ts('eventDate')),
+    ('title', s.Str('eventTitle')),
+    ('duration', s.Int('duration')),
+    ('important', s.Bool('importance')),
+    ('description', s.Str('eventText')),
+    ('response', s.Str('response')),
+]).row_parser()
+
+_parse_attendee_row = s.Schema([
+    ('id', s.Int('characterID')),
+    ('name', s.Str('characterName')),
+    ('response', s.Str('response')),
+]).row_parser()
+
+_parse_contact_notification_row = s.Schema([
+    ('id', s.Int('notificationID')),
+    ('sender', [
+        ('id', s.Int('senderID')),
+        ('name', s.Str('senderName')),
+    ]),
+    ('timestamp', s.Ts('sentDate')),
+    ('data', s.Map('messageData', api.parse_keyval_data)),
+]).row_parser()
+
+_parse_blueprint_row = s.Schema([
+    ('location_id', s.Int('locationID')),
+    ('type_id', s.Int('typeID')),
+    ('type_name', s.Str('typeName')),
+    ('location_flag', s.Int('flagID')),
+    ('quantity', s.Int('quantity')),
+    ('time_efficiency', s.Int('timeEfficiency')),
+    ('material_efficiency', s.Int('materialEfficiency')),
+    ('runs', s.Int('runs')),
+]).row_parser()
 
 
 class auto_call(api.auto_call):
@@ -65,6 +144,24 @@ class Char(object):
 
         return api.APIResult(parse_assets(api_result.result), api_result.timestamp, api_result.expires)
 
+    @auto_call('char/AssetList')
+    def asset_index(self, api_result=None):
+        """Get the same assets as assets(), as an AssetIndex.
+
+        The index finds items by id, type or location, and an item's
+        container or top-level location, without walking the asset
+        tree; see evelink.parsing.assets.AssetIndex.
+        """
+        return api.APIResult(parse_asset_index(api_result.result), api_result.timestamp, api_result.expires)
+
+    def stream_assets(self):
+        """Like assets(), but yields each top-level item as it is parsed.
+
+        The items are not grouped by location; memory use only grows
+        with the size of the largest top-level container.
+        """
+        return api.stream_rows(self, self.assets, parse_assets_row)
+
     @auto_call('char/ContractBids')
     def contract_bids(self, api_result=None):
         """Lists the latest bids that have been made to any recent auctions."""
@@ -75,16 +172,45 @@ class Char(object):
         """Lists items that a specified contract contains"""
         return api.APIResult(parse_contract_items(api_result.result), api_result.timestamp, api_result.expires)
 
-    @auto_call('char/Contracts')
+    @auto_call('char/Contracts', result_modes=('dict', 'records'),
+        record_parser=parse_contracts_records)
     def contracts(self, api_result=None):
         """Returns a record of all contracts for a specified character"""
         return api.APIResult(parse_contracts(api_result.result), api_result.timestamp, api_result.expires)
 
-    @auto_call('char/WalletJournal', map_params={'before_id': 'fromID', 'limit': 'rowCount'})
+    @auto_call('char/WalletJournal', map_params={'before_id': 'fromID', 'limit': 'rowCount'},
+        result_modes=('dict', 'records', 'columns'), record_parser=parse_wallet_journal_records,
+        column_parser=parse_wallet_journal_columns)
     def wallet_journal(self, before_id=None, limit=None, api_result=None):
         """Returns a complete record of all wallet activity for a specified character"""
         return api.APIResult(parse_wallet_journal(api_result.result), api_result.timestamp, api_result.expires)
 
+    def stream_wallet_journal(self, before_id=None, limit=None):
+        """Like wallet_journal(), but yields each entry as it is parsed.
+
+        Entries are yielded in the order of the response rather than
+        sorted by id. Memory use does not grow with the size of the
+        response.
+        """
+        return api.stream_rows(self, self.wallet_journal, parse_wallet_journal_row,
+                               before_id, limit)
+
+    def iter_wallet_journal(self, limit=2560, stop_id=None, stop_ts=None):
+        """Lazily walk back through the character's wallet journal.
+
+        Yields entries in the same format as wallet_journal(), newest
+        first, requesting 'limit' entries at a time as needed.
+
+        stop_id:
+            Optional. Stop at entries with this id or older (e.g. the
+            newest entry seen in a previous run).
+        stop_ts:
+            Optional. Stop at entries older than this timestamp.
+        """
+        return api.walk_pages(
+            lambda before_id: self.stream_wallet_journal(before_id, limit),
+            limit, stop_id=stop_id, stop_ts=stop_ts)
+
     @auto_call('char/AccountBalance')
     def wallet_info(self, api_result=None):
         """Return a given character's wallet."""
@@ -102,17 +228,40 @@ class Char(object):
         api_result = self.wallet_info()
         return api.APIResult(api_result.result['balance'], api_result.timestamp, api_result.expires)
 
-    @auto_call('char/WalletTransactions', map_params={'before_id': 'fromID', 'limit': 'rowCount'})
+    @auto_call('char/WalletTransactions', map_params={'before_id': 'fromID', 'limit': 'rowCount'},
+        result_modes=('dict', 'records', 'columns'), record_parser=parse_wallet_transactions_records,
+        column_parser=parse_wallet_transactions_columns)
     def wallet_transactions(self, before_id=None, limit=None, api_result=None):
         """Returns wallet transactions for a character."""
         return api.APIResult(parse_wallet_transactions(api_result.result), api_result.timestamp, api_result.expires)
 
-    @auto_call('char/IndustryJobs')
+    def stream_wallet_transactions(self, before_id=None, limit=None):
+        """Like wallet_transactions(), but yields each entry as it is parsed.
+
+        Memory use does not grow with the size of the response.
+        """
+        return api.stream_rows(self, self.wallet_transactions, parse_wallet_transactions_row,
+                               before_id, limit)
+
+    def iter_wallet_transactions(self, limit=2560, stop_id=None, stop_ts=None):
+        """Lazily walk back through the character's wallet transactions.
+
+        Yields entries in the same format as wallet_transactions(),
+        newest first, requesting 'limit' entries at a time as needed.
+        See iter_wallet_journal() for 'stop_id' and 'stop_ts'.
+        """
+        return api.walk_pages(
+            lambda before_id: self.stream_wallet_transactions(before_id, limit),
+            limit, stop_id=stop_id, stop_ts=stop_ts)
+
+    @auto_call('char/IndustryJobs', result_modes=('dict', 'records'),
+        record_parser=parse_industry_jobs_records)
     def industry_jobs(self, api_result=None):
         """Get a list of jobs for a character (active only)."""
         return api.APIResult(parse_industry_jobs(api_result.result), api_result.timestamp, api_result.expires)
 
-    @auto_call('char/IndustryJobsHistory')
+    @auto_call('char/IndustryJobsHistory', result_modes=('dict', 'records'),
+        record_parser=parse_industry_jobs_records)
     def industry_jobs_history(self, api_result=None):
         """Get a historical list of industry jobs for a character (active and past)."""
         return api.APIResult(parse_industry_jobs(api_result.result), api_result.timestamp, api_result.expires)
@@ -147,6 +296,30 @@ class Char(object):
 
         return api.APIResult(parse_kills(api_result.result), api_result.timestamp, api_result.expires)
 
+    def stream_kills(self, before_kill=None):
+        """Like kills(), but yields each kill as it is parsed.
+
+        Memory use does not grow with the size of the response.
+        """
+        return api.stream_rows(self, self.kills, parse_kills_row, before_kill)
+
+    def iter_kills(self, stop_kill=None, checkpoint=None):
+        """Lazily walk back through the character's kills, newest first.
+
+        Yields kills in the same format as the values of kills(),
+        paging back through the history via beforeKillID as needed.
+
+        stop_kill:
+            Optional. Stop at kills with this id or older.
+        checkpoint:
+            Optional. An api.Checkpoint (e.g. an api.FileCheckpoint)
+            holding the newest kill id seen by a previous walk. Only
+            newer kills are yielded, and the checkpoint is moved forward
+            once all of them have been consumed.
+        """
+        return api.walk_pages(self.stream_kills, stop_id=stop_kill,
+                              checkpoint=checkpoint)
+
     @auto_call('char/KillLog', map_params={'before_kill': 'beforeKillID'})
     def kill_log(self, before_kill=None, api_result=None):
         """Look up recent kills for a character.
@@ -166,15 +339,8 @@ class Char(object):
         result = {}
         rowset = api_result.result.find('rowset')
         for row in rowset.findall('row'):
-            a = row.attrib
-            notification_id = int(a['notificationID'])
-            result[notification_id] = {
-                'id': notification_id,
-                'type_id': int(a['typeID']),
-                'sender_id': int(a['senderID']),
-                'timestamp': api.parse_ts(a['sentDate']),
-                'read': a['read'] == '1',
-            }
+            notification = _parse_notification_row(row)
+            result[notification['id']] = notification
 
         return api.APIResult(result, api_result.timestamp, api_result.expires)
 
@@ -213,13 +379,8 @@ class Char(object):
         for key, rowset_name in _name_map.items():
             result[key] = {}
             for row in rowsets[rowset_name].findall('row'):
-                a = row.attrib
-                from_id = int(a['fromID'])
-                result[key][from_id] = {
-                    'id': from_id,
-                    'name': a['fromName'],
-                    'standing': float(a['standing']),
-                }
+                standing = _parse_standing_row(row)
+                result[key][standing['id']] = standing
 
         return api.APIResult(result, api_result.timestamp, api_result.expires)
 
@@ -357,7 +518,8 @@ class Char(object):
         """Return a character's personal, corp and alliance contact lists."""
         return api.APIResult(parse_contact_list(api_result.result), api_result.timestamp, api_result.expires)
 
-    @auto_call('char/MarketOrders')
+    @auto_call('char/MarketOrders', result_modes=('dict', 'records', 'columns'),
+        record_parser=parse_market_orders_records, column_parser=parse_market_orders_columns)
     def orders(self, api_result=None):
         """Return a given character's buy and sell orders."""
         return api.APIResult(parse_market_orders(api_result.result), api_result.timestamp, api_result.expires)
@@ -369,15 +531,8 @@ class Char(object):
         rows = rowset.findall('row')
         result = {}
         for row in rows:
-            a = row.attrib
-            id = int(a['agentID'])
-            result[id] = {
-                'id': id,
-                'skill_id': int(a['skillTypeID']),
-                'timestamp': api.parse_ts(a['researchStartDate']),
-                'per_day': float(a['pointsPerDay']),
-                'remaining': float(a['remainderPoints']),
-            }
+            research = _parse_research_row(row)
+            result[research['id']] = research
 
         return api.APIResult(result, api_result.timestamp, api_result.expires)
 
@@ -405,18 +560,7 @@ class Char(object):
         rows = rowset.findall('row')
         result = []
         for row in rows:
-            a = row.attrib
-            line = {
-                'position': int(a['queuePosition']),
-                'type_id': int(a['typeID']),
-                'level': int(a['level']),
-                'start_sp': int(a['startSP']),
-                'end_sp': int(a['endSP']),
-                'start_ts': api.parse_ts(a['startTime']),
-                'end_ts': api.parse_ts(a['endTime']),
-            }
-
-            result.append(line)
+            result.append(_parse_skill_queue_row(row))
 
         return api.APIResult(result, api_result.timestamp, api_result.expires)
 
@@ -488,20 +632,7 @@ class Char(object):
         results = {}
         rowset = api_result.result.find('rowset')
         for row in rowset.findall('row'):
-            a = row.attrib
-            event = {
-                'id': int(a['eventID']),
-                'owner': {
-                    'id': int(a['ownerID']),
-                    'name': a['ownerName'] or None,
-                },
-                'start_ts': api.parse_ts(a['eventDate']),
-                'title': a['eventTitle'],
-                'duration': int(a['duration']),
-                'important': a['importance'] == '1',
-                'description': a['eventText'],
-                'response': a['response'],
-            }
+            event = _parse_calendar_event_row(row)
             results[event['id']] = event
 
         return api.APIResult(results, api_result.timestamp, api_result.expires)
@@ -521,13 +652,8 @@ class Char(object):
         results = dict((int(i),{}) for i in event_ids)
         rowset = api_result.result.find('rowset')
         for row in rowset.findall('row'):
-            a = row.attrib
-            attendee = {
-                'id': int(a['characterID']),
-                'name': a['characterName'],
-                'response': a['response'],
-            }
-            results[int(a['eventID'])][attendee['id']] = attendee
+            attendee = _parse_attendee_row(row)
+            results[int(row.attrib['eventID'])][attendee['id']] = attendee
 
         return api.APIResult(results, api_result.timestamp, api_result.expires)
 
@@ -609,16 +735,7 @@ class Char(object):
         results = {}
         rowset = api_result.result.find('rowset')
         for row in rowset.findall('row'):
-            a = row.attrib
-            note = {
-                'id': int(a['notificationID']),
-                'sender': {
-                    'id': int(a['senderID']),
-                    'name': a['senderName'],
-                },
-                'timestamp': api.parse_ts(a['sentDate']),
-                'data': api.parse_keyval_data(a['messageData']),
-            }
+            note = _parse_contact_notification_row(row)
             results[note['id']] = note
 
         return api.APIResult(results, api_result.timestamp, api_result.expires)
@@ -652,16 +769,7 @@ class Char(object):
 
         results = {}
         for row in rows:
-            results[int(row.attrib['itemID'])] = {
-                'location_id': int(row.attrib['locationID']),
-                'type_id': int(row.attrib['typeID']),
-                'type_name': row.attrib['typeName'],
-                'location_flag': int(row.attrib['flagID']),
-                'quantity': int(row.attrib['quantity']),
-                'time_efficiency': int(row.attrib['timeEfficiency']),
-                'material_efficiency': int(row.attrib['materialEfficiency']),
-                'runs': int(row.attrib['runs']),
-            }
+            results[int(row.attrib['itemID'])] = _parse_blueprint_row(row)
 
         return api.APIResult(results, api_result.timestamp, api_result.expires)
 
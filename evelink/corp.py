@@ -1,14 +1,55 @@
 from evelink import api, constants
-from evelink.parsing.assets import parse_assets
+from evelink.parsing.assets import parse_asset_index, parse_assets, parse_assets_row
 from evelink.parsing.contact_list import parse_contact_list
 from evelink.parsing.contract_bids import parse_contract_bids
 from evelink.parsing.contract_items import parse_contract_items
-from evelink.parsing.contracts import parse_contracts
-from evelink.parsing.industry_jobs import parse_industry_jobs
-from evelink.parsing.kills import parse_kills
-from evelink.parsing.orders import parse_market_orders
-from evelink.parsing.wallet_journal import parse_wallet_journal
-from evelink.parsing.wallet_transactions import parse_wallet_transactions
+from evelink.parsing.contracts import parse_contracts, parse_contracts_records
+from evelink.parsing.industry_jobs import parse_industry_jobs, parse_industry_jobs_records
+from evelink.parsing.kills import parse_kills, parse_kills_row
+from evelink.parsing.orders import parse_market_orders, parse_market_orders_columns, parse_market_orders_records
+from evelink.parsing.wallet_journal import parse_wallet_journal, parse_wallet_journal_columns, parse_wallet_journal_records, parse_wallet_journal_row
+from evelink.parsing.wallet_transactions import parse_wallet_transactions, parse_wallet_transactions_columns, parse_wallet_transactions_records, parse_wallet_transactions_row
+from evelink.parsing import schema as s
+
+
+_MEMBER_FIELDS = [
+    ('id', s.Int('characterID')),
+    ('name', s.Str('name')),
+    ('join_ts', s.Ts('startDateTime')),
+    ('base', [
+        # TODO(aiiane): Maybe remove this?
+        # It doesn't seem to ever have a useful value.
+        ('id', s.Int('baseID')),
+        ('name', s.Str('base')),
+    ]),
+    # Note that title does not include role titles,
+    # only ones like 'CEO'
+    ('title', s.Str('title')),
+]
+
+_parse_member_row = s.Schema(_MEMBER_FIELDS).row_parser()
+
+_parse_extended_member_row = s.Schema(_MEMBER_FIELDS + [
+    ('logon_ts', s.Ts('logonDateTime')),
+    ('logoff_ts', s.Ts('logoffDateTime')),
+    ('location', [
+        ('id', s.Int('locationID')),
+        ('name', s.Str('location')),
+    ]),
+    ('ship_type', [
+        # "Not available" = -1 ship id; we change to None
+        ('id', s.Map('shipTypeID', lambda v: max(int(v), 0) or None)),
+        ('name', s.Map('shipType', lambda v: v or None)),
+    ]),
+    ('roles', s.Int('roles')),
+    ('can_grant', s.Int('grantableRoles')),
+]).row_parser()
+
+
+def _parse_members_row(row, extended):
+    if extended:
+        return _parse_extended_member_row(row)
+    return _parse_member_row(row)
 
 
 class Corp(object):
@@ -91,12 +132,14 @@ class Corp(object):
 
         return api.APIResult(result, api_result.timestamp, api_result.expires)
 
-    @api.auto_call('corp/IndustryJobs')
+    @api.auto_call('corp/IndustryJobs', result_modes=('dict', 'records'),
+        record_parser=parse_industry_jobs_records)
     def industry_jobs(self, api_result=None):
         """Get a list of jobs for a corporation (active only)."""
         return api.APIResult(parse_industry_jobs(api_result.result), api_result.timestamp, api_result.expires)
 
-    @api.auto_call('corp/IndustryJobsHistory')
+    @api.auto_call('corp/IndustryJobsHistory', result_modes=('dict', 'records'),
+        record_parser=parse_industry_jobs_records)
     def industry_jobs_history(self, api_result=None):
         """Get the industry job history for a corporation (active and past)."""
         return api.APIResult(parse_industry_jobs(api_result.result), api_result.timestamp, api_result.expires)
@@ -146,6 +189,23 @@ class Corp(object):
 
         return api.APIResult(parse_kills(api_result.result), api_result.timestamp, api_result.expires)
 
+    def iter_kills(self, stop_kill=None, checkpoint=None):
+        """Lazily walk back through the corporation's kills, newest first.
+
+        Yields kills in the same format as the values of kills(),
+        paging back through the history via beforeKillID as needed.
+
+        stop_kill:
+            Optional. Stop at kills with this id or older.
+        checkpoint:
+            Optional. An api.Checkpoint (e.g. an api.FileCheckpoint)
+            holding the newest kill id seen by a previous walk. Only
+            newer kills are yielded, and the checkpoint is moved forward
+            once all of them have been consumed.
+        """
+        return api.walk_pages(self.stream_kills, stop_id=stop_kill,
+                              checkpoint=checkpoint)
+
     @api.auto_call('corp/KillLog', map_params={'before_kill': 'beforeKillID'})
     def kill_log(self, before_kill=None, api_result=None):
         """Look up recent kills for a corporation.
@@ -159,6 +219,13 @@ class Corp(object):
 
         return api.APIResult(parse_kills(api_result.result), api_result.timestamp, api_result.expires)
 
+    def stream_kills(self, before_kill=None):
+        """Like kills(), but yields each kill as it is parsed.
+
+        Memory use does not grow with the size of the response.
+        """
+        return api.stream_rows(self, self.kills, parse_kills_row, before_kill)
+
     @api.auto_call('corp/AccountBalance')
     def wallet_info(self, api_result=None):
         """Get information about corp wallets."""
@@ -174,17 +241,67 @@ class Corp(object):
 
         return api.APIResult(results, api_result.timestamp, api_result.expires)
 
-    @api.auto_call('corp/WalletJournal', map_params={'before_id': 'fromID', 'limit': 'rowCount', 'account': 'accountKey'})
+    @api.auto_call('corp/WalletJournal', map_params={'before_id': 'fromID', 'limit': 'rowCount', 'account': 'accountKey'},
+        result_modes=('dict', 'records', 'columns'), record_parser=parse_wallet_journal_records,
+        column_parser=parse_wallet_journal_columns)
     def wallet_journal(self, before_id=None, limit=None, account=None, api_result=None):
         """Returns wallet journal for a corporation."""
         return api.APIResult(parse_wallet_journal(api_result.result), api_result.timestamp, api_result.expires)
 
-    @api.auto_call('corp/WalletTransactions', map_params={'before_id': 'fromID', 'limit': 'rowCount', 'account': 'accountKey'})
+    @api.auto_call('corp/WalletTransactions', map_params={'before_id': 'fromID', 'limit': 'rowCount', 'account': 'accountKey'},
+        result_modes=('dict', 'records', 'columns'), record_parser=parse_wallet_transactions_records,
+        column_parser=parse_wallet_transactions_columns)
     def wallet_transactions(self, before_id=None, limit=None, account=None, api_result=None):
         """Returns wallet transactions for a corporation."""
         return api.APIResult(parse_wallet_transactions(api_result.result), api_result.timestamp, api_result.expires)
 
-    @api.auto_call('corp/MarketOrders')
+    def stream_wallet_journal(self, before_id=None, limit=None, account=None):
+        """Like wallet_journal(), but yields each entry as it is parsed.
+
+        Entries are yielded in the order of the response rather than
+        sorted by id. Memory use does not grow with the size of the
+        response.
+        """
+        return api.stream_rows(self, self.wallet_journal, parse_wallet_journal_row,
+                               before_id, limit, account)
+
+    def stream_wallet_transactions(self, before_id=None, limit=None, account=None):
+        """Like wallet_transactions(), but yields each entry as it is parsed.
+
+        Memory use does not grow with the size of the response.
+        """
+        return api.stream_rows(self, self.wallet_transactions, parse_wallet_transactions_row,
+                               before_id, limit, account)
+
+    def iter_wallet_journal(self, account=None, limit=2560, stop_id=None, stop_ts=None):
+        """Lazily walk back through a corporation wallet's journal.
+
+        Yields entries in the same format as wallet_journal(), newest
+        first, requesting 'limit' entries at a time as needed.
+
+        stop_id:
+            Optional. Stop at entries with this id or older (e.g. the
+            newest entry seen in a previous run).
+        stop_ts:
+            Optional. Stop at entries older than this timestamp.
+        """
+        return api.walk_pages(
+            lambda before_id: self.stream_wallet_journal(before_id, limit, account),
+            limit, stop_id=stop_id, stop_ts=stop_ts)
+
+    def iter_wallet_transactions(self, account=None, limit=2560, stop_id=None, stop_ts=None):
+        """Lazily walk back through a corporation wallet's transactions.
+
+        Yields entries in the same format as wallet_transactions(),
+        newest first, requesting 'limit' entries at a time as needed.
+        See iter_wallet_journal() for 'stop_id' and 'stop_ts'.
+        """
+        return api.walk_pages(
+            lambda before_id: self.stream_wallet_transactions(before_id, limit, account),
+            limit, stop_id=stop_id, stop_ts=stop_ts)
+
+    @api.auto_call('corp/MarketOrders', result_modes=('dict', 'records', 'columns'),
+        record_parser=parse_market_orders_records, column_parser=parse_market_orders_columns)
     def orders(self, api_result=None):
         """Return a corporation's buy and sell orders."""
         return api.APIResult(parse_market_orders(api_result.result), api_result.timestamp, api_result.expires)
@@ -215,6 +332,24 @@ class Corp(object):
 
         return api.APIResult(parse_assets(api_result.result), api_result.timestamp, api_result.expires)
 
+    @api.auto_call('corp/AssetList')
+    def asset_index(self, api_result=None):
+        """Get the same assets as assets(), as an AssetIndex.
+
+        The index finds items by id, type or location, and an item's
+        container or top-level location, without walking the asset
+        tree; see evelink.parsing.assets.AssetIndex.
+        """
+        return api.APIResult(parse_asset_index(api_result.result), api_result.timestamp, api_result.expires)
+
+    def stream_assets(self):
+        """Like assets(), but yields each top-level item as it is parsed.
+
+        The items are not grouped by location; memory use only grows
+        with the size of the largest top-level container.
+        """
+        return api.stream_rows(self, self.assets, parse_assets_row)
+
     @api.auto_call('corp/FacWarStats')
     def faction_warfare_stats(self, api_result=None):
         """Returns stats from faction warfare if this corp is enrolled.
@@ -256,7 +391,8 @@ class Corp(object):
         """Lists items that a specified contract contains"""
         return api.APIResult(parse_contract_items(api_result.result), api_result.timestamp, api_result.expires)
 
-    @api.auto_call('corp/Contracts')
+    @api.auto_call('corp/Contracts', result_modes=('dict', 'records'),
+        record_parser=parse_contracts_records)
     def contracts(self, api_result=None):
         """Get information about corp contracts."""
         return api.APIResult(parse_contracts(api_result.result), api_result.timestamp, api_result.expires)
@@ -458,42 +594,22 @@ class Corp(object):
         rowset = api_result.result.find('rowset')
         results = {}
         for row in rowset.findall('row'):
-            a = row.attrib
-            member = {
-                'id': int(a['characterID']),
-                'name': a['name'],
-                'join_ts': api.parse_ts(a['startDateTime']),
-                'base': {
-                    # TODO(aiiane): Maybe remove this?
-                    # It doesn't seem to ever have a useful value.
-                    'id': int(a['baseID']),
-                    'name': a['base'],
-                },
-                # Note that title does not include role titles,
-                # only ones like 'CEO'
-                'title': a['title'],
-            }
-            if extended:
-                member.update({
-                    'logon_ts': api.parse_ts(a['logonDateTime']),
-                    'logoff_ts': api.parse_ts(a['logoffDateTime']),
-                    'location': {
-                        'id': int(a['locationID']),
-                        'name': a['location'],
-                    },
-                    'ship_type': {
-                        # "Not available" = -1 ship id; we change to None
-                        'id': max(int(a['shipTypeID']), 0) or None,
-                        'name': a['shipType'] or None,
-                    },
-                    'roles': int(a['roles']),
-                    'can_grant': int(a['grantableRoles']),
-                })
-
+            member = _parse_members_row(row, extended)
             results[member['id']] = member
 
         return api.APIResult(results, api_result.timestamp, api_result.expires)
 
+    def stream_members(self, extended=True):
+        """Like members(), but yields each member as it is parsed.
+
+        Memory use does not grow with the size of the corporation.
+        """
+        args = {}
+        if extended:
+            args['extended'] = 1
+        for row in self.api.iter_rows('corp/MemberTracking', params=args):
+            yield _parse_members_row(row, extended)
+
     @api.auto_call('corp/MemberSecurity')
     def permissions(self, api_result=None):
         """Returns information about corporation member permissions."""
@@ -1,4 +1,25 @@
 from evelink import api
+from evelink.parsing import schema as s
+
+_parse_employment_row = s.Schema([
+    ('corp_id', s.Int('corporationID')),
+    ('corp_name', s.Str('corporationName')),
+    ('start_ts', s.Ts('startDate')),
+]).row_parser()
+
+_parse_alliance_row = s.Schema([
+    ('name', s.Str('name')),
+    ('ticker', s.Str('shortName')),
+    ('id', s.Int('allianceID')),
+    ('executor_id', s.Int('executorCorpID')),
+    ('member_count', s.Int('memberCount')),
+    ('timestamp', s.Ts('startDate')),
+]).row_parser()
+
+_parse_member_corp_row = s.Schema([
+    ('id', s.Int('corporationID')),
+    ('timestamp', s.Ts('startDate')),
+]).row_parser()
 
 class EVE(object):
     """Wrapper around /eve/ of the EVE API."""
@@ -169,14 +190,7 @@ class EVE(object):
         # Add in corp history
         history = api_result.result.find('rowset')
         for row in history.findall('row'):
-            corp_id = int(row.attrib['corporationID'])
-            corp_name = row.attrib['corporationName']
-            start_date = api.parse_ts(row.attrib['startDate'])
-            results['history'].append({
-                    'corp_id': corp_id,
-                    'corp_name': corp_name,
-                    'start_ts': start_date,
-                })
+            results['history'].append(_parse_employment_row(row))
 
         return api.APIResult(results, api_result.timestamp, api_result.expires)
 
@@ -186,24 +200,13 @@ class EVE(object):
         results = {}
         rowset = api_result.result.find('rowset')
         for row in rowset.findall('row'):
-            alliance = {
-                'name': row.attrib['name'],
-                'ticker': row.attrib['shortName'],
-                'id': int(row.attrib['allianceID']),
-                'executor_id': int(row.attrib['executorCorpID']),
-                'member_count': int(row.attrib['memberCount']),
-                'timestamp': api.parse_ts(row.attrib['startDate']),
-                'member_corps': {},
-            }
+            alliance = _parse_alliance_row(row)
+            alliance['member_corps'] = {}
 
             corp_rowset = row.find('rowset')
             for corp_row in corp_rowset.findall('row'):
-                corp_id = int(corp_row.attrib['corporationID'])
-                corp_ts = api.parse_ts(corp_row.attrib['startDate'])
-                alliance['member_corps'][corp_id] = {
-                    'id': corp_id,
-                    'timestamp': corp_ts,
-                }
+                corp = _parse_member_corp_row(corp_row)
+                alliance['member_corps'][corp['id']] = corp
 
             results[alliance['id']] = alliance
 
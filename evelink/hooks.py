@@ -0,0 +1,41 @@
+"""Hooks for observing the requests made by an API object.
+
+Subclass Hooks, overriding whichever methods are of interest, and pass
+instances to API(..., hooks=[...]) (or append them to its 'hooks' list)
+to attach profilers, tracing or slow-call logging. Each method gets the
+API path (e.g. "corp/AssetList") and the request's key: a hash of its
+path and parameters, as used for caching. Exceptions raised by hooks
+are logged and otherwise ignored.
+
+For a call to a wrapped method, the hooks are called in this order:
+
+- before_request(path, key), as the API object starts on the request.
+- after_fetch(path, key, seconds, cached), once the response body has
+  been found in the cache (cached is True) or fetched from the API.
+- after_xml_parse(path, key, seconds), once the body has been parsed.
+- after_result_parse(path, key, seconds), once the wrapped method has
+  turned the XML into its result.
+
+Calls served from the API's result_cache make no request, so call none
+of them, and API.iter_rows doesn't call after_xml_parse as parsing is
+interleaved with consuming its rows.
+"""
+
+
+class Hooks(object):
+    """Base class for request hooks; every method does nothing."""
+
+    def before_request(self, path, key):
+        pass
+
+    def after_fetch(self, path, key, seconds, cached):
+        pass
+
+    def after_xml_parse(self, path, key, seconds):
+        pass
+
+    def after_result_parse(self, path, key, seconds):
+        pass
+
+
+# vim: set ts=4 sts=4 sw=4 et:
@@ -0,0 +1,165 @@
+"""Counters and latency histograms for EVE API calls.
+
+Pass a Metrics object to API(..., metrics=...) to have it record, for
+each API path (e.g. "corp/AssetList"):
+
+- cache_hits_total, cache_misses_total, cache_stale_total: lookups of
+  responses in the API's cache (stale hits are expired responses served
+  while being refreshed).
+- cache_bytes_stored_total: size of the responses written to the cache.
+- cache_get_seconds, cache_put_seconds: time spent in the cache, also
+  broken down by the cache's class.
+- http_requests_total, http_request_seconds: requests made to the API.
+- api_errors_total: error responses, also broken down by error code.
+- xml_parse_seconds, result_parse_seconds: time spent parsing response
+  XML, and turning it into the results of wrapped methods.
+- result_cache_hits_total, result_cache_misses_total: lookups in the
+  API's result_cache.
+
+Values can be read with counter() and histogram(), or exported in the
+Prometheus text format with to_prometheus().
+"""
+
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_HELP = {
+    'api_errors_total': 'Error responses returned by the API.',
+    'cache_bytes_stored_total': 'Bytes of responses written to the cache.',
+    'cache_get_seconds': 'Time spent looking up responses in the cache.',
+    'cache_hits_total': 'Responses found in the cache.',
+    'cache_misses_total': 'Responses not found in the cache.',
+    'cache_put_seconds': 'Time spent writing responses to the cache.',
+    'cache_stale_total': 'Expired responses served from the cache while being refreshed.',
+    'http_request_seconds': 'Time spent making requests to the API.',
+    'http_requests_total': 'Requests made to the API.',
+    'result_cache_hits_total': 'Parsed results found in the result cache.',
+    'result_cache_misses_total': 'Parsed results not found in the result cache.',
+    'result_parse_seconds': 'Time spent turning response XML into results.',
+    'xml_parse_seconds': 'Time spent parsing response XML.',
+}
+
+
+class Histogram(object):
+    """Counts of observed values falling into each of a set of buckets."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """Return (upper bound, count of values <= it) pairs, ending with
+        (float('inf'), count)."""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append((float('inf'), self.count))
+        return result
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (k, _escape(v)) for k, v in labels)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics(object):
+    """A thread-safe collection of labelled counters and histograms."""
+
+    def __init__(self, prefix='evelink', buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        """Add 'value' to the counter 'name' with the given labels."""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Record 'value' in the histogram 'name' with the given labels."""
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def counter(self, name, **labels):
+        """Return the value of a counter (0 if it was never incremented)."""
+        with self._lock:
+            return self._counters.get((name, _labels_key(labels)), 0)
+
+    def histogram(self, name, **labels):
+        """Return a histogram, or None if nothing was recorded in it."""
+        with self._lock:
+            return self._histograms.get((name, _labels_key(labels)))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def to_prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (h.cumulative_counts(), h.sum, h.count))
+                                for key, h in self._histograms.items())
+
+        lines = []
+        last_name = None
+        for (name, labels), value in counters:
+            full_name = '%s_%s' % (self.prefix, name)
+            if name != last_name:
+                lines.append('# HELP %s %s' % (full_name, _HELP.get(name, name)))
+                lines.append('# TYPE %s counter' % full_name)
+                last_name = name
+            lines.append('%s%s %s' % (full_name, _format_labels(labels), _format_value(value)))
+
+        for (name, labels), (buckets, total, count) in histograms:
+            full_name = '%s_%s' % (self.prefix, name)
+            if name != last_name:
+                lines.append('# HELP %s %s' % (full_name, _HELP.get(name, name)))
+                lines.append('# TYPE %s histogram' % full_name)
+                last_name = name
+            for bound, bucket_count in buckets:
+                bucket_labels = labels + (('le', _format_value(bound)),)
+                lines.append('%s_bucket%s %d' % (full_name, _format_labels(bucket_labels), bucket_count))
+            lines.append('%s_sum%s %s' % (full_name, _format_labels(labels), _format_value(total)))
+            lines.append('%s_count%s %d' % (full_name, _format_labels(labels), count))
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+# vim: set ts=4 sts=4 sw=4 et:
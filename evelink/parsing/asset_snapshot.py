@@ -0,0 +1,195 @@
+"""Compact snapshots of asset lists, and diffs between them.
+
+    old = AssetSnapshot.load('assets.snap')
+    new = AssetSnapshot.from_index(corp.asset_index().result)
+    changes = diff_assets(old, new)
+    new.save('assets.snap')
+
+A snapshot only holds a few numbers per item, in arrays sorted by item
+id, so that two of them can be compared in a single pass and kept (or
+saved) without the asset tree they were taken from.
+"""
+
+import array
+import os
+import struct
+import sys
+import tempfile
+
+from evelink.parsing import columns
+
+# Files hold a header, then each column in turn as little-endian 64-bit
+# ints, whatever the platform: item ids don't fit in 32 bits.
+_HEADER = struct.Struct('<4sQB')
+_MAGIC = b'EAS2'
+_ITEM_SIZE = 8
+_CHUNK = 4096
+_FIELDS = ('item_type_id', 'location_id', 'container_id', 'location_flag', 'quantity')
+
+_INT64 = columns.int64_typecode()
+
+
+def _column():
+    """An empty column: a 64-bit array, or a list if there is no such
+    array type."""
+    return array.array(_INT64) if _INT64 is not None else []
+
+
+def _write_column(f, column):
+    if _INT64 is not None:
+        if sys.byteorder == 'big':
+            column = array.array(_INT64, column)
+            column.byteswap()
+        column.tofile(f)
+        return
+    for start in range(0, len(column), _CHUNK):
+        chunk = column[start:start + _CHUNK]
+        f.write(struct.pack('<%dq' % len(chunk), *chunk))
+
+
+def _read_column(f, column, count, path):
+    data = f.read(count * _ITEM_SIZE)
+    if len(data) != count * _ITEM_SIZE:
+        raise ValueError("%s is truncated." % path)
+    if _INT64 is not None:
+        # frombytes() is called fromstring() in Python 2.
+        (getattr(column, 'frombytes', None) or column.fromstring)(data)
+        if sys.byteorder == 'big':
+            column.byteswap()
+    else:
+        column.extend(struct.unpack('<%dq' % count, data))
+
+_replace = getattr(os, 'replace', os.rename)
+
+
+class AssetSnapshot(object):
+    """The id, type, location, container, flag and quantity of every
+    item in an asset list.
+
+    container_id is the id of the item an item is in, or 0 for items at
+    the top level.
+    """
+
+    def __init__(self, rows=()):
+        self.ids = _column()
+        self.columns = dict((name, _column()) for name in _FIELDS)
+        for row in sorted(rows):
+            self.ids.append(row[0])
+            for name, value in zip(_FIELDS, row[1:]):
+                self.columns[name].append(value)
+
+    @classmethod
+    def from_index(cls, index):
+        """Take a snapshot of an AssetIndex."""
+        rows = []
+        for item in index:
+            parent = index.parent(item['id'])
+            rows.append((item['id'], item['item_type_id'], item['location_id'],
+                         parent['id'] if parent is not None else 0,
+                         item['location_flag'], item['quantity']))
+        return cls(rows)
+
+    @classmethod
+    def from_assets(cls, assets):
+        """Take a snapshot of parse_assets' results."""
+        rows = []
+        stack = [(item, 0) for location in assets.values() for item in location['contents']]
+        while stack:
+            item, container_id = stack.pop()
+            rows.append((item['id'], item['item_type_id'], item['location_id'],
+                         container_id, item['location_flag'], item['quantity']))
+            stack.extend((child, item['id']) for child in item.get('contents', ()))
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def item(self, index):
+        """Return the item at position 'index' (not an item id) as a dict."""
+        item = dict((name, self.columns[name][index]) for name in _FIELDS)
+        item['id'] = self.ids[index]
+        return item
+
+    def save(self, path):
+        """Write the snapshot to a file, replacing it whole."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, len(self.ids), _ITEM_SIZE))
+                for column in [self.ids] + [self.columns[name] for name in _FIELDS]:
+                    _write_column(f, column)
+            _replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot written by save()."""
+        snapshot = cls()
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ValueError("%s is not an asset snapshot." % path)
+            magic, count, item_size = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError("%s is not an asset snapshot." % path)
+            if item_size != _ITEM_SIZE:
+                raise ValueError("%s holds %d-byte ints, not %d-byte ones." % (
+                    path, item_size, _ITEM_SIZE))
+            for column in [snapshot.ids] + [snapshot.columns[name] for name in _FIELDS]:
+                _read_column(f, column, count, path)
+        return snapshot
+
+
+def diff_assets(old, new):
+    """Compare two AssetSnapshots.
+
+    Returns a dict of:
+
+    - 'added': items only in 'new'.
+    - 'removed': items only in 'old'.
+    - 'moved': (old item, new item) pairs for items whose location,
+      container or location flag changed.
+    - 'quantity_changed': (old item, new item) pairs for items whose
+      quantity changed.
+
+    Items are dicts as returned by AssetSnapshot.item(). An item which
+    both moved and changed quantity is in both lists.
+    """
+    added, removed, moved, quantity_changed = [], [], [], []
+    old_ids, new_ids = old.ids, new.ids
+    old_count, new_count = len(old_ids), len(new_ids)
+    old_columns = [old.columns[name] for name in _FIELDS[1:4]]
+    new_columns = [new.columns[name] for name in _FIELDS[1:4]]
+    old_quantities, new_quantities = old.columns['quantity'], new.columns['quantity']
+
+    i = j = 0
+    while i < old_count and j < new_count:
+        old_id, new_id = old_ids[i], new_ids[j]
+        if old_id == new_id:
+            if any(o[i] != n[j] for o, n in zip(old_columns, new_columns)):
+                moved.append((old.item(i), new.item(j)))
+            if old_quantities[i] != new_quantities[j]:
+                quantity_changed.append((old.item(i), new.item(j)))
+            i += 1
+            j += 1
+        elif old_id < new_id:
+            removed.append(old.item(i))
+            i += 1
+        else:
+            added.append(new.item(j))
+            j += 1
+    removed.extend(old.item(k) for k in range(i, old_count))
+    added.extend(new.item(k) for k in range(j, new_count))
+
+    return {
+        'added': added,
+        'removed': removed,
+        'moved': moved,
+        'quantity_changed': quantity_changed,
+    }
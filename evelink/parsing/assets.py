@@ -1,24 +1,29 @@
+def _parse_item(row, parent_location):
+    item = {'id': int(row.attrib['itemID']),
+            'item_type_id': int(row.attrib['typeID']),
+            'location_id': int(row.attrib.get('locationID', parent_location)),
+            'location_flag': int(row.attrib['flag']),
+            'quantity': int(row.attrib['quantity']),
+            'packaged': row.attrib['singleton'] == '0',
+    }
+    raw_quantity = row.attrib.get('rawQuantity')
+    if raw_quantity is not None:
+        item['raw_quantity'] = int(raw_quantity)
+    return item
+
+
+def parse_assets_row(row, parent_location=None):
+    item = _parse_item(row, parent_location)
+    contents = row.find('rowset')
+    if contents is not None:
+        item['contents'] = [parse_assets_row(r, item['location_id'])
+                            for r in contents.findall('row')]
+    return item
+
+
 def parse_assets(api_result):
-    def handle_rowset(rowset, parent_location):
-        results = []
-        for row in rowset.findall('row'):
-            item = {'id': int(row.attrib['itemID']),
-                    'item_type_id': int(row.attrib['typeID']),
-                    'location_id': int(row.attrib.get('locationID', parent_location)),
-                    'location_flag': int(row.attrib['flag']),
-                    'quantity': int(row.attrib['quantity']),
-                    'packaged': row.attrib['singleton'] == '0',
-            }
-            raw_quantity = row.attrib.get('rawQuantity')
-            if raw_quantity is not None:
-                item['raw_quantity'] = int(raw_quantity)
-            contents = row.find('rowset')
-            if contents is not None:
-                item['contents'] = handle_rowset(contents, item['location_id'])
-            results.append(item)
-        return results
-
-    result_list = handle_rowset(api_result.find('rowset'), None)
+    result_list = [parse_assets_row(row)
+                   for row in api_result.find('rowset').findall('row')]
     # For convenience, key the result by top-level location ID.
     result_dict = {}
     for item in result_list:
@@ -28,3 +33,109 @@ def parse_assets(api_result):
         result_dict[location].setdefault('contents', [])
         result_dict[location]['contents'].append(item)
     return result_dict
+
+
+class AssetIndex(object):
+    """An asset list, indexed for constant time lookups.
+
+    Items are the same dicts as in parse_assets' results, containers
+    included ('contents' and all). The index can be looked up by item
+    id (index[item_id], index.get(item_id), 'in'), and iterated over to
+    get every item, nested ones included. The lists returned by its
+    methods are shared, and must not be modified.
+    """
+
+    def __init__(self):
+        self.roots = []
+        self._items = {}
+        self._parents = {}
+        self._root_ids = {}
+        self._by_type = {}
+        self._by_location = {}
+        self._quantities = {}
+
+    def add_row(self, row, parent=None):
+        """Parse an asset list row, and any rows nested in it, adding
+        them to the index under 'parent' (an item already in it, or
+        None for a top-level row). Returns the new item."""
+        item = _parse_item(row, parent['location_id'] if parent is not None else None)
+        item_id = item['id']
+        self._items[item_id] = item
+        if parent is None:
+            self.roots.append(item)
+            self._parents[item_id] = None
+            self._root_ids[item_id] = item_id
+        else:
+            self._parents[item_id] = parent['id']
+            self._root_ids[item_id] = self._root_ids[parent['id']]
+        self._by_type.setdefault(item['item_type_id'], []).append(item)
+        self._by_location.setdefault(item['location_id'], []).append(item)
+
+        contents = row.find('rowset')
+        if contents is not None:
+            item['contents'] = [self.add_row(r, item) for r in contents.findall('row')]
+            quantities = self._quantities[item_id] = {}
+            for child in item['contents']:
+                type_id = child['item_type_id']
+                quantities[type_id] = quantities.get(type_id, 0) + child['quantity']
+                for type_id, quantity in self._quantities.get(child['id'], {}).items():
+                    quantities[type_id] = quantities.get(type_id, 0) + quantity
+        return item
+
+    def __getitem__(self, item_id):
+        return self._items[item_id]
+
+    def get(self, item_id, default=None):
+        return self._items.get(item_id, default)
+
+    def __contains__(self, item_id):
+        return item_id in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def parent(self, item_id):
+        """Return the container an item is in, or None if it is at the
+        top level."""
+        parent_id = self._parents[item_id]
+        return self._items[parent_id] if parent_id is not None else None
+
+    def root(self, item_id):
+        """Return the top-level item an item is (eventually) in, or the
+        item itself if it is at the top level."""
+        return self._items[self._root_ids[item_id]]
+
+    def root_location(self, item_id):
+        """Return the location_id of the top-level item an item is in."""
+        return self.root(item_id)['location_id']
+
+    def of_type(self, type_id):
+        """Return all items of a type, at any level."""
+        return self._by_type.get(type_id, [])
+
+    def at_location(self, location_id):
+        """Return all items at a location, at any level."""
+        return self._by_location.get(location_id, [])
+
+    def quantities(self, item_id):
+        """Return a dict of type ids to the total quantity of items of
+        that type in a container, at any level below it."""
+        return self._quantities.get(item_id, {})
+
+    def walk(self, item_id):
+        """Iterate over an item and everything in it, depth first."""
+        stack = [self._items[item_id]]
+        while stack:
+            item = stack.pop()
+            yield item
+            stack.extend(reversed(item.get('contents', ())))
+
+
+def parse_asset_index(api_result):
+    index = AssetIndex()
+    for row in api_result.find('rowset').findall('row'):
+        index.add_row(row)
+    return index
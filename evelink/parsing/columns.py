@@ -0,0 +1,147 @@
+"""Columnar parsing of API results.
+
+In the 'columns' result mode (see API's result_mode), methods which
+support it return a Columns object instead of a list or dict of rows:
+a dict mapping each field name to a column holding that field's value
+for every row, in row order. Nested fields are named by their path,
+e.g. 'party_1.name'. Numbers and timestamps are stored in typed
+array.array columns, and strings in lists of interned strings, so
+that a response of many thousands of rows takes a handful of objects
+rather than a dict per row. Empty or missing timestamps, which are None
+in dict rows, are stored as 0, as typed columns can't hold None:
+
+    journal = corp.wallet_journal(result_mode='columns').result
+    total = sum(journal['amount'])
+
+With NumPy installed, to_numpy() returns the columns as NumPy arrays,
+the numeric ones sharing memory with the array.array columns.
+"""
+
+import array
+
+try:
+    from sys import intern as _intern
+except ImportError:
+    # Python 2 has it as a builtin
+    _intern = intern
+
+from evelink import api
+
+try:
+    import numpy
+    _has_numpy = True
+except ImportError:
+    _has_numpy = False
+
+
+def int64_typecode():
+    """The array.array typecode for 64-bit ints, or None if there is
+    none. 'q' is missing before Python 3.3, and 'l' is only 64 bits wide
+    on some platforms (not Windows, nor 32-bit builds)."""
+    for typecode in ('q', 'l'):
+        try:
+            if array.array(typecode).itemsize == 8:
+                return typecode
+        except ValueError:
+            pass
+    return None
+
+# Without a 64-bit typecode, int columns are lists: ids such as journal
+# refIDs don't fit in 32 bits.
+_INT64 = int64_typecode()
+
+# Column kinds: the array.array typecode to store values in (None for a
+# list), and how to convert attribute values.
+def intern_string(value):
+    """Intern 'value' if it is a native string. Python 2's intern()
+    rejects unicode strings, which ElementTree returns for non-ASCII
+    text; those are left as they are."""
+    if isinstance(value, str):
+        return _intern(value)
+    return value
+
+
+def parse_ts(value):
+    """api.parse_ts, with 0 in place of None."""
+    return api.parse_ts(value) or 0
+
+
+INT = (_INT64, int)
+FLOAT = ('d', float)
+TIMESTAMP = (_INT64, parse_ts)
+STRING = (None, intern_string)
+
+
+def string(convert):
+    """A string column kind, converting values with 'convert'."""
+    return (None, lambda v: intern_string(convert(v)))
+
+
+class Columns(dict):
+    """Parsed rows, as a dict of columns; see the module docstring."""
+
+    def __init__(self, columns=(), row_count=0):
+        super(Columns, self).__init__(columns)
+        self.row_count = row_count
+
+    def row(self, index):
+        """Return a single row, as a flat dict of field paths to values."""
+        return dict((name, column[index]) for name, column in self.items())
+
+    def sort(self, name):
+        """Reorder all columns by the values of column 'name'."""
+        key = self[name]
+        order = sorted(range(self.row_count), key=key.__getitem__)
+        for column_name, column in list(self.items()):
+            reordered = [column[i] for i in order]
+            if isinstance(column, array.array):
+                reordered = array.array(column.typecode, reordered)
+            self[column_name] = reordered
+
+    def to_numpy(self):
+        """Return a dict of the columns as NumPy arrays."""
+        if not _has_numpy:
+            raise ImportError("NumPy is required for to_numpy().")
+        result = {}
+        for name, column in self.items():
+            if isinstance(column, array.array):
+                result[name] = numpy.frombuffer(column, dtype=column.typecode)
+            else:
+                result[name] = numpy.array(column, dtype=object)
+        return result
+
+
+def column_parser(fields, sort_by=None):
+    """Make a function parsing an API result's rowset into Columns.
+
+    'fields' is a list of (field name, row attribute, kind) tuples, or
+    (field name, row attribute, kind, default) to use 'default' for
+    attributes which may be missing or empty. Kinds are INT, FLOAT,
+    TIMESTAMP, STRING, or string(convert). The columns are sorted by
+    field 'sort_by', if given.
+    """
+    fields = [tuple(field) + (None,) * (4 - len(field)) for field in fields]
+
+    def parse(api_result):
+        result = Columns()
+        appenders = []
+        for name, attr, (typecode, convert), default in fields:
+            column = result[name] = array.array(typecode) if typecode is not None else []
+            appenders.append((column.append, attr, convert, default))
+
+        rowset = api_result.find('rowset')
+        for row in rowset.findall('row'):
+            a = row.attrib
+            for append, attr, convert, default in appenders:
+                if default is None:
+                    append(convert(a[attr]))
+                else:
+                    value = a.get(attr)
+                    append(convert(value) if value else default)
+            result.row_count += 1
+
+        if sort_by is not None:
+            result.sort(sort_by)
+        return result
+
+    return parse
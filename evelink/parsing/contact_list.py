@@ -1,3 +1,4 @@
+from evelink.parsing import schema as s
 
 LABEL_MAP = {
     'allianceContactList': 'alliance',
@@ -5,22 +6,22 @@ LABEL_MAP = {
     'contactList': 'personal',
 }
 
+CONTACT_ROW = s.Schema([
+    ('id', s.Int('contactID')),
+    ('name', s.Str('contactName', missing=None)),
+    ('standing', s.Float('standing')),
+    ('in_watchlist', s.Bool('inWatchlist', true_value='True', missing=None)),
+])
+
+parse_contact_row = CONTACT_ROW.row_parser()
+
 
 def parse_contact_list(api_result):
     result = {}
     for rowset in api_result.findall('rowset'):
         contact_list = result[LABEL_MAP[rowset.get('name')]] = {}
         for row in rowset.findall('row'):
-            in_watchlist = (row.get('inWatchlist') == 'True'
-                            if 'inWatchlist' in row.attrib
-                            else None)
-            contact_id = int(row.get('contactID'))
-            contact_list[contact_id] = {
-                'id': contact_id,
-                'name': row.get('contactName'),
-                'standing': float(row.get('standing')),
-                'in_watchlist': in_watchlist
-            }
+            contact = parse_contact_row(row)
+            contact_list[contact['id']] = contact
 
     return result
-        
@@ -1,21 +1,20 @@
-from evelink import api
+from evelink.parsing import schema as s
+
+CONTRACT_BID_ROW = s.Schema([
+    ('id', s.Int('bidID')),
+    ('contract_id', s.Int('contractID')),
+    ('bidder_id', s.Int('bidderID')),
+    ('timestamp', s.Ts('dateBid')),
+    ('amount', s.Float('amount')),
+])
+
+parse_contract_bids_row = CONTRACT_BID_ROW.row_parser()
+
 
 def parse_contract_bids(api_result):
     rowset = api_result.find('rowset')
     results = []
     for row in rowset.findall('row'):
-        a = row.attrib
-
-        bid = {
-            'id': int(a['bidID']),
-            'contract_id': int(a['contractID']),
-            'bidder_id': int(a['bidderID']),
-            'timestamp': api.parse_ts(a['dateBid']),
-            'amount': float(a['amount']),
-        }
-
-        results.append(bid)
+        results.append(parse_contract_bids_row(row))
 
     return results
-
-
@@ -1,19 +1,26 @@
+from evelink.parsing import schema as s
+
+
+def _action(included):
+    return 'offered' if included == '1' else 'requested'
+
+
+CONTRACT_ITEM_ROW = s.Schema([
+    ('id', s.Int('recordID')),
+    ('type_id', s.Int('typeID')),
+    ('quantity', s.Int('quantity')),
+    ('singleton', s.Bool('singleton')),
+    ('action', s.Map('included', _action)),
+    ('raw_quantity', s.Int('rawQuantity', optional=True)),
+])
+
+parse_contract_items_row = CONTRACT_ITEM_ROW.row_parser()
+
+
 def parse_contract_items(api_result):
     rowset = api_result.find('rowset')
     results = []
     for row in rowset.findall('row'):
-        a = row.attrib
-        item = {
-            'id': int(a['recordID']),
-            'type_id': int(a['typeID']),
-            'quantity': int(a['quantity']),
-            'singleton': a['singleton'] == '1',
-            'action': 'offered' if a['included'] == '1' else 'requested',
-        }
-        if 'rawQuantity' in a:
-          item['raw_quantity'] = int(a['rawQuantity'])
-
-        results.append(item)
+        results.append(parse_contract_items_row(row))
 
     return results
-
@@ -1,38 +1,49 @@
-from evelink import api
-from evelink import constants
-import time
+from evelink.parsing import schema as s
 
-def parse_contracts(api_result):
+CONTRACT_ROW = s.Schema([
+    ('id', s.Int('contractID')),
+    ('issuer', s.Int('issuerID')),
+    ('issuer_corp', s.Int('issuerCorpID')),
+    ('assignee', s.Int('assigneeID')),
+    ('acceptor', s.Int('acceptorID')),
+    ('start', s.Int('startStationID')),
+    ('end', s.Int('endStationID')),
+    ('type', s.Str('type')),
+    ('status', s.Str('status')),
+    ('corp', s.Bool('forCorp')),
+    ('availability', s.Str('availability')),
+    ('issued', s.Ts('dateIssued')),
+    ('days', s.Int('numDays')),
+    ('price', s.Float('price')),
+    ('reward', s.Float('reward')),
+    ('collateral', s.Float('collateral')),
+    ('buyout', s.Float('buyout')),
+    ('volume', s.Float('volume')),
+    ('title', s.Str('title')),
+    ('expired', s.Ts('dateExpired')),
+    ('accepted', s.Ts('dateAccepted')),
+    ('completed', s.Ts('dateCompleted')),
+])
+
+parse_contracts_row = CONTRACT_ROW.row_parser()
+parse_contracts_record = CONTRACT_ROW.record_parser()
+
+
+def _parse_contracts(api_result, parse_row):
     rowset = api_result.find('rowset')
     if rowset is None:
         return
 
     results = {}
     for row in rowset.findall('row'):
-        a = row.attrib
-        contract = {
-            'id': int(a['contractID']),
-            'issuer': int(a['issuerID']),
-            'issuer_corp': int(a['issuerCorpID']),
-            'assignee': int(a['assigneeID']),
-            'acceptor': int(a['acceptorID']),
-            'start': int(a['startStationID']),
-            'end': int(a['endStationID']),
-            'type': a['type'],
-            'status': a['status'],
-            'corp': a['forCorp'] == '1',
-            'availability': a['availability'],
-            'issued': api.parse_ts(a['dateIssued']),
-            'days': int(a['numDays']),
-            'price': float(a['price']),
-            'reward': float(a['reward']),
-            'collateral': float(a['collateral']),
-            'buyout': float(a['buyout']),
-            'volume': float(a['volume']),
-            'title': a['title']
-        }
-        contract['expired'] = api.parse_ts(a['dateExpired'])
-        contract['accepted'] = api.parse_ts(a['dateAccepted'])
-        contract['completed'] = api.parse_ts(a['dateCompleted'])
+        contract = parse_row(row)
         results[contract['id']] = contract
     return results
+
+
+def parse_contracts(api_result):
+    return _parse_contracts(api_result, parse_contracts_row)
+
+
+def parse_contracts_records(api_result):
+    return _parse_contracts(api_result, parse_contracts_record)
@@ -1,7 +1,55 @@
-from evelink import api
-from evelink import constants
+from evelink.parsing import schema as s
 
-def parse_industry_jobs(api_result):
+
+def _completed(completed_char_id):
+    return completed_char_id != '0'
+
+
+INDUSTRY_JOB_ROW = s.Schema([
+    ('activity_id', s.Int('activityID')),
+    ('blueprint', [
+        ('id', s.Int('blueprintID')),
+        ('location_id', s.Int('blueprintLocationID')),
+        ('type', [
+            ('id', s.Int('blueprintTypeID')),
+            ('name', s.Str('blueprintTypeName')),
+        ]),
+    ]),
+    ('completed', s.Map('completedCharacterID', _completed)),
+    ('complete_ts', s.Ts('completedDate')),
+    ('completor_id', s.Int('completedCharacterID')),
+    ('cost', s.Float('cost')),
+    ('end_ts', s.Ts('endDate')),
+    ('facility_id', s.Int('facilityID')),
+    ('installer', [
+        ('id', s.Int('installerID')),
+        ('name', s.Str('installerName')),
+    ]),
+    ('product', [
+        ('type_id', s.Int('productTypeID')),
+        ('location_id', s.Int('outputLocationID')),
+        ('name', s.Str('productTypeName')),
+        ('probability', s.Float('probability')),
+    ]),
+    ('runs', s.Int('runs')),
+    ('licensed_runs', s.Int('licensedRuns')),
+    ('pause_ts', s.Ts('pauseDate')),
+    ('system', [
+        ('id', s.Int('solarSystemID')),
+        ('name', s.Str('solarSystemName')),
+    ]),
+    ('station_id', s.Int('stationID')),
+    ('begin_ts', s.Ts('startDate')),
+    ('status', s.Int('status')),
+    ('team_id', s.Int('teamID')),
+    ('duration', s.Int('timeInSeconds')),
+])
+
+parse_industry_jobs_row = INDUSTRY_JOB_ROW.row_parser()
+parse_industry_jobs_record = INDUSTRY_JOB_ROW.record_parser()
+
+
+def _parse_industry_jobs(api_result, parse_row):
         rowset = api_result.find('rowset')
         result = {}
 
@@ -9,48 +57,14 @@ def parse_industry_jobs(api_result):
             return
 
         for row in rowset.findall('row'):
-            # shortcut to make the following block less painful
-            a = row.attrib
-            jobID = int(a['jobID'])
-            completed = a['completedCharacterID'] != '0'
-            result[jobID] = {
-                'activity_id': int(a['activityID']),
-                'blueprint': {
-                    'id': int(a['blueprintID']),
-                    'location_id': int(a['blueprintLocationID']),
-                    'type': {
-                        'id': int(a['blueprintTypeID']),
-                        'name': a['blueprintTypeName'],
-                    },
-                },
-                'completed': completed,
-                'complete_ts': api.parse_ts(a['completedDate']),
-                'completor_id': int(a['completedCharacterID']),
-                'cost': float(a['cost']),
-                'end_ts': api.parse_ts(a['endDate']),
-                'facility_id': int(a['facilityID']),
-                'installer': {
-                    'id': int(a['installerID']),
-                    'name': a['installerName'],
-                },
-                'product': {
-                    'type_id': int(a['productTypeID']),
-                    'location_id': int(a['outputLocationID']),
-                    'name': a['productTypeName'],
-                    'probability': float(a['probability']),
-                },
-                'runs': int(a['runs']),
-                'licensed_runs': int(a['licensedRuns']),
-                'pause_ts': api.parse_ts(a['pauseDate']),
-                'system': {
-                    'id': int(a['solarSystemID']),
-                    'name': a['solarSystemName'],
-                },
-                'station_id': int(a['stationID']),
-                'begin_ts': api.parse_ts(a['startDate']),
-                'status': int(a['status']),
-                'team_id': int(a['teamID']),
-                'duration': int(a['timeInSeconds']),
-            }
+            result[int(row.attrib['jobID'])] = parse_row(row)
 
         return result
+
+
+def parse_industry_jobs(api_result):
+    return _parse_industry_jobs(api_result, parse_industry_jobs_row)
+
+
+def parse_industry_jobs_records(api_result):
+    return _parse_industry_jobs(api_result, parse_industry_jobs_record)
@@ -1,89 +1,90 @@
-from evelink import api
+from evelink.parsing import schema as s
+
+KILL_ITEM_ROW = s.Schema([
+    ('id', s.Int('typeID')),
+    ('flag', s.Int('flag')),
+    ('dropped', s.Int('qtyDropped')),
+    ('destroyed', s.Int('qtyDestroyed')),
+])
+
+KILL_ROW = s.Schema([
+    ('id', s.Int('killID')),
+    ('system_id', s.Int('solarSystemID')),
+    ('time', s.Ts('killTime')),
+    ('moon_id', s.Int('moonID')),
+])
+
+_PILOT_FIELDS = [
+    ('name', s.Str('characterName')),
+    ('corp', [
+        ('id', s.Int('corporationID')),
+        ('name', s.Str('corporationName')),
+    ]),
+    ('alliance', [
+        ('id', s.Int('allianceID')),
+        ('name', s.Str('allianceName')),
+    ]),
+    ('faction', [
+        ('id', s.Int('factionID')),
+        ('name', s.Str('factionName')),
+    ]),
+]
+
+VICTIM_ROW = s.Schema([('id', s.Int('characterID'))] + _PILOT_FIELDS + [
+    ('damage', s.Int('damageTaken')),
+    ('ship_type_id', s.Int('shipTypeID')),
+])
+
+ATTACKER_ROW = s.Schema([('id', s.Int('characterID'))] + _PILOT_FIELDS + [
+    ('sec_status', s.Float('securityStatus')),
+    ('damage', s.Int('damageDone')),
+    ('final_blow', s.Bool('finalBlow')),
+    ('weapon_type_id', s.Int('weaponTypeID')),
+    ('ship_type_id', s.Int('shipTypeID')),
+])
+
+_parse_item = KILL_ITEM_ROW.row_parser()
+_parse_kill = KILL_ROW.row_parser()
+_parse_victim = VICTIM_ROW.row_parser()
+_parse_attacker = ATTACKER_ROW.row_parser()
+
+
+def _get_items(rowset):
+    items = []
+    for item in rowset.findall('row'):
+        items.append(_parse_item(item))
+
+        containers = item.findall('rowset')
+        for container in containers:
+            items.extend(_get_items(container))
+
+    return items
+
+
+def parse_kills_row(row):
+    kill = _parse_kill(row)
+    kill['victim'] = _parse_victim(row.find('victim'))
+
+    rowsets = {}
+    for rowset in row.findall('rowset'):
+        key = rowset.attrib['name']
+        rowsets[key] = rowset
+
+    kill['attackers'] = {}
+    for attacker in rowsets['attackers'].findall('row'):
+        attacker = _parse_attacker(attacker)
+        kill['attackers'][attacker['id']] = attacker
+
+    kill['items'] = _get_items(rowsets['items'])
+
+    return kill
+
 
 def parse_kills(api_result):
     rowset = api_result.find('rowset')
     result = {}
     for row in rowset.findall('row'):
-        a = row.attrib
-        kill_id = int(a['killID'])
-        result[kill_id] = {
-            'id': kill_id,
-            'system_id': int(a['solarSystemID']),
-            'time': api.parse_ts(a['killTime']),
-            'moon_id': int(a['moonID']),
-        }
-
-        victim = row.find('victim')
-        a = victim.attrib
-        result[kill_id]['victim'] = {
-            'id': int(a['characterID']),
-            'name': a['characterName'],
-            'corp': {
-                'id': int(a['corporationID']),
-                'name': a['corporationName'],
-            },
-            'alliance': {
-                'id': int(a['allianceID']),
-                'name': a['allianceName'],
-            },
-            'faction': {
-                'id': int(a['factionID']),
-                'name': a['factionName'],
-            },
-            'damage': int(a['damageTaken']),
-            'ship_type_id': int(a['shipTypeID']),
-        }
-
-        result[kill_id]['attackers'] = {}
-
-        rowsets = {}
-        for rowset in row.findall('rowset'):
-            key = rowset.attrib['name']
-            rowsets[key] = rowset
-
-        for attacker in rowsets['attackers'].findall('row'):
-            a = attacker.attrib
-            attacker_id = int(a['characterID'])
-            result[kill_id]['attackers'][attacker_id] = {
-                'id': attacker_id,
-                'name': a['characterName'],
-                'corp': {
-                    'id': int(a['corporationID']),
-                    'name': a['corporationName'],
-                },
-                'alliance': {
-                    'id': int(a['allianceID']),
-                    'name': a['allianceName'],
-                },
-                'faction': {
-                    'id': int(a['factionID']),
-                    'name': a['factionName'],
-                },
-                'sec_status': float(a['securityStatus']),
-                'damage': int(a['damageDone']),
-                'final_blow': a['finalBlow'] == '1',
-                'weapon_type_id': int(a['weaponTypeID']),
-                'ship_type_id': int(a['shipTypeID']),
-            }
-
-        def _get_items(rowset):
-            items = []
-            for item in rowset.findall('row'):
-                a = item.attrib
-                type_id = int(a['typeID'])
-                items.append({
-                    'id': type_id,
-                    'flag': int(a['flag']),
-                    'dropped': int(a['qtyDropped']),
-                    'destroyed': int(a['qtyDestroyed']),
-                })
-
-                containers = item.findall('rowset')
-                for container in containers:
-                    items.extend(_get_items(container))
-
-            return items
-
-        result[kill_id]['items'] = _get_items(rowsets['items'])
+        kill = parse_kills_row(row)
+        result[kill['id']] = kill
 
     return result
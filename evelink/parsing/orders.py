@@ -1,28 +1,56 @@
-from evelink import api
 from evelink import constants
+from evelink.parsing import columns
+from evelink.parsing import schema as s
 
-def parse_market_orders(api_result):
+_order_status = constants.Market().order_status
+
+
+def _status(state):
+    return _order_status[int(state)]
+
+
+def _order_type(bid):
+    return 'buy' if bid == '1' else 'sell'
+
+
+MARKET_ORDER_ROW = s.Schema([
+    ('id', s.Int('orderID')),
+    ('char_id', s.Int('charID')),
+    ('station_id', s.Int('stationID')),
+    ('amount', s.Int('volEntered')),
+    ('amount_left', s.Int('volRemaining')),
+    ('status', s.Map('orderState', _status, kind=columns.string(_status))),
+    ('type_id', s.Int('typeID')),
+    ('range', s.Int('range')),
+    ('account_key', s.Int('accountKey')),
+    ('duration', s.Int('duration')),
+    ('escrow', s.Float('escrow')),
+    ('price', s.Float('price')),
+    ('type', s.Map('bid', _order_type, kind=columns.string(_order_type))),
+    ('timestamp', s.Ts('issued')),
+])
+
+parse_market_orders_row = MARKET_ORDER_ROW.row_parser()
+parse_market_orders_record = MARKET_ORDER_ROW.record_parser()
+
+
+def _parse_market_orders(api_result, parse_row):
         rowset = api_result.find('rowset')
         rows = rowset.findall('row')
         result = {}
         for row in rows:
-            a = row.attrib
-            id = int(a['orderID'])
-            result[id] = {
-                'id': id,
-                'char_id': int(a['charID']),
-                'station_id': int(a['stationID']),
-                'amount': int(a['volEntered']),
-                'amount_left': int(a['volRemaining']),
-                'status': constants.Market().order_status[int(a['orderState'])],
-                'type_id': int(a['typeID']),
-                'range': int(a['range']),
-                'account_key': int(a['accountKey']),
-                'duration': int(a['duration']),
-                'escrow': float(a['escrow']),
-                'price': float(a['price']),
-                'type': 'buy' if a['bid'] == '1' else 'sell',
-                'timestamp': api.parse_ts(a['issued']),
-            }
+            order = parse_row(row)
+            result[order['id']] = order
 
         return result
+
+
+def parse_market_orders(api_result):
+    return _parse_market_orders(api_result, parse_market_orders_row)
+
+
+def parse_market_orders_records(api_result):
+    return _parse_market_orders(api_result, parse_market_orders_record)
+
+
+parse_market_orders_columns = MARKET_ORDER_ROW.column_parser()
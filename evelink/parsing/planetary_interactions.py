@@ -1,99 +1,99 @@
-from evelink import api
+from evelink.parsing import schema as s
 
-def parse_planetary_colonies(api_results):
+PLANETARY_COLONY_ROW = s.Schema([
+    ('id', s.Int('planetID')),
+    ('system', [
+        ('id', s.Int('solarSystemID')),
+        ('name', s.Str('solarSystemName')),
+    ]),
+    ('planet', [
+        ('name', s.Str('planetName')),
+        ('type', s.Int('planetTypeID')),
+        ('type_name', s.Str('planetTypeName')),
+    ]),
+    ('owner', [
+        ('id', s.Int('ownerID')),
+        ('name', s.Str('ownerName')),
+    ]),
+    ('last_update', s.Ts('lastUpdate')),
+    ('upgrade_level', s.Int('upgradeLevel')),
+    ('number_of_pins', s.Int('numberOfPins')),
+])
+
+PLANETARY_LINK_ROW = s.Schema([
+    ('source_id', s.Int('sourcePinID')),
+    ('destination_id', s.Int('destinationPinID')),
+    ('link_level', s.Int('linkLevel')),
+])
+
+PLANETARY_PIN_ROW = s.Schema([
+    ('id', s.Int('pinID')),
+    ('type', [
+        ('id', s.Int('typeID')),
+        ('name', s.Str('typeName')),
+    ]),
+    ('schematic', s.Int('schematicID')),
+    ('last_launch_ts', s.Ts('lastLaunchTime')),
+    ('cycle_time', s.Int('cycleTime')),
+    ('quantity_per_cycle', s.Int('quantityPerCycle')),
+    ('install_ts', s.Ts('installTime')),
+    ('expiry_ts', s.Ts('expiryTime')),
+    ('content', [
+        ('type', s.Int('contentTypeID')),
+        ('name', s.Str('contentTypeName')),
+        ('quantity', s.Int('contentQuantity')),
+    ]),
+    ('loc', [
+        ('long', s.Float('longitude')),
+        ('lat', s.Float('latitude')),
+    ]),
+])
+
+
+def _waypoints(a):
+    return tuple(int(a['waypoint%d' % n]) for n in range(1,6))
+
+
+PLANETARY_ROUTE_ROW = s.Schema([
+    ('id', s.Int('routeID')),
+    ('source_id', s.Int('sourcePinID')),
+    ('destination_id', s.Int('destinationPinID')),
+    ('content', [
+        ('type', s.Int('contentTypeID')),
+        ('name', s.Str('contentTypeName')),
+    ]),
+    ('quantity', s.Int('quantity')),
+    ('path', s.Custom(_waypoints)),
+])
+
+
+parse_planetary_colonies_row = PLANETARY_COLONY_ROW.row_parser()
+parse_planetary_links_row = PLANETARY_LINK_ROW.row_parser()
+parse_planetary_pins_row = PLANETARY_PIN_ROW.row_parser()
+parse_planetary_routes_row = PLANETARY_ROUTE_ROW.row_parser()
+
+
+def _parse_rows(api_results, parse_row, key):
     result = {}
     rowset = api_results.find('rowset')
     for row in rowset.findall('row'):
-        # shortcut to make the following block less painful
-        a = row.attrib
-        planetID = int(a['planetID'])
-        result[planetID] = {
-            'id': planetID,
-            'system': {
-                'id': int(a['solarSystemID']),
-                'name': a['solarSystemName'],
-            },
-            'planet': {
-                'name': a['planetName'],
-                'type': int(a['planetTypeID']),
-                'type_name': a['planetTypeName'],
-            },
-            'owner': {
-                'id': int(a['ownerID']),
-                'name': a['ownerName'],
-            },
-            'last_update': api.parse_ts(a['lastUpdate']),
-            'upgrade_level': int(a['upgradeLevel']),
-            'number_of_pins': int(a['numberOfPins']),
-        }
+        entry = parse_row(row)
+        result[entry[key]] = entry
 
     return result
 
 
+def parse_planetary_colonies(api_results):
+    return _parse_rows(api_results, parse_planetary_colonies_row, 'id')
+
+
 def parse_planetary_links(api_results):
-    result = {}
-    rowset = api_results.find('rowset')
-    for row in rowset.findall('row'):
-        # shortcut to make the following block less painful
-        a = row.attrib
-        sourceID = int(a['sourcePinID'])
-        result[sourceID] = {
-            'source_id': sourceID,
-            'destination_id': int(a['destinationPinID']),
-            'link_level': int(a['linkLevel']),
-        }
+    return _parse_rows(api_results, parse_planetary_links_row, 'source_id')
 
-    return result
 
 def parse_planetary_pins(api_results):
-    result = {}
-    rowset = api_results.find('rowset')
-    for row in rowset.findall('row'):
-        # shortcut to make the following block less painful
-        a = row.attrib
-        pinID = int(a['pinID'])
-        result[pinID] = {
-            'id': pinID,
-            'type': {
-                'id': int(a['typeID']),
-                'name': a['typeName'],
-            },
-            'schematic': int(a['schematicID']),
-            'last_launch_ts': api.parse_ts(a['lastLaunchTime']),
-            'cycle_time': int(a['cycleTime']),
-            'quantity_per_cycle': int(a['quantityPerCycle']),
-            'install_ts': api.parse_ts(a['installTime']),
-            'expiry_ts': api.parse_ts(a['expiryTime']),
-            'content': {
-                'type': int(a['contentTypeID']),
-                'name': a['contentTypeName'],
-                'quantity': int(a['contentQuantity']),
-            },
-            'loc': {
-                'long': float(a['longitude']),
-                'lat': float(a['latitude']),
-            },
-        }
+    return _parse_rows(api_results, parse_planetary_pins_row, 'id')
 
-    return result
 
 def parse_planetary_routes(api_results):
-    result = {}
-    rowset = api_results.find('rowset')
-    for row in rowset.findall('row'):
-        # shortcut to make the following block less painful
-        a = row.attrib
-        routeID = int(a['routeID'])
-        result[routeID] = {
-            'id': routeID,
-            'source_id': int(a['sourcePinID']),
-            'destination_id': int(a['destinationPinID']),
-            'content': {
-                'type': int(a['contentTypeID']),
-                'name': a['contentTypeName'],
-            },
-            'quantity': int(a['quantity']),
-            'path': tuple(int(a['waypoint%d' % n]) for n in range(1,6)),
-        }
-
-    return result
+    return _parse_rows(api_results, parse_planetary_routes_row, 'id')
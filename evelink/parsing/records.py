@@ -0,0 +1,167 @@
+"""Compact record types for parsed API results.
+
+In the 'records' result mode (see API's result_mode), rows which would
+otherwise be dicts are returned as instances of small __slots__ classes
+instead, which take a fraction of the memory. Records have the same
+field names as the dicts, readable either as attributes or as items:
+
+    entry.party_1.name == entry['party_1']['name']
+
+and also support get(), keys(), values(), items(), 'in' and iteration
+over their field names, compare equal to the dicts they replace, and
+can be turned back into them with to_dict().
+"""
+
+import keyword
+import threading
+
+from evelink.thirdparty import six
+
+_types = {}
+_types_lock = threading.Lock()
+
+
+class Record(object):
+    """Base class for record types; see record_type()."""
+
+    __slots__ = ()
+    _fields = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except (AttributeError, TypeError):
+            raise KeyError(name)
+
+    def get(self, name, default=None):
+        return getattr(self, name, default) if name in self._fields else default
+
+    def __contains__(self, name):
+        return name in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def keys(self):
+        return list(self._fields)
+
+    def values(self):
+        return [getattr(self, name) for name in self._fields]
+
+    def items(self):
+        return list(zip(self._fields, self.values()))
+
+    def to_dict(self):
+        """Return the dict this record replaces, nested records included."""
+        return dict((name, to_dicts(value)) for name, value in self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return self._fields == other._fields and self.values() == other.values()
+        if isinstance(other, dict):
+            return len(other) == len(self._fields) and all(
+                name in other and other[name] == value for name, value in self.items())
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Record(%s)' % ', '.join('%s=%r' % item for item in self.items())
+
+    def __reduce__(self):
+        # Record types are made on the fly, so pickle can't find them
+        # by name.
+        return _make_record, (self._fields, tuple(self.values()))
+
+
+def _make_init(cls):
+    """Compile an __init__ setting each field in turn, much faster than
+    Record.__init__'s loop. Fields named after keywords (e.g. 'for')
+    are set through their slot descriptors."""
+    namespace = {}
+    lines = ['def __init__(self%s):\n' % ''.join(', _%d' % i for i in range(len(cls._fields)))]
+    for i, name in enumerate(cls._fields):
+        if keyword.iskeyword(name):
+            namespace['_set_%d' % i] = cls.__dict__[name].__set__
+            lines.append('    _set_%d(self, _%d)\n' % (i, i))
+        else:
+            lines.append('    self.%s = _%d\n' % (name, i))
+    if not cls._fields:
+        lines.append('    pass\n')
+    exec(compile(''.join(lines), '<evelink.parsing.records>', 'exec'), namespace)
+    return namespace['__init__']
+
+
+def record_type(fields):
+    """Return the record type with the given field names, creating it
+    if need be."""
+    fields = tuple(fields)
+    cls = _types.get(fields)
+    if cls is None:
+        for name in fields:
+            if name.startswith('_') or hasattr(Record, name):
+                raise ValueError("%r can't be used as a record field name." % name)
+        with _types_lock:
+            cls = _types.get(fields)
+            if cls is None:
+                cls = type('Record', (Record,), {
+                    '__slots__': fields,
+                    '_fields': fields,
+                })
+                cls.__init__ = _make_init(cls)
+                _types[fields] = cls
+    return cls
+
+
+def _make_record(fields, values):
+    return record_type(fields)(*values)
+
+
+def to_record(row):
+    """Convert a row dict, and any dicts nested in it, to records."""
+    fields = tuple(sorted(row))
+    values = []
+    for name in fields:
+        value = row[name]
+        if isinstance(value, dict):
+            value = to_record(value)
+        values.append(value)
+    return record_type(fields)(*values)
+
+
+def to_records(result):
+    """Convert the rows of a parsed result to records.
+
+    'result' may be a single row dict, a list of them, or a dict of them
+    keyed by id (as returned by e.g. parse_market_orders).
+    """
+    if isinstance(result, list):
+        return [to_record(row) for row in result]
+    if isinstance(result, dict):
+        if result and all(isinstance(key, six.string_types) for key in result):
+            return to_record(result)
+        return dict((key, to_record(row)) for key, row in result.items())
+    return result
+
+
+def to_dicts(value):
+    """Undo to_records()."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_dicts(item) for item in value]
+    if isinstance(value, dict):
+        return dict((key, to_dicts(item)) for key, item in value.items())
+    return value
+
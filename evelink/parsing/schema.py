@@ -0,0 +1,310 @@
+"""Declarative row schemas, compiled into fast row parsers.
+
+A schema lists the fields of a parsed row, in order, as (name, spec)
+pairs. A spec is a Field saying which XML attribute the value comes
+from and how to convert it, a list of (name, spec) pairs for a nested
+dict, or an Optional nested dict which is only there if the row has a
+given attribute:
+
+    TRANSACTION = Schema([
+        ('id', Int('transactionID')),
+        ('price', Float('price')),
+        ('type', [
+            ('id', Int('typeID')),
+            ('name', Str('typeName')),
+        ]),
+        ('char', Optional('characterID', [
+            ('id', Int('characterID')),
+            ('name', Str('characterName')),
+        ])),
+    ])
+
+Schemas generate Python source for a function building the row's dict
+from its attributes in a single expression, as one would write by hand,
+and compile it once, when the parser is first asked for. The same
+schema also makes the parsers for the other result modes: building
+records directly (see evelink.parsing.records), or columns (see
+evelink.parsing.columns). New result modes belong here too.
+"""
+
+from evelink import api
+from evelink.parsing import columns
+from evelink.parsing import records
+
+_REQUIRED = object()
+
+
+class Field(object):
+    """A value taken from an XML attribute.
+
+    attr:
+        The attribute's name.
+    default:
+        Optional. A value to use if the attribute is missing or empty,
+        instead of failing.
+    missing:
+        Optional. A value to use if the attribute is missing; unlike
+        'default', empty values are still converted.
+    optional:
+        If true, the field is left out of the row if the attribute is
+        missing.
+    """
+
+    # The column kind (see evelink.parsing.columns) values are stored
+    # as in the 'columns' result mode, or None if they can't be.
+    kind = None
+
+    def __init__(self, attr, default=_REQUIRED, missing=_REQUIRED, optional=False):
+        self.attr = attr
+        self.default = default
+        self.missing = missing
+        self.optional = optional
+
+    def expression(self, value, bind):
+        """Return a Python expression converting the string expression
+        'value'. bind(obj) returns a name bound to obj in the parser's
+        namespace."""
+        return value
+
+    def column_default(self):
+        if self.default is not _REQUIRED:
+            return self.default
+        if self.missing is not _REQUIRED:
+            return self.missing
+        return '' if self.kind[0] is None else (0.0 if self.kind[0] == 'd' else 0)
+
+
+class Str(Field):
+    kind = columns.STRING
+
+
+class Int(Field):
+    kind = columns.INT
+
+    def expression(self, value, bind):
+        return 'int(%s)' % value
+
+
+class Float(Field):
+    kind = columns.FLOAT
+
+    def expression(self, value, bind):
+        return 'float(%s)' % value
+
+
+class Ts(Field):
+    """A timestamp, as parsed by api.parse_ts."""
+
+    kind = columns.TIMESTAMP
+
+    def expression(self, value, bind):
+        return '%s(%s)' % (bind(api.parse_ts), value)
+
+
+class Bool(Field):
+    """True if the attribute is 'true_value'."""
+
+    def __init__(self, attr, true_value='1', **kw):
+        super(Bool, self).__init__(attr, **kw)
+        self.true_value = true_value
+        self.kind = ('b', lambda v: v == true_value)
+
+    def expression(self, value, bind):
+        return '(%s == %r)' % (value, self.true_value)
+
+
+class Map(Field):
+    """The attribute's value converted by 'func'.
+
+    kind is the column kind for the converted values, if any; e.g.
+    columns.string(func) if 'func' returns strings.
+    """
+
+    def __init__(self, attr, func, kind=None, **kw):
+        super(Map, self).__init__(attr, **kw)
+        self.func = func
+        self.kind = kind
+
+    def expression(self, value, bind):
+        return '%s(%s)' % (bind(self.func), value)
+
+
+class Custom(Field):
+    """A value computed by func(attributes), for anything the other
+    fields can't express."""
+
+    def __init__(self, func):
+        super(Custom, self).__init__(None)
+        self.func = func
+
+
+class Optional(object):
+    """A nested dict which is only in the row if attribute 'attr' is."""
+
+    def __init__(self, attr, fields):
+        self.attr = attr
+        self.fields = fields
+
+
+def _is_optional(spec):
+    return isinstance(spec, Optional) or getattr(spec, 'optional', False)
+
+
+def _check_nesting(fields, in_optional):
+    for field_name, spec in fields:
+        if in_optional and _is_optional(spec):
+            raise ValueError("Optional field %r can't be in an Optional group." % field_name)
+        if isinstance(spec, Optional):
+            _check_nesting(spec.fields, True)
+        elif isinstance(spec, list):
+            _check_nesting(spec, in_optional)
+
+
+class Schema(object):
+    """A row schema; see the module docstring. Optional fields and
+    groups can't be nested in Optional groups."""
+
+    def __init__(self, fields):
+        _check_nesting(fields, False)
+        self.fields = fields
+        self._row_parser = None
+        self._record_parser = None
+
+    def source(self, name='parse_row', mode='dict'):
+        """Return the Python source of the row parser, and a dict of the
+        names it needs bound. 'mode' is 'dict' or 'records'."""
+        namespace = {}
+
+        def bind(obj):
+            for bound_name, bound in namespace.items():
+                if bound is obj:
+                    return bound_name
+            bound_name = '_%d' % len(namespace)
+            namespace[bound_name] = obj
+            return bound_name
+
+        def value(field):
+            if isinstance(field, Custom):
+                return '%s(a)' % bind(field.func)
+            expr = field.expression('a[%r]' % field.attr, bind)
+            if field.default is not _REQUIRED:
+                expr = '(%s if a.get(%r) else %s)' % (expr, field.attr, bind(field.default))
+            elif field.missing is not _REQUIRED:
+                expr = '(%s if %r in a else %s)' % (expr, field.attr, bind(field.missing))
+            return expr
+
+        lines = ['def %s(row):\n' % name, '    a = row.attrib\n']
+        if mode == 'records':
+            self._record_source(lines, value, bind)
+        else:
+            self._dict_source(lines, value)
+        return ''.join(lines), namespace
+
+    def _dict_source(self, lines, value):
+        optional = []
+
+        def literal(fields, path, indent):
+            items = []
+            for field_name, spec in fields:
+                if _is_optional(spec):
+                    optional.append((path + (field_name,), spec))
+                    continue
+                if isinstance(spec, list):
+                    expr = literal(spec, path + (field_name,), indent + '    ')
+                else:
+                    expr = value(spec)
+                items.append('%s    %r: %s,\n' % (indent, field_name, expr))
+            return '{\n%s%s}' % (''.join(items), indent)
+
+        lines.append('    result = %s\n' % literal(self.fields, (), '    '))
+        for path, spec in optional:
+            target = 'result' + ''.join('[%r]' % key for key in path[:-1])
+            if isinstance(spec, Optional):
+                expr = literal(spec.fields, path, '        ')
+            else:
+                expr = value(spec)
+            lines.append('    if %r in a:\n' % spec.attr)
+            lines.append('        %s[%r] = %s\n' % (target, path[-1], expr))
+        lines.append('    return result\n')
+
+    def _record_source(self, lines, value, bind):
+        # Records of different fields are of different types, so rows
+        # with optional parts get a branch for each combination of them.
+        optional = []
+
+        def find_optional(fields):
+            for field_name, spec in fields:
+                if _is_optional(spec):
+                    optional.append(spec)
+                elif isinstance(spec, list):
+                    find_optional(spec)
+
+        def record(fields, present):
+            items = []
+            for field_name, spec in fields:
+                if _is_optional(spec) and spec not in present:
+                    continue
+                if isinstance(spec, Optional):
+                    expr = record(spec.fields, present)
+                elif isinstance(spec, list):
+                    expr = record(spec, present)
+                else:
+                    expr = value(spec)
+                items.append((field_name, expr))
+            items.sort(key=lambda item: item[0])
+            record_type = records.record_type([field_name for field_name, _ in items])
+            return '%s(%s)' % (bind(record_type), ', '.join(expr for _, expr in items))
+
+        def branch(remaining, present, indent):
+            if not remaining:
+                lines.append('%sreturn %s\n' % (indent, record(self.fields, present)))
+                return
+            lines.append('%sif %r in a:\n' % (indent, remaining[0].attr))
+            branch(remaining[1:], present + [remaining[0]], indent + '    ')
+            branch(remaining[1:], present, indent)
+
+        find_optional(self.fields)
+        branch(optional, [], '    ')
+
+    def _compile(self, mode):
+        source, namespace = self.source(mode=mode)
+        code = compile(source, '<evelink.parsing.schema %x>' % id(self), 'exec')
+        exec(code, namespace)
+        return namespace['parse_row']
+
+    def row_parser(self):
+        """Return a function parsing an XML row element into a dict."""
+        if self._row_parser is None:
+            self._row_parser = self._compile('dict')
+        return self._row_parser
+
+    def record_parser(self):
+        """Return a function parsing an XML row element into a record
+        (see evelink.parsing.records) with the same fields as the dict
+        row_parser() would return."""
+        if self._record_parser is None:
+            self._record_parser = self._compile('records')
+        return self._record_parser
+
+    def column_parser(self, sort_by=None):
+        """Return a function parsing an API result's rowset into Columns
+        (see columns.column_parser), with a column for each field."""
+        fields = []
+
+        def flatten(specs, prefix, in_optional):
+            for field_name, spec in specs:
+                name = prefix + field_name
+                if isinstance(spec, list):
+                    flatten(spec, name + '.', in_optional)
+                elif isinstance(spec, Optional):
+                    flatten(spec.fields, name + '.', True)
+                elif spec.kind is None:
+                    raise ValueError("Field %r can't be stored in a column." % name)
+                elif (in_optional or spec.optional or spec.default is not _REQUIRED or
+                      spec.missing is not _REQUIRED):
+                    fields.append((name, spec.attr, spec.kind, spec.column_default()))
+                else:
+                    fields.append((name, spec.attr, spec.kind))
+
+        flatten(self.fields, '', False)
+        return columns.column_parser(fields, sort_by=sort_by)
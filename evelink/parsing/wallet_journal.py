@@ -1,44 +1,56 @@
-from evelink import api
+from evelink.parsing import schema as s
 
-def parse_wallet_journal(api_result):
+WALLET_JOURNAL_ROW = s.Schema([
+    ('timestamp', s.Ts('date')),
+    ('id', s.Int('refID')),
+    ('type_id', s.Int('refTypeID')),
+    ('party_1', [
+        ('name', s.Str('ownerName1')),
+        ('id', s.Int('ownerID1')),
+        ('type', s.Int('owner1TypeID')),
+    ]),
+    ('party_2', [
+        ('name', s.Str('ownerName2')),
+        ('id', s.Int('ownerID2')),
+        ('type', s.Int('owner2TypeID')),
+    ]),
+    ('arg', [
+        ('name', s.Str('argName1')),
+        ('id', s.Int('argID1')),
+    ]),
+    ('amount', s.Float('amount')),
+    ('balance', s.Float('balance')),
+    ('reason', s.Str('reason')),
+    # The tax fields might be an empty string, or not present
+    # at all (e.g., for corp wallet records.)  Need to handle
+    # both edge cases.
+    ('tax', [
+        ('taxer_id', s.Int('taxReceiverID', default=0)),
+        ('amount', s.Float('taxAmount', default=0.0)),
+    ]),
+])
+
+parse_wallet_journal_row = WALLET_JOURNAL_ROW.row_parser()
+parse_wallet_journal_record = WALLET_JOURNAL_ROW.record_parser()
+
+
+def _parse_wallet_journal(api_result, parse_row):
     rowset = api_result.find('rowset')
     result = []
 
     for row in rowset.findall('row'):
-        a = row.attrib
-        entry = {
-            'timestamp': api.parse_ts(a['date']),
-            'id': int(a['refID']),
-            'type_id': int(a['refTypeID']),
-            'party_1': {
-                'name': a['ownerName1'],
-                'id': int(a['ownerID1']),
-                'type':int(a['owner1TypeID']),
-            },
-            'party_2': {
-                'name': a['ownerName2'],
-                'id': int(a['ownerID2']),
-                'type':int(a['owner2TypeID']),
-            },
-            'arg': {
-                'name': a['argName1'],
-                'id': int(a['argID1']),
-            },
-            'amount': float(a['amount']),
-            'balance': float(a['balance']),
-            'reason': a['reason'],
-            # The tax fields might be an empty string, or not present
-            # at all (e.g., for corp wallet records.)  Need to handle
-            # both edge cases.
-            'tax': {
-                'taxer_id': int(a.get('taxReceiverID') or 0),
-                'amount': float(a.get('taxAmount') or 0),
-            },
-        }
-
-        result.append(entry)
+        result.append(parse_row(row))
 
     result.sort(key=lambda x: x['id'])
     return result
 
 
+def parse_wallet_journal(api_result):
+    return _parse_wallet_journal(api_result, parse_wallet_journal_row)
+
+
+def parse_wallet_journal_records(api_result):
+    return _parse_wallet_journal(api_result, parse_wallet_journal_record)
+
+
+parse_wallet_journal_columns = WALLET_JOURNAL_ROW.column_parser(sort_by='id')
@@ -1,37 +1,53 @@
-from evelink import api
+from evelink.parsing import schema as s
 
-def parse_wallet_transactions(api_result):
+# In the 'columns' result mode, rows without a character (e.g. a
+# character's own transactions) get 0 and '' in the 'char' columns.
+WALLET_TRANSACTIONS_ROW = s.Schema([
+    ('timestamp', s.Ts('transactionDateTime')),
+    ('id', s.Int('transactionID')),
+    ('journal_id', s.Int('journalTransactionID')),
+    ('quantity', s.Int('quantity')),
+    ('type', [
+        ('id', s.Int('typeID')),
+        ('name', s.Str('typeName')),
+    ]),
+    ('price', s.Float('price')),
+    ('client', [
+        ('id', s.Int('clientID')),
+        ('name', s.Str('clientName')),
+    ]),
+    ('station', [
+        ('id', s.Int('stationID')),
+        ('name', s.Str('stationName')),
+    ]),
+    ('action', s.Str('transactionType')),
+    ('for', s.Str('transactionFor')),
+    ('char', s.Optional('characterID', [
+        ('id', s.Int('characterID')),
+        ('name', s.Str('characterName')),
+    ])),
+])
+
+parse_wallet_transactions_row = WALLET_TRANSACTIONS_ROW.row_parser()
+parse_wallet_transactions_record = WALLET_TRANSACTIONS_ROW.record_parser()
+
+
+def _parse_wallet_transactions(api_result, parse_row):
     rowset = api_result.find('rowset')
     rows = rowset.findall('row')
     result = []
     for row in rows:
-        a = row.attrib
-        entry = {
-            'timestamp': api.parse_ts(a['transactionDateTime']),
-            'id': int(a['transactionID']),
-            'journal_id': int(a['journalTransactionID']),
-            'quantity': int(a['quantity']),
-            'type': {
-                'id': int(a['typeID']),
-                'name': a['typeName'],
-            },
-            'price': float(a['price']),
-            'client': {
-                'id': int(a['clientID']),
-                'name': a['clientName'],
-            },
-            'station': {
-                'id': int(a['stationID']),
-                'name': a['stationName'],
-            },
-            'action': a['transactionType'],
-            'for': a['transactionFor'],
-        }
-        if 'characterID' in a:
-            entry['char'] = {
-                'id': int(a['characterID']),
-                'name': a['characterName'],
-            }
-        result.append(entry)
+        result.append(parse_row(row))
 
     return result
+
+
+def parse_wallet_transactions(api_result):
+    return _parse_wallet_transactions(api_result, parse_wallet_transactions_row)
+
+
+def parse_wallet_transactions_records(api_result):
+    return _parse_wallet_transactions(api_result, parse_wallet_transactions_record)
+
+
+parse_wallet_transactions_columns = WALLET_TRANSACTIONS_ROW.column_parser()
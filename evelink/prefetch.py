@@ -0,0 +1,169 @@
+"""Keep chosen API responses warm in the cache.
+
+A Prefetcher re-requests each registered call shortly after its cached
+response expires, so that readers of the cache almost always hit it.
+Refreshes are spread out by a random delay of up to 'jitter' seconds,
+rather than all landing the moment their responses expire. For example:
+
+    prefetcher = evelink.prefetch.Prefetcher(api)
+    prefetcher.register('server/ServerStatus')
+    prefetcher.register_call(evelink.corp.Corp(api).members)
+    prefetcher.start()
+
+run_pending() may be called instead of start() to do the refreshes from
+an existing scheduler or event loop.
+"""
+
+import functools
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+
+from evelink import api
+from evelink import batch
+
+_log = logging.getLogger('evelink.prefetch')
+
+
+class Prefetcher(object):
+    """Refreshes registered requests to an API object as they expire.
+
+    jitter:
+        Maximum random delay, in seconds, added to each refresh.
+    min_interval:
+        Minimum time between refreshes of the same request, e.g. for
+        responses which are cached for no time at all, or served stale
+        while being refreshed (see API's stale_while_revalidate).
+    retry_interval:
+        Time to wait before trying again after a request fails with
+        anything other than an APIError (which is cached as usual).
+    concurrency:
+        Maximum number of refreshes made at once.
+    """
+
+    def __init__(self, api_obj, jitter=30, min_interval=30, retry_interval=300, concurrency=4):
+        self.api = api_obj
+        self.jitter = jitter
+        self.min_interval = min_interval
+        self.retry_interval = retry_interval
+        self.concurrency = concurrency
+
+        self._lock = threading.Condition()
+        self._entries = {}
+        self._queue = []
+        self._seq = itertools.count()
+        self._thread = None
+        self._stopped = False
+
+    def _add(self, key, call):
+        with self._lock:
+            seq = next(self._seq)
+            self._entries[key] = (call, seq)
+            heapq.heappush(self._queue, (time.time() + random.uniform(0, self.jitter), seq, key))
+            self._lock.notify()
+        return key
+
+    def register(self, path, params=None):
+        """Keep the response to api.get(path, params) warm.
+
+        Returns a key which can be passed to unregister(). The first
+        refresh happens within 'jitter' seconds.
+        """
+        params = dict(params or {})
+        key = self.api._cache_key(path, self.api._prepare_params(params))
+        return self._add(key, functools.partial(self.api.get, path, params))
+
+    def register_call(self, method, *args, **kw):
+        """Keep the response to a wrapped method call warm.
+
+        'method' is an auto_call method bound to an object using this
+        prefetcher's API object. The call is made as is, so its parsed
+        result is kept warm too if the API has a result_cache.
+        """
+        client = method.__self__
+        if client.api is not self.api:
+            raise ValueError("The method must be bound to an object using the prefetcher's API.")
+        specs = method._request_specs
+        params = api.request_params(client, specs, args, kw)
+        key = self.api._cache_key(specs['path'], self.api._prepare_params(params))
+        return self._add(key, functools.partial(method, *args, **kw))
+
+    def unregister(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _next_refresh(self, key, result, now):
+        # The cache knows best when the response it holds expires;
+        # failing that, it was presumably just fetched.
+        entry = self.api.cache.get_entry(key)
+        expiration = entry[1] if entry is not None else None
+        if expiration is not None:
+            expiration -= self.api.stale_while_revalidate
+        elif isinstance(result, api.APIResult):
+            expiration = now + result.expires - result.timestamp
+        else:
+            expiration = now + self.retry_interval
+        # Refreshing right on the dot could still find it in the cache.
+        return max(expiration + 1, now + self.min_interval) + random.uniform(0, self.jitter)
+
+    def run_pending(self):
+        """Refresh everything which is due, returning how many were."""
+        now = time.time()
+        due = []
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now:
+                _, seq, key = heapq.heappop(self._queue)
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] == seq:
+                    due.append((key, entry))
+
+        calls = [call for _, (call, _) in due]
+        for index, (_, result, error) in batch.as_completed(calls, self.concurrency):
+            key, (_, seq) = due[index]
+            now = time.time()
+            if error is not None and not isinstance(error, api.APIError):
+                _log.warning("Failed to refresh %r: %r", calls[index], error)
+                next_refresh = now + self.retry_interval + random.uniform(0, self.jitter)
+            else:
+                next_refresh = self._next_refresh(key, result, now)
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] == seq:
+                    heapq.heappush(self._queue, (next_refresh, seq, key))
+                    self._lock.notify()
+        return len(due)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopped:
+                    delay = self._queue[0][0] - time.time() if self._queue else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._lock.wait(delay)
+                if self._stopped:
+                    return
+            self.run_pending()
+
+    def start(self):
+        """Start refreshing in a background thread."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='evelink-prefetcher')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background thread, once any refreshes in progress are done."""
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+
+
+# vim: set ts=4 sts=4 sw=4 et:
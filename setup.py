@@ -25,6 +25,7 @@ setup(
     download_url="https://github.com/eve-val/evelink/downloads",
     packages=[
         "evelink",
+        "evelink.aio",
         "evelink.appengine",
         "evelink.cache",
         "evelink.parsing",
@@ -0,0 +1,67 @@
+import os
+
+from tests.compat import unittest
+
+from evelink.api import APICache
+from evelink.cache.compressed import CompressedCache, EVE_API_ZDICT, make_zdict
+from evelink.cache.lru import LRUCache
+
+XML_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xml')
+
+
+def _fixture(path):
+    with open(os.path.join(XML_DIR, path), 'rb') as f:
+        return f.read()
+
+
+class CompressedCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.inner = APICache()
+        self.cache = CompressedCache(self.inner)
+
+    def test_cache(self):
+        response = _fixture('corp/assets.xml')
+        self.cache.put('foo', response, 3600)
+        self.cache.put('bar', {'a': list(range(100))}, 3600)
+        self.cache.put('baz', b'tiny', 3600)
+        self.assertEqual(self.cache.get('foo'), response)
+        self.assertEqual(self.cache.get('bar'), {'a': list(range(100))})
+        self.assertEqual(self.cache.get('baz'), b'tiny')
+        self.assertEqual(self.cache.get('qux'), None)
+        self.assertTrue(len(self.inner.get('foo')) < len(response) / 2)
+
+    def test_expire(self):
+        self.cache.put('baz', b'qux', -1)
+        self.assertEqual(self.cache.get('baz'), None)
+
+    def test_zdict(self):
+        response = _fixture('char/wallet_journal.xml')
+        cache = CompressedCache(self.inner, zdict=EVE_API_ZDICT)
+        cache.put('foo', response, 3600)
+        self.assertEqual(cache.get('foo'), response)
+
+        self.cache.put('bar', response, 3600)
+        self.assertTrue(len(self.inner.get('foo')) < len(self.inner.get('bar')))
+
+        # Values compressed with another dictionary can't be read.
+        self.assertEqual(self.cache.get('foo'), None)
+        other = CompressedCache(self.inner, zdict=make_zdict([response]))
+        self.assertEqual(other.get('foo'), None)
+
+    def test_foreign_values(self):
+        self.inner.put('foo', b'<eveapi/>', 3600)
+        self.inner.put('bar', 'baz', 3600)
+        self.assertEqual(self.cache.get('foo'), None)
+        self.assertEqual(self.cache.get('bar'), None)
+
+    def test_passthrough(self):
+        cache = CompressedCache(LRUCache(max_entries=5))
+        cache.put('foo', b'bar', 3600)
+        self.assertEqual(cache.max_entries, 5)
+        cache.clear()
+        self.assertEqual(cache.get('foo'), None)
+
+    def test_validation(self):
+        self.assertRaises(ValueError, CompressedCache, {})
+        self.assertRaises(ValueError, CompressedCache, self.inner, level=10)
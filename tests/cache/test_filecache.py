@@ -0,0 +1,84 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import mock
+
+from tests.compat import unittest
+
+from evelink.cache.filecache import FileCache
+
+class FileCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = FileCache(self.cache_dir)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.cache.put('bar', 1, 3600)
+        self.cache.put('baz', b'<eveapi/>', 3600)
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertEqual(self.cache.get('bar'), 1)
+        self.assertEqual(self.cache.get('baz'), b'<eveapi/>')
+        self.assertEqual(self.cache.get('qux'), None)
+
+    def test_expire(self):
+        self.cache.put('baz', 'qux', -1)
+        self.assertEqual(self.cache.get('baz'), None)
+
+
+    def test_get_entry(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.put('foo', 'bar', 3600)
+            self.assertEqual(self.cache.get_entry('foo'), ('bar', 4600))
+            self.assertEqual(self.cache.get_entry('baz'), None)
+
+    def test_replace(self):
+        self.cache.put('foo', b'bar', 3600)
+        buf = self.cache.get_buffer('foo')
+        self.cache.put('foo', b'baz', 3600)
+        self.assertEqual(self.cache.get('foo'), b'baz')
+        self.assertEqual(bytes(buf), b'bar')
+
+    def test_get_buffer(self):
+        self.cache.put('foo', b'<eveapi/>', 3600)
+        self.cache.put('bar', {'a': 1}, 3600)
+        buf = self.cache.get_buffer('foo')
+        self.assertTrue(isinstance(buf, memoryview))
+        self.assertTrue(buf.readonly)
+        self.assertEqual(bytes(buf), b'<eveapi/>')
+        self.assertEqual(self.cache.get_buffer('bar'), {'a': 1})
+        self.assertEqual(self.cache.get_buffer('baz'), None)
+
+    def test_purge_expired(self):
+        self.cache.put('foo', 'bar', -1)
+        self.cache.put('baz', 'qux', 3600)
+        stale = os.path.join(self.cache_dir, '00', '.tmp-stale')
+        os.makedirs(os.path.dirname(stale))
+        open(stale, 'w').close()
+        os.utime(stale, (time.time() - 7200, time.time() - 7200))
+
+        self.assertEqual(self.cache.purge_expired(), 2)
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(self.cache.get('baz'), 'qux')
+
+    def test_corrupt_entry(self):
+        self.cache.put('foo', 'bar', 3600)
+        with open(self.cache._entry_path('foo'), 'wb') as f:
+            f.write(b'junk')
+        self.assertEqual(self.cache.get('foo'), None)
+        self.assertEqual(self.cache.purge_expired(), 1)
+
+    def test_other_process(self):
+        script = ('from evelink.cache.filecache import FileCache;'
+                  'FileCache(%r).put("foo", b"bar", 3600)' % self.cache_dir)
+        subprocess.check_call([sys.executable, '-c', script])
+        self.assertEqual(self.cache.get('foo'), b'bar')
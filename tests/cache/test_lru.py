@@ -0,0 +1,116 @@
+import threading
+
+import mock
+
+from tests.compat import unittest
+
+from evelink.cache import lru
+from evelink.cache.lru import LRUCache
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache()
+
+    def test_cache(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.cache.put('bar', 1, 3600)
+        self.cache.put('baz', True, 3600)
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertEqual(self.cache.get('bar'), 1)
+        self.assertEqual(self.cache.get('baz'), True)
+
+    def test_expire(self):
+        self.cache.put('baz', 'qux', -1)
+        self.assertEqual(self.cache.get('baz'), None)
+        self.assertEqual(len(self.cache), 0)
+
+
+    def test_get_entry(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.put('foo', 'bar', 3600)
+            self.assertEqual(self.cache.get_entry('foo'), ('bar', 4600))
+            self.assertEqual(self.cache.get_entry('baz'), None)
+
+    def test_max_entries(self):
+        cache = LRUCache(max_entries=2)
+        cache.put('a', b'1', 3600)
+        cache.put('b', b'2', 3600)
+        # Reading 'a' makes 'b' the least recently used entry.
+        self.assertEqual(cache.get('a'), b'1')
+        cache.put('c', b'3', 3600)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), b'1')
+        self.assertEqual(cache.get('c'), b'3')
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_entries=None, max_bytes=10)
+        cache.put('a', b'1234', 3600)
+        cache.put('b', b'5678', 3600)
+        cache.put('c', b'90ab', 3600)
+
+        self.assertEqual(cache.size, 8)
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(cache.get('c'), b'90ab')
+
+        # Values which can never fit aren't stored at all.
+        cache.put('d', b'x' * 11, 3600)
+        self.assertEqual(cache.get('d'), None)
+        self.assertEqual(cache.size, 8)
+
+    def test_replace(self):
+        self.cache.put('a', b'1234', 3600)
+        self.cache.put('a', b'12', 3600)
+        self.assertEqual(self.cache.get('a'), b'12')
+        self.assertEqual(self.cache.size, 2)
+        self.assertEqual(len(self.cache), 1)
+
+    @mock.patch('time.time')
+    def test_sweep(self, mock_time):
+        mock_time.return_value = 1000
+        cache = LRUCache(sweep_interval=60)
+        cache.put('a', b'1', 10)
+        cache.put('b', b'2', 100)
+
+        mock_time.return_value = 1061
+        cache.put('c', b'3', 100)
+        # 'a' was swept out without being read.
+        self.assertEqual(list(cache.cache.keys()), ['b', 'c'])
+        self.assertEqual(cache.size, 2)
+
+    @mock.patch('time.time')
+    def test_purge_expired(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.put('a', b'1', 10)
+        self.cache.put('b', b'2', 100)
+
+        mock_time.return_value = 1050
+        self.assertEqual(self.cache.purge_expired(), 1)
+        self.assertEqual(list(self.cache.cache.keys()), ['b'])
+
+    def test_threads(self):
+        cache = LRUCache(max_entries=50)
+        def work(n):
+            for i in range(500):
+                cache.put('%d-%d' % (n, i % 70), b'x' * (i % 7), 3600)
+                cache.get('%d-%d' % (n, (i * 7) % 70))
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(cache), 50)
+        self.assertEqual(cache.size, sum(len(v) for v, _, _ in cache.cache.values()))
+
+
+class LinkedDictLRUCacheTestCase(LRUCacheTestCase):
+    """The same tests, with the OrderedDict stand-in for Python 2.6."""
+
+    def setUp(self):
+        with mock.patch('evelink.cache.lru._OrderedDict', lru._LinkedDict):
+            self.cache = LRUCache()
+        self.assertTrue(isinstance(self.cache.cache, lru._LinkedDict))
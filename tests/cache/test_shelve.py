@@ -1,5 +1,9 @@
 import os
+import shelve
 import tempfile
+import time
+
+import mock
 
 from tests.compat import unittest
 
@@ -13,11 +17,12 @@ class ShelveCacheTestCase(unittest.TestCase):
         self.cache = ShelveCache(self.cache_path)
 
     def tearDown(self):
-        self.cache.cache.close()
-        try:
-          os.remove(self.cache_path)
-        except OSError:
-          pass
+        self.cache.close()
+        for suffix in ('', '.db', '.dat', '.dir', '.bak', '.pag'):
+            try:
+              os.remove(self.cache_path + suffix)
+            except OSError:
+              pass
         try:
           os.rmdir(self.cache_dir)
         except OSError:
@@ -30,3 +35,56 @@ class ShelveCacheTestCase(unittest.TestCase):
     def test_expire(self):
         self.cache.put('baz', 'qux', -1)
         self.assertEqual(self.cache.get('baz'), None)
+
+
+    def test_get_entry(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.put('foo', 'bar', 3600)
+            self.assertEqual(self.cache.get_entry('foo'), ('bar', 4600))
+            self.assertEqual(self.cache.get_entry('baz'), None)
+
+    def test_get_entry_reads_once(self):
+        self.cache.put('foo', 'bar', 3600)
+        with mock.patch('shelve.Unpickler', wraps=shelve.Unpickler) as unpickler:
+            self.assertEqual(self.cache.get_entry('foo')[0], 'bar')
+        self.assertEqual(unpickler.call_count, 1)
+
+    def _size(self):
+        return sum(os.path.getsize(os.path.join(self.cache_dir, name))
+                   for name in os.listdir(self.cache_dir))
+
+    def test_purge_expired(self):
+        self.cache.put('foo', 'bar', -1)
+        self.cache.put('baz', 'qux', 3600)
+        self.assertEqual(self.cache.purge_expired(), 1)
+        self.assertEqual(list(self.cache.cache.keys()), ['baz'])
+
+    def test_compact(self):
+        for i in range(200):
+            self.cache.put('key-%d' % i, 'x' * 10000, -1)
+        self.cache.put('foo', 'bar', 3600)
+        before = self._size()
+        self.cache.compact()
+        self.assertTrue(self._size() < before / 10, (before, self._size()))
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.cache.put('baz', 'qux', 3600)
+        self.assertEqual(self.cache.get('baz'), 'qux')
+
+    def test_max_entries(self):
+        self.cache.max_entries = 10
+        for i in range(11):
+            self.cache.put('key-%d' % i, i, 100 + i)
+        self.assertEqual(len(self.cache.cache), 9)
+        self.assertEqual(self.cache.get('key-0'), None)
+        self.assertEqual(self.cache.get('key-1'), None)
+        self.assertEqual(self.cache.get('key-2'), 2)
+
+    def test_background_sweep(self):
+        self.cache.close()
+        self.cache = ShelveCache(self.cache_path, sweep_interval=0.01, background_sweep=True)
+        self.cache.put('foo', 'bar', -1)
+        for _ in range(100):
+            if not len(self.cache.cache):
+                break
+            time.sleep(0.01)
+        self.assertEqual(len(self.cache.cache), 0)
@@ -1,5 +1,11 @@
+import gc
 import os
+import sqlite3
 import tempfile
+import threading
+import time
+
+import mock
 
 from tests.compat import unittest
 
@@ -13,11 +19,12 @@ class SqliteCacheTestCase(unittest.TestCase):
         self.cache = SqliteCache(self.cache_path)
 
     def tearDown(self):
-        self.cache.connection.close()
-        try:
-          os.remove(self.cache_path)
-        except OSError:
-          pass
+        self.cache.close()
+        for suffix in ('', '-wal', '-shm'):
+            try:
+              os.remove(self.cache_path + suffix)
+            except OSError:
+              pass
         try:
           os.rmdir(self.cache_dir)
         except OSError:
@@ -34,3 +41,191 @@ class SqliteCacheTestCase(unittest.TestCase):
     def test_expire(self):
         self.cache.put('baz', 'qux', -1)
         self.assertEqual(self.cache.get('baz'), None)
+
+
+    def test_get_entry(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.put('foo', 'bar', 3600)
+            self.assertEqual(self.cache.get_entry('foo'), ('bar', 4600))
+            self.cache.flush()
+            self.assertEqual(self.cache.get_entry('foo'), ('bar', 4600))
+            self.assertEqual(self.cache.get_entry('baz'), None)
+
+    def test_bytes_stored_directly(self):
+        self.cache.put('foo', b'<eveapi/>', 3600)
+        self.cache.put('bar', {'a': 1}, 3600)
+        self.cache.flush()
+        rows = dict(self.cache.connection.execute(
+            'select "key", pickled from cache_entries'))
+        self.assertEqual(rows, {'foo': 0, 'bar': 1})
+        self.assertEqual(self.cache.get('foo'), b'<eveapi/>')
+        self.assertEqual(self.cache.get('bar'), {'a': 1})
+
+    def test_group_commit(self):
+        other = SqliteCache(self.cache_path)
+        self.addCleanup(other.close)
+
+        self.cache.put('foo', 'bar', 3600)
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertEqual(other.get('foo'), None)
+
+        self.cache.flush()
+        self.assertEqual(other.get('foo'), 'bar')
+
+    def test_commit_when_full(self):
+        self.cache.max_pending = 3
+        for i in range(3):
+            self.cache.put('key-%d' % i, i, 3600)
+        count, = self.cache.connection.execute('select count(*) from cache_entries').fetchone()
+        self.assertEqual(count, 3)
+
+    def test_commit_after_interval(self):
+        self.cache.put('foo', 'bar', 3600)
+        with mock.patch('time.time', return_value=time.time() + 2):
+            self.cache.get('baz')
+        count, = self.cache.connection.execute('select count(*) from cache_entries').fetchone()
+        self.assertEqual(count, 1)
+
+    def test_sweep_expired(self):
+        self.cache.put('foo', 'bar', -1)
+        self.cache.put('baz', 'qux', 3600)
+        self.cache.flush()
+        with mock.patch('time.time', return_value=time.time() + 61):
+            self.cache.put('quux', 'corge', 3600)
+            self.cache.flush()
+        keys = sorted(k for k, in self.cache.connection.execute('select "key" from cache_entries'))
+        self.assertEqual(keys, ['baz', 'quux'])
+
+    def test_threads(self):
+        results = []
+        def worker(n):
+            for i in range(20):
+                self.cache.put('%d-%d' % (n, i), i, 3600)
+                results.append(self.cache.get('%d-%d' % (n, i)) == i)
+            self.cache.flush()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [True] * 80)
+        count, = self.cache.connection.execute('select count(*) from cache_entries').fetchone()
+        self.assertEqual(count, 80)
+
+    def test_thread_connections_closed(self):
+        self.cache.get('foo')
+        for _ in range(3):
+            threads = [threading.Thread(target=self.cache.get, args=('foo',))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        gc.collect()
+        self.assertEqual(list(self.cache._connections.values()), [self.cache.connection])
+
+        self.cache.close()
+        self.assertEqual(self.cache._connections, {})
+        self.assertEqual(self.cache.get('foo'), None)
+
+    def test_purge_expired(self):
+        self.cache.put('foo', 'bar', -1)
+        self.cache.put('baz', 'qux', 3600)
+        self.assertEqual(self.cache.purge_expired(), 1)
+        keys = [k for k, in self.cache.connection.execute('select "key" from cache_entries')]
+        self.assertEqual(keys, ['baz'])
+
+    def test_compact(self):
+        for i in range(200):
+            self.cache.put('key-%d' % i, b'x' * 10000, -1)
+        self.cache.compact()
+        size = os.path.getsize(self.cache_path)
+        self.assertTrue(size < 100000, size)
+
+    def test_max_entries(self):
+        self.cache.max_entries = 2
+        self.cache.put('foo', 'bar', 100)
+        self.cache.put('baz', 'qux', 10)
+        self.cache.put('quux', 'corge', 1000)
+        self.cache.flush()
+        self.assertEqual(self.cache.get('baz'), None)
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertEqual(self.cache.get('quux'), 'corge')
+
+    def test_max_entries_counted_when_needed(self):
+        self.cache.max_entries = 10
+        self.cache.put('foo', 'bar', 100)
+        self.cache.flush()
+        self.assertEqual(self.cache._row_count, 1)
+        self.cache.put('baz', 'qux', 100)
+        self.cache.flush()
+        # Not counted again while it can't be over size.
+        self.assertEqual(self.cache._row_count, 2)
+
+    def lock_database(self):
+        self.cache.close()
+        self.cache = SqliteCache(self.cache_path, timeout=0.2)
+        blocker = sqlite3.connect(self.cache_path, timeout=0)
+        blocker.execute('begin immediate')
+        self.addCleanup(blocker.close)
+        return blocker
+
+    def test_get_while_locked(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.cache.flush()
+        blocker = self.lock_database()
+        self.cache.put('baz', 'qux', 3600)
+
+        started = threading.Event()
+        def flush():
+            started.set()
+            self.assertRaises(sqlite3.OperationalError, self.cache.flush)
+        thread = threading.Thread(target=flush)
+        thread.start()
+        started.wait()
+        time.sleep(0.05)
+
+        start = time.time()
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertEqual(self.cache.get('baz'), 'qux')
+        self.assertTrue(time.time() - start < 0.1)
+        thread.join()
+
+        # The failed write is kept for the next flush.
+        blocker.rollback()
+        self.cache.flush()
+        other = SqliteCache(self.cache_path)
+        self.addCleanup(other.close)
+        self.assertEqual(other.get('baz'), 'qux')
+
+    def test_get_flush_error(self):
+        blocker = self.lock_database()
+        self.cache.put('foo', 'bar', 3600)
+        with mock.patch('time.time', return_value=time.time() + 2):
+            self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertTrue('foo' in self.cache._pending)
+        blocker.rollback()
+
+    def test_background_sweep(self):
+        cache = SqliteCache(self.cache_path, sweep_interval=0.01, background_sweep=True)
+        self.addCleanup(cache.close)
+        cache.put('foo', 'bar', -1)
+        cache.flush()
+        for _ in range(100):
+            count, = cache.connection.execute('select count(*) from cache_entries').fetchone()
+            if count == 0:
+                break
+            time.sleep(0.01)
+        self.assertEqual(count, 0)
+
+    def test_background_sweep_stops(self):
+        # On Python 2.6, Event.wait() always returns None.
+        wait = threading.Event.wait
+        with mock.patch.object(threading.Event, 'wait',
+                               lambda event, timeout=None: wait(event, timeout) and None):
+            cache = SqliteCache(self.cache_path, sweep_interval=0.01, background_sweep=True)
+            cache.close()
+            cache._sweeper.join(1)
+        self.assertFalse(cache._sweeper.is_alive())
@@ -0,0 +1,82 @@
+import mock
+
+from tests.compat import unittest
+
+from evelink.api import APICache
+from evelink.cache.lru import LRUCache
+from evelink.cache.tiered import TieredCache
+
+
+class DictCache(APICache):
+    """A cache which can't tell when its entries expire."""
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def put(self, key, value, duration):
+        self.cache[key] = value
+
+
+class TieredCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.l1 = LRUCache()
+        self.l2 = LRUCache()
+        self.cache = TieredCache(self.l2, self.l1)
+
+    def test_cache(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.assertEqual(self.l1.get('foo'), 'bar')
+        self.assertEqual(self.l2.get('foo'), 'bar')
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertEqual(self.cache.get('baz'), None)
+        self.assertEqual(self.cache.stats, {
+            'l1_hits': 1, 'l1_misses': 1, 'l2_hits': 0, 'l2_misses': 1})
+
+    def test_expire(self):
+        self.cache.put('baz', 'qux', -1)
+        self.assertEqual(self.cache.get('baz'), None)
+
+    def test_read_through(self):
+        with mock.patch('time.time', return_value=1000):
+            self.l2.put('foo', 'bar', 60)
+            self.assertEqual(self.cache.get('foo'), 'bar')
+            self.assertEqual(self.l1.get_entry('foo'), ('bar', 1060))
+            self.assertEqual(self.cache.get('foo'), 'bar')
+        self.assertEqual(self.cache.stats, {
+            'l1_hits': 1, 'l1_misses': 1, 'l2_hits': 1, 'l2_misses': 0})
+
+    def test_l1_max_ttl(self):
+        cache = TieredCache(self.l2, self.l1, l1_max_ttl=10)
+        with mock.patch('time.time', return_value=1000):
+            cache.put('foo', 'bar', 60)
+            self.assertEqual(self.l1.get_entry('foo'), ('bar', 1010))
+            self.assertEqual(self.l2.get_entry('foo'), ('bar', 1060))
+
+            self.l1.clear()
+            self.assertEqual(cache.get('foo'), 'bar')
+            self.assertEqual(self.l1.get_entry('foo'), ('bar', 1010))
+
+    def test_unknown_expiration(self):
+        l2 = DictCache()
+        l2.put('foo', 'bar', 60)
+        TieredCache(l2, self.l1).get('foo')
+        self.assertEqual(self.l1.get('foo'), None)
+
+        TieredCache(l2, self.l1, l1_max_ttl=10).get('foo')
+        self.assertEqual(self.l1.get('foo'), 'bar')
+
+    def test_default_l1(self):
+        cache = TieredCache(self.l2)
+        self.assertTrue(isinstance(cache.l1, LRUCache))
+        self.assertEqual(cache.l1.max_entries, 1000)
+
+    def test_purge_expired(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.put('foo', 'bar', 60)
+        self.assertEqual(self.cache.purge_expired(), 1)
+        self.assertEqual(len(self.l1), 0)
+
+    def test_validation(self):
+        self.assertRaises(ValueError, TieredCache, {})
+        self.assertRaises(ValueError, TieredCache, self.l2, {})
@@ -0,0 +1,119 @@
+import os
+import shutil
+import struct
+import tempfile
+
+import mock
+
+from tests.compat import unittest
+from tests.utils import make_api_result
+
+from evelink.parsing import assets as evelink_a
+from evelink.parsing.asset_snapshot import AssetSnapshot, diff_assets
+
+
+class AssetSnapshotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        api_result, _, _ = make_api_result("corp/assets.xml")
+        self.snapshot = AssetSnapshot.from_index(evelink_a.parse_asset_index(api_result))
+        self.assets = evelink_a.parse_assets(api_result)
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_from_index(self):
+        self.assertEqual(len(self.snapshot), 5)
+        self.assertEqual(list(self.snapshot.ids),
+                         [374680079, 1007221285456, 1007222140712, 1007353294812, 1007353294813])
+        self.assertEqual(self.snapshot.item(3), {
+            'id': 1007353294812,
+            'item_type_id': 34,
+            'location_id': 30003719,
+            'container_id': 1007222140712,
+            'location_flag': 42,
+            'quantity': 100,
+        })
+        self.assertEqual(self.snapshot.item(0)['container_id'], 0)
+
+    def test_from_assets(self):
+        other = AssetSnapshot.from_assets(self.assets)
+        self.assertEqual([other.item(i) for i in range(len(other))],
+                         [self.snapshot.item(i) for i in range(len(self.snapshot))])
+
+    def test_save_load(self):
+        path = os.path.join(self.tmpdir, 'assets.snap')
+        self.snapshot.save(path)
+        loaded = AssetSnapshot.load(path)
+        self.assertEqual(loaded.ids, self.snapshot.ids)
+        self.assertEqual(loaded.columns, self.snapshot.columns)
+        self.assertEqual(os.listdir(self.tmpdir), ['assets.snap'])
+
+    def test_load_invalid(self):
+        path = os.path.join(self.tmpdir, 'assets.snap')
+        with open(path, 'wb') as f:
+            f.write(b'not a snapshot at all')
+        self.assertRaises(ValueError, AssetSnapshot.load, path)
+
+    def test_file_format(self):
+        path = os.path.join(self.tmpdir, 'assets.snap')
+        AssetSnapshot([(2 ** 40, 34, 100, 0, 4, 10)]).save(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.assertEqual(data, struct.pack('<4sQB6q', b'EAS2', 1, 8, 2 ** 40, 34, 100, 0, 4, 10))
+
+    def test_without_int64_arrays(self):
+        path = os.path.join(self.tmpdir, 'assets.snap')
+        self.snapshot.save(path)
+        with mock.patch('evelink.parsing.asset_snapshot._INT64', None):
+            snapshot = AssetSnapshot.load(path)
+            self.assertTrue(isinstance(snapshot.ids, list))
+            self.assertEqual(snapshot.ids, list(self.snapshot.ids))
+            other_path = os.path.join(self.tmpdir, 'other.snap')
+            snapshot.save(other_path)
+        with open(path, 'rb') as f:
+            with open(other_path, 'rb') as other:
+                self.assertEqual(f.read(), other.read())
+
+    def test_load_wrong_item_size(self):
+        path = os.path.join(self.tmpdir, 'assets.snap')
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sQB6i', b'EAS2', 1, 4, 1, 34, 100, 0, 4, 10))
+        self.assertRaises(ValueError, AssetSnapshot.load, path)
+
+    def test_load_truncated(self):
+        path = os.path.join(self.tmpdir, 'assets.snap')
+        self.snapshot.save(path)
+        with open(path, 'rb+') as f:
+            f.truncate(os.path.getsize(path) - 1)
+        self.assertRaises(ValueError, AssetSnapshot.load, path)
+
+    def test_diff_unchanged(self):
+        self.assertEqual(diff_assets(self.snapshot, self.snapshot),
+                         {'added': [], 'removed': [], 'moved': [], 'quantity_changed': []})
+
+    def test_diff(self):
+        old = AssetSnapshot([
+            (1, 34, 100, 0, 4, 10),
+            (2, 35, 100, 0, 4, 10),
+            (3, 36, 100, 0, 4, 10),
+            (5, 37, 100, 0, 4, 10),
+        ])
+        new = AssetSnapshot([
+            (6, 38, 100, 0, 4, 1),
+            (5, 37, 200, 0, 4, 5),
+            (3, 36, 100, 0, 4, 20),
+            (2, 35, 100, 6, 4, 10),
+            (0, 33, 100, 0, 4, 1),
+        ])
+        diff = diff_assets(old, new)
+
+        self.assertEqual([item['id'] for item in diff['added']], [0, 6])
+        self.assertEqual([item['id'] for item in diff['removed']], [1])
+        self.assertEqual([(o['id'], o['location_id'], n['location_id'], n['container_id'])
+                          for o, n in diff['moved']],
+                         [(2, 100, 100, 6), (5, 100, 200, 0)])
+        self.assertEqual([(o['id'], o['quantity'], n['quantity'])
+                          for o, n in diff['quantity_changed']],
+                         [(3, 10, 20), (5, 10, 5)])
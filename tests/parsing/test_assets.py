@@ -1,3 +1,5 @@
+from xml.etree import ElementTree
+
 from tests.compat import unittest
 from tests.utils import make_api_result
 
@@ -51,3 +53,67 @@ class AssetsTestCase(unittest.TestCase):
                      'quantity': 1,
                      'raw_quantity': -2}],
                 'location_id': 67000050}})
+
+
+class AssetIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        api_result, _, _ = make_api_result("corp/assets.xml")
+        self.index = evelink_a.parse_asset_index(api_result)
+        self.assets = evelink_a.parse_assets(api_result)
+
+    def test_items(self):
+        self.assertEqual(len(self.index), 5)
+        self.assertTrue(1007353294812 in self.index)
+        self.assertFalse(1 in self.index)
+        self.assertEqual(self.index.get(1), None)
+        self.assertEqual(self.index[1007353294812]['quantity'], 100)
+        self.assertEqual(sorted(item['id'] for item in self.index),
+                         [374680079, 1007221285456, 1007222140712, 1007353294812, 1007353294813])
+
+    def test_same_items_as_parse_assets(self):
+        key = lambda item: item['id']
+        self.assertEqual(sorted(self.index.roots, key=key),
+                         sorted((item for location in self.assets.values()
+                                 for item in location['contents']), key=key))
+
+    def test_parents(self):
+        self.assertEqual(self.index.parent(1007353294812)['id'], 1007222140712)
+        self.assertEqual(self.index.parent(1007222140712), None)
+        self.assertEqual(self.index.root(1007353294812)['id'], 1007222140712)
+        self.assertEqual(self.index.root(374680079)['id'], 374680079)
+        self.assertEqual(self.index.root_location(1007353294813), 30003719)
+
+    def test_of_type(self):
+        self.assertEqual([item['id'] for item in self.index.of_type(34)],
+                         [1007353294812, 1007353294813])
+        self.assertEqual(self.index.of_type(1), [])
+
+    def test_at_location(self):
+        self.assertEqual(sorted(item['id'] for item in self.index.at_location(67000050)),
+                         [374680079, 1007221285456])
+        self.assertEqual(len(self.index.at_location(30003719)), 3)
+        self.assertEqual(self.index.at_location(1), [])
+
+    def test_quantities(self):
+        self.assertEqual(self.index.quantities(1007222140712), {34: 300})
+        self.assertEqual(self.index.quantities(1007353294812), {})
+
+    def test_nested_quantities(self):
+        api_result = ElementTree.fromstring(
+            '<result><rowset>'
+            '<row itemID="1" locationID="10" typeID="100" quantity="1" flag="0" singleton="1">'
+            '<rowset><row itemID="2" typeID="200" quantity="1" flag="0" singleton="1">'
+            '<rowset><row itemID="3" typeID="300" quantity="5" flag="0" singleton="0"/>'
+            '<row itemID="4" typeID="200" quantity="2" flag="0" singleton="0"/></rowset>'
+            '</row></rowset></row></rowset></result>')
+        index = evelink_a.parse_asset_index(api_result)
+        self.assertEqual(index.quantities(1), {200: 3, 300: 5})
+        self.assertEqual(index.quantities(2), {200: 2, 300: 5})
+        self.assertEqual(index.root_location(4), 10)
+        self.assertEqual(index.parent(4)['id'], 2)
+
+    def test_walk(self):
+        self.assertEqual([item['id'] for item in self.index.walk(1007222140712)],
+                         [1007222140712, 1007353294812, 1007353294813])
+        self.assertEqual([item['id'] for item in self.index.walk(374680079)], [374680079])
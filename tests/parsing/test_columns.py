@@ -0,0 +1,117 @@
+import array
+from xml.etree import ElementTree
+
+import mock
+
+from tests.compat import unittest
+from tests.utils import make_api_result
+
+from evelink.parsing import columns
+from evelink.parsing import orders as evelink_o
+from evelink.parsing import wallet_journal as evelink_wj
+from evelink.parsing import wallet_transactions as evelink_wt
+
+
+def flatten(row, prefix=''):
+    result = {}
+    for name, value in row.items():
+        if isinstance(value, dict):
+            result.update(flatten(value, prefix + name + '.'))
+        else:
+            result[prefix + name] = value
+    return result
+
+
+class ColumnsTestCase(unittest.TestCase):
+
+    def assert_same_rows(self, cols, rows):
+        self.assertEqual(cols.row_count, len(rows))
+        self.assertEqual([cols.row(i) for i in range(cols.row_count)], rows)
+
+    def test_wallet_journal(self):
+        api_result, _, _ = make_api_result("char/wallet_journal.xml")
+        cols = evelink_wj.parse_wallet_journal_columns(api_result)
+        rows = evelink_wj.parse_wallet_journal(api_result)
+
+        self.assert_same_rows(cols, [flatten(row) for row in rows])
+        self.assertTrue(isinstance(cols['id'], array.array))
+        self.assertTrue(isinstance(cols['amount'], array.array))
+        self.assertTrue(isinstance(cols['reason'], list))
+
+    def test_int64_typecode(self):
+        typecode = columns.int64_typecode()
+        self.assertTrue(typecode is None or array.array(typecode).itemsize == 8)
+
+        # As on Python 2 on Windows: no 'q', and a 32-bit 'l'.
+        real_array = array.array
+        def fake_array(typecode):
+            if typecode == 'q':
+                raise ValueError(typecode)
+            return real_array('i')
+        with mock.patch.object(columns.array, 'array', fake_array):
+            self.assertEqual(columns.int64_typecode(), None)
+
+    def test_wallet_transactions(self):
+        api_result, _, _ = make_api_result("char/wallet_transactions.xml")
+        cols = evelink_wt.parse_wallet_transactions_columns(api_result)
+        rows = evelink_wt.parse_wallet_transactions(api_result)
+
+        expected = []
+        for row in rows:
+            row.setdefault('char', {'id': 0, 'name': ''})
+            expected.append(flatten(row))
+        self.assert_same_rows(cols, expected)
+
+    def test_market_orders(self):
+        api_result, _, _ = make_api_result("char/orders.xml")
+        cols = evelink_o.parse_market_orders_columns(api_result)
+        orders = evelink_o.parse_market_orders(api_result)
+
+        self.assertEqual(dict((row['id'], row) for row in
+                              (cols.row(i) for i in range(cols.row_count))),
+                         orders)
+
+    def test_strings_interned(self):
+        api_result, _, _ = make_api_result("char/orders.xml")
+        cols = evelink_o.parse_market_orders_columns(api_result)
+        self.assertTrue(cols['status'][0] is cols['status'][1])
+
+    def test_non_ascii_strings(self):
+        api_result = ElementTree.fromstring(
+            u'<result><rowset><row name="\u00c9ve" when=""/></rowset></result>'.encode('utf-8'))
+        parse = columns.column_parser([
+            ('name', 'name', columns.STRING),
+            ('upper', 'name', columns.string(lambda v: v.upper())),
+        ])
+        cols = parse(api_result)
+        self.assertEqual(cols['name'], [u'\u00c9ve'])
+        self.assertEqual(cols['upper'], [u'\u00c9VE'])
+
+    def test_empty_timestamps(self):
+        api_result = ElementTree.fromstring(
+            b'<result><rowset><row when=""/><row when="0001-01-01 00:00:00"/>'
+            b'<row when="2013-01-01 00:00:00"/></rowset></result>')
+        cols = columns.column_parser([('when', 'when', columns.TIMESTAMP)])(api_result)
+        self.assertEqual(list(cols['when']), [0, 0, 1356998400])
+
+    def test_sort(self):
+        cols = columns.Columns({
+            'id': array.array('l', [3, 1, 2]),
+            'name': ['c', 'a', 'b'],
+        }, 3)
+        cols.sort('id')
+        self.assertEqual(list(cols['id']), [1, 2, 3])
+        self.assertTrue(isinstance(cols['id'], array.array))
+        self.assertEqual(cols['name'], ['a', 'b', 'c'])
+
+    @unittest.skipIf(columns._has_numpy, 'NumPy is installed')
+    def test_to_numpy_missing(self):
+        self.assertRaises(ImportError, columns.Columns().to_numpy)
+
+    @unittest.skipIf(not columns._has_numpy, 'NumPy is not installed')
+    def test_to_numpy(self):
+        api_result, _, _ = make_api_result("char/wallet_journal.xml")
+        cols = evelink_wj.parse_wallet_journal_columns(api_result)
+        arrays = cols.to_numpy()
+        self.assertEqual(arrays['amount'].sum(), sum(cols['amount']))
+        self.assertEqual(list(arrays['reason']), cols['reason'])
@@ -1,3 +1,5 @@
+from xml.etree import ElementTree
+
 import mock
 
 from tests.compat import unittest
@@ -86,3 +88,17 @@ class ContactsTestCase(unittest.TestCase):
         self.assertFalse('personal' in result)
 
         self.assertEqual(sorted(result.keys()), sorted(expected_result.keys()))
+
+    def test_parse_watchlist_values(self):
+        api_result = ElementTree.fromstring(
+            '<result><rowset name="contactList">'
+            '<row contactID="1" contactName="A" standing="0" inWatchlist="True"/>'
+            '<row contactID="2" contactName="B" standing="0" inWatchlist="False"/>'
+            '<row contactID="3" contactName="C" standing="0" inWatchlist=""/>'
+            '<row contactID="4" contactName="D" standing="0"/>'
+            '</rowset></result>')
+
+        result = contact_list.parse_contact_list(api_result)['personal']
+
+        self.assertEqual([result[i]['in_watchlist'] for i in (1, 2, 3, 4)],
+                         [True, False, False, None])
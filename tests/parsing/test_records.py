@@ -0,0 +1,80 @@
+import pickle
+import sys
+
+from tests.compat import unittest
+from tests.utils import make_api_result
+
+from evelink.parsing import records
+from evelink.parsing import orders as evelink_o
+from evelink.parsing import wallet_journal as evelink_wj
+
+
+class RecordsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.row = {
+            'id': 1,
+            'party_1': {'id': 2, 'name': 'Foo'},
+            'for': 'personal',
+        }
+
+    def test_to_record(self):
+        record = records.to_record(self.row)
+        self.assertEqual(record.id, 1)
+        self.assertEqual(record.party_1.name, 'Foo')
+        self.assertEqual(record['party_1']['id'], 2)
+        self.assertEqual(record['for'], 'personal')
+        self.assertRaises(KeyError, lambda: record['missing'])
+        self.assertEqual(record.get('missing', 3), 3)
+        self.assertTrue('party_1' in record)
+        self.assertEqual(sorted(record), ['for', 'id', 'party_1'])
+        self.assertEqual(len(record), 3)
+
+    def test_compare(self):
+        record = records.to_record(self.row)
+        self.assertEqual(record, self.row)
+        self.assertEqual(self.row, record)
+        self.assertEqual(record, records.to_record(self.row))
+        self.assertNotEqual(record, dict(self.row, id=2))
+        self.assertNotEqual(record, dict(self.row, extra=None))
+        self.assertEqual(record.to_dict(), self.row)
+
+    def test_types_shared(self):
+        first = records.to_record(self.row)
+        second = records.to_record(dict(self.row, id=5))
+        self.assertTrue(type(first) is type(second))
+        self.assertFalse(hasattr(first, '__dict__'))
+
+    def test_keyword_fields(self):
+        record = records.record_type(('for', 'id'))('personal', 1)
+        self.assertEqual(record['for'], 'personal')
+        self.assertEqual(record.id, 1)
+
+    def test_pickle(self):
+        record = records.to_record(self.row)
+        self.assertEqual(pickle.loads(pickle.dumps(record, 2)), record)
+
+    def test_invalid_field(self):
+        self.assertRaises(ValueError, records.record_type, ['items'])
+        self.assertRaises(ValueError, records.record_type, ['_id'])
+
+    def test_to_records(self):
+        self.assertEqual(records.to_records({}), {})
+        self.assertEqual(records.to_records(None), None)
+        by_id = records.to_records({1: self.row})
+        self.assertTrue(isinstance(by_id[1], records.Record))
+        self.assertTrue(isinstance(records.to_records(self.row), records.Record))
+        self.assertEqual(records.to_dicts(records.to_records([self.row])), [self.row])
+
+    def test_parsed_results(self):
+        api_result, _, _ = make_api_result("char/wallet_journal.xml")
+        journal = evelink_wj.parse_wallet_journal(api_result)
+        self.assertEqual(records.to_records(journal), journal)
+
+        api_result, _, _ = make_api_result("char/orders.xml")
+        orders = evelink_o.parse_market_orders(api_result)
+        self.assertEqual(records.to_records(orders), orders)
+
+    def test_smaller(self):
+        row = dict((name, 0) for name in 'abcdefghijkl')
+        self.assertTrue(sys.getsizeof(records.to_record(row)) * 2 < sys.getsizeof(row))
@@ -0,0 +1,139 @@
+from xml.etree import ElementTree
+
+from tests.compat import unittest
+from tests.utils import make_api_result
+
+from evelink.parsing import records
+from evelink.parsing import schema as s
+from evelink.parsing import wallet_transactions as evelink_wt
+
+
+def make_row(**attrib):
+    return ElementTree.Element('row', attrib)
+
+
+class SchemaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = s.Schema([
+            ('id', s.Int('itemID')),
+            ('price', s.Float('price', default=None)),
+            ('ts', s.Ts('date')),
+            ('owner', [
+                ('id', s.Int('ownerID')),
+                ('name', s.Str('ownerName')),
+            ]),
+            ('note', s.Str('note', optional=True)),
+        ])
+
+    def test_row_parser(self):
+        parse_row = self.schema.row_parser()
+        row = make_row(itemID='1', price='2.5', date='2013-01-01 00:00:00',
+                       ownerID='3', ownerName='Foo', note='bar')
+        self.assertEqual(parse_row(row), {
+            'id': 1,
+            'price': 2.5,
+            'ts': 1356998400,
+            'owner': {'id': 3, 'name': 'Foo'},
+            'note': 'bar',
+        })
+
+    def test_defaults(self):
+        parse_row = self.schema.row_parser()
+        row = make_row(itemID='1', price='', date='2013-01-01 00:00:00',
+                       ownerID='3', ownerName='Foo')
+        result = parse_row(row)
+        self.assertEqual(result['price'], None)
+        self.assertFalse('note' in result)
+
+        del row.attrib['ownerID']
+        self.assertRaises(KeyError, parse_row, row)
+
+    def test_missing(self):
+        parse_row = s.Schema([('flag', s.Bool('flag', missing=None))]).row_parser()
+        self.assertEqual(parse_row(make_row(flag='1')), {'flag': True})
+        self.assertEqual(parse_row(make_row(flag='')), {'flag': False})
+        self.assertEqual(parse_row(make_row()), {'flag': None})
+
+    def test_compiled_once(self):
+        self.assertTrue(self.schema.row_parser() is self.schema.row_parser())
+
+    def test_source(self):
+        source, namespace = self.schema.source()
+        self.assertTrue(source.startswith('def parse_row(row):\n'))
+        self.assertTrue("'id': int(a['itemID'])," in source)
+        self.assertTrue("if 'note' in a:" in source)
+        self.assertEqual(len(namespace), 2)
+
+    def test_optional_group(self):
+        parse_row = s.Schema([
+            ('id', s.Int('id')),
+            ('char', s.Optional('charID', [
+                ('id', s.Int('charID')),
+                ('name', s.Str('charName')),
+            ])),
+        ]).row_parser()
+        self.assertEqual(parse_row(make_row(id='1')), {'id': 1})
+        self.assertEqual(parse_row(make_row(id='1', charID='2', charName='Foo')),
+                         {'id': 1, 'char': {'id': 2, 'name': 'Foo'}})
+
+    def test_optional_in_optional_group(self):
+        self.assertRaises(ValueError, s.Schema, [
+            ('char', s.Optional('charID', [
+                ('id', s.Int('charID')),
+                ('corp', s.Optional('corpID', [('id', s.Int('corpID'))])),
+            ])),
+        ])
+        self.assertRaises(ValueError, s.Schema, [
+            ('char', s.Optional('charID', [
+                ('corp', [('name', s.Str('corpName', optional=True))]),
+            ])),
+        ])
+
+    def test_bool_map_custom(self):
+        parse_row = s.Schema([
+            ('read', s.Bool('read')),
+            ('watched', s.Bool('watched', true_value='True')),
+            ('upper', s.Map('name', lambda v: v.upper())),
+            ('both', s.Custom(lambda a: a['name'] + a['read'])),
+        ]).row_parser()
+        self.assertEqual(parse_row(make_row(read='1', watched='False', name='foo')), {
+            'read': True,
+            'watched': False,
+            'upper': 'FOO',
+            'both': 'foo1',
+        })
+
+    def test_record_parser(self):
+        parse_record = self.schema.record_parser()
+        row = make_row(itemID='1', price='', date='2013-01-01 00:00:00',
+                       ownerID='3', ownerName='Foo')
+        record = parse_record(row)
+        self.assertTrue(isinstance(record, records.Record))
+        self.assertEqual(record.owner.name, 'Foo')
+        self.assertEqual(record, self.schema.row_parser()(row))
+        self.assertEqual(record._fields, records.to_record(self.schema.row_parser()(row))._fields)
+
+        row.attrib['note'] = 'bar'
+        self.assertEqual(parse_record(row).note, 'bar')
+
+    def test_record_parser_optional_group(self):
+        api_result, _, _ = make_api_result("char/wallet_transactions.xml")
+        parse_row = evelink_wt.WALLET_TRANSACTIONS_ROW.row_parser()
+        parse_record = evelink_wt.WALLET_TRANSACTIONS_ROW.record_parser()
+        rows = api_result.find('rowset').findall('row')
+        self.assertEqual([parse_record(row) for row in rows],
+                         [parse_row(row) for row in rows])
+        self.assertTrue(any('char' not in parse_record(row) for row in rows))
+
+    def test_column_parser(self):
+        api_result, _, _ = make_api_result("char/wallet_transactions.xml")
+        cols = evelink_wt.WALLET_TRANSACTIONS_ROW.column_parser()(api_result)
+        rows = evelink_wt.parse_wallet_transactions(api_result)
+        self.assertEqual(list(cols['id']), [row['id'] for row in rows])
+        self.assertEqual(cols['char.name'],
+                         [row.get('char', {}).get('name', '') for row in rows])
+
+    def test_column_parser_needs_kinds(self):
+        schema = s.Schema([('both', s.Custom(lambda a: None))])
+        self.assertRaises(ValueError, schema.column_parser)
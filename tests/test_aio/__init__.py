@@ -0,0 +1,51 @@
+import sys
+import mock
+
+from tests.compat import unittest
+from tests.utils import make_api_result
+
+try:
+    import asyncio
+except ImportError:
+    NO_ASYNCIO = True
+else:
+    NO_ASYNCIO = sys.version_info[0:2] < (3, 5)
+
+
+def make_future(loop, result):
+    future = loop.create_future()
+    future.set_result(result)
+    return future
+
+
+@unittest.skipIf(NO_ASYNCIO, 'asyncio support requires python 3.5+')
+class AsyncTestCase(unittest.TestCase):
+    """Base class for tests of the evelink.aio package."""
+
+    def setUp(self):
+        super(AsyncTestCase, self).setUp()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        super(AsyncTestCase, self).tearDown()
+
+    def run_async(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+    def compare(self, client, method_name, src, *args, **kw):
+        """Check that a method and its _async twin give the same result."""
+        raw_resp = make_api_result(src)
+        api = client.api
+        api.get = mock.Mock(return_value=raw_resp)
+        api.get_async = mock.Mock(
+            side_effect=lambda *a, **k: make_future(self.loop, raw_resp))
+
+        sync_r = getattr(client, method_name)(*args, **kw)
+        async_r = self.run_async(
+            getattr(client, '%s_async' % method_name)(*args, **kw))
+
+        self.assertEqual(sync_r, async_r)
+        self.assertEqual(1, api.get.call_count)
+        self.assertEqual(1, api.get_async.call_count)
+        self.assertEqual(api.get.call_args, api.get_async.call_args)
@@ -0,0 +1,138 @@
+import mock
+
+from tests.compat import unittest
+from tests.test_aio import AsyncTestCase, make_future
+
+import evelink.api as evelink_api
+
+try:
+    from evelink.aio import api as aio_api
+except (ImportError, SyntaxError):
+    aio_api = None
+
+
+class AsyncAPITestCase(AsyncTestCase):
+
+    def setUp(self):
+        super(AsyncAPITestCase, self).setUp()
+        self.cache = mock.MagicMock(spec=evelink_api.APICache)
+        self.cache.get.return_value = None
+        self.transport = mock.Mock()
+        self.api = aio_api.AsyncAPI(cache=self.cache, transport=self.transport)
+
+        self.test_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result>
+                        <rowset>
+                            <row foo="bar" />
+                            <row foo="baz" />
+                        </rowset>
+                    </result>
+                    <cachedUntil>2009-11-18 17:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+        self.error_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <error code="123">
+                        Test error message.
+                    </error>
+                    <cachedUntil>2009-11-18 19:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+    def _respond(self, body):
+        self.transport.send.side_effect = (
+            lambda *a: make_future(self.loop, (body, mock.sentinel.robj)))
+
+    def test_get_async(self):
+        self._respond(self.test_xml)
+
+        result, current, expiry = self.run_async(
+            self.api.get_async('foo/Bar', {'a': [1, 2, 3]}))
+
+        rows = result.find('rowset').findall('row')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0].attrib['foo'], 'bar')
+        self.assertEqual(current, 1255885531)
+        self.assertEqual(expiry, 1258563931)
+        self.transport.send.assert_called_once_with(
+            self.api, 'https://api.eveonline.com/foo/Bar.xml.aspx', {'a': '1,2,3'})
+        self.cache.put.assert_called_once_with(
+            self.api._cache_key('foo/Bar', {'a': '1,2,3'}),
+            self.test_xml,
+            1258563931 - 1255885531,
+        )
+
+    def test_cached_get_async(self):
+        self.cache.get.return_value = self.test_xml
+
+        result, current, expiry = self.run_async(self.api.get_async('foo/Bar'))
+
+        self.assertFalse(self.transport.send.called)
+        self.assertFalse(self.cache.put.called)
+        self.assertEqual(len(result.find('rowset').findall('row')), 2)
+
+    def test_get_async_with_error(self):
+        self._respond(self.error_xml)
+
+        self.assertRaises(evelink_api.APIError,
+            self.run_async, self.api.get_async('eve/Error'))
+        self.assertEqual(self.api.last_timestamps, {
+            'current_time': 1255885531,
+            'cached_until': 1258571131,
+        })
+
+    def test_get_async_with_apikey(self):
+        self._respond(self.test_xml)
+        self.api.api_key = (1, 'code')
+
+        self.run_async(self.api.get_async('foo', {'a': 2}))
+
+        self.transport.send.assert_called_once_with(
+            self.api, 'https://api.eveonline.com/foo.xml.aspx',
+            {'a': '2', 'keyID': 1, 'vCode': 'code'})
+
+    def test_executor_transport(self):
+        transport = aio_api.ExecutorTransport()
+        api = aio_api.AsyncAPI(cache=self.cache, transport=transport)
+        api.send_request = mock.Mock(return_value=(self.test_xml, None))
+
+        result, _, _ = self.run_async(api.get_async('foo/Bar'))
+
+        api.send_request.assert_called_once_with(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', {})
+        self.assertEqual(len(result.find('rowset').findall('row')), 2)
+
+
+class AutoAsyncTestCase(AsyncTestCase):
+
+    def test_auto_async(self):
+        class Client(object):
+            def __init__(self, api):
+                self.api = api
+                self.char_id = 1
+
+            @evelink_api.auto_call('foo/bar', prop_to_param=('char_id',),
+                                   map_params={'char_id': 'id', 'limit': 'limit'})
+            def func(self, limit=None, api_result=None):
+                return api_result
+
+        Client = aio_api.auto_async(Client)
+        client = Client(mock.Mock())
+        client.api.get_async.side_effect = (
+            lambda *a, **kw: make_future(self.loop, mock.sentinel.api_result))
+
+        self.assertEqual(Client.func_async.__doc__, "Asynchronous version of func.")
+        result = self.run_async(client.func_async(limit=5))
+        self.assertEqual(result, mock.sentinel.api_result)
+        client.api.get_async.assert_called_once_with(
+            'foo/bar', params={'id': 1, 'limit': 5})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+from tests.compat import unittest
+from tests.test_aio import AsyncTestCase
+
+try:
+    from evelink.aio import AsyncAPI
+    from evelink.aio.char import Char
+    from evelink.aio.corp import Corp
+    from evelink.aio.eve import EVE
+    from evelink.aio.map import Map
+    from evelink.aio.server import Server
+    from evelink.aio.account import Account
+except (ImportError, SyntaxError):
+    pass
+
+
+class AsyncWrappersTestCase(AsyncTestCase):
+
+    def setUp(self):
+        super(AsyncWrappersTestCase, self).setUp()
+        self.api = AsyncAPI()
+
+    def test_char_assets_async(self):
+        self.compare(Char(1, self.api), 'assets', 'corp/assets.xml')
+
+    def test_char_wallet_journal_async(self):
+        self.compare(Char(1, self.api), 'wallet_journal',
+                     'char/wallet_journal.xml', before_id=1234, limit=50)
+
+    def test_char_wallet_journal_records_async(self):
+        self.compare(Char(1, self.api), 'wallet_journal',
+                     'char/wallet_journal.xml', limit=50, result_mode='records')
+
+    def test_char_wallet_balance_async(self):
+        self.compare(Char(1, self.api), 'wallet_balance', 'char/wallet_info.xml')
+
+    def test_corp_members_async(self):
+        self.compare(Corp(self.api), 'members', 'corp/members.xml')
+
+    def test_eve_character_name_from_id_async(self):
+        self.compare(EVE(api=self.api), 'character_name_from_id',
+                     'eve/character_name.xml', 1)
+
+    def test_eve_default_api(self):
+        self.assertTrue(isinstance(EVE().api, AsyncAPI))
+
+    def test_map_sov_by_system_async(self):
+        self.compare(Map(api=self.api), 'sov_by_system', 'map/sov_by_system.xml')
+
+    def test_server_status_async(self):
+        self.compare(Server(api=self.api), 'server_status', 'server/server_status.xml')
+
+    def test_account_characters_async(self):
+        self.compare(Account(self.api), 'characters', 'account/characters.xml')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,10 @@
+import calendar
+import os
+import shutil
 import sys
+import tempfile
+import threading
+import time
 import zlib
 import mock
 from xml.etree import ElementTree
@@ -8,6 +14,9 @@ from tests.compat import unittest
 from evelink.thirdparty.six import BytesIO as StringIO
 from evelink.thirdparty.six.moves import urllib
 import evelink.api as evelink_api
+from evelink.cache.lru import LRUCache
+from evelink.hooks import Hooks
+from evelink.metrics import Metrics
 
 # Python 2.6's ElementTree raises xml.parsers.expat.ExpatError instead
 # of ElementTree.ParseError
@@ -27,6 +36,31 @@ class HelperTestCase(unittest.TestCase):
             1339502673,
         )
 
+    def test_parse_ts_empty(self):
+        self.assertEqual(evelink_api.parse_ts(""), None)
+        self.assertEqual(evelink_api.parse_ts("0001-01-01 00:00:00"), None)
+        self.assertEqual(evelink_api.parse_ts("1970-01-01 00:00:00"), None)
+
+    def test_parse_ts_matches_strptime(self):
+        for v in ("1970-01-01 00:00:01", "2000-02-29 23:59:59", "2038-01-19 03:14:08",
+                  "2012-12-31 23:59:60", "2012-6-1 1:2:3", "9999-12-31 23:59:59"):
+            self.assertEqual(evelink_api.parse_ts(v),
+                             calendar.timegm(time.strptime(v, "%Y-%m-%d %H:%M:%S")))
+
+    def test_parse_ts_invalid(self):
+        for v in ("2012-02-30 00:00:00", "2012-06-12 24:00:00", "2012-06-12", "garbage",
+                  "2014-01-01 00:00:00\n"):
+            self.assertRaises(ValueError, evelink_api.parse_ts, v)
+
+    def test_parse_ts_cache(self):
+        evelink_api._ts_cache.clear()
+        evelink_api.parse_ts("2012-06-12 12:04:33")
+        self.assertEqual(evelink_api._ts_cache, {"2012-06-12 12:04:33": 1339502673})
+
+        with mock.patch.object(evelink_api, '_TS_CACHE_SIZE', 1):
+            evelink_api.parse_ts("2012-06-12 12:04:34")
+        self.assertEqual(evelink_api._ts_cache, {"2012-06-12 12:04:34": 1339502674})
+
 class CacheTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -78,6 +112,14 @@ class APITestCase(unittest.TestCase):
     def tearDown(self):
         evelink_api._has_requests = self._has_requests
 
+    def test_empty_cache(self):
+        cache = LRUCache()
+        self.assertTrue(evelink_api.API(cache=cache).cache is cache)
+
+    def test_result_mode(self):
+        self.assertEqual(self.api.result_mode, 'dict')
+        self.assertRaises(ValueError, evelink_api.API, result_mode='bogus')
+
     def test_cache_key(self):
         assert self.api._cache_key('foo/bar', {})
         assert self.api._cache_key('foo/bar', {'baz': 'qux'})
@@ -310,6 +352,301 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(current, 1255885531)
         self.assertEqual(expiry, 1258563931)
 
+class IterRowsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = mock.MagicMock(spec=evelink_api.APICache)
+        self.cache.get.return_value = None
+        self.api = evelink_api.API(cache=self.cache)
+        self.test_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result>
+                        <rowset name="items">
+                            <row id="1" />
+                            <row id="2">
+                                <rowset name="contents">
+                                    <row id="3" />
+                                </rowset>
+                            </row>
+                        </rowset>
+                    </result>
+                    <cachedUntil>2009-11-18 17:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+        self.error_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <error code="123">
+                        Test error message.
+                    </error>
+                    <cachedUntil>2009-11-18 19:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+    def test_iter_rows(self):
+        self.api.send_request = mock.Mock(return_value=(self.test_xml, None))
+
+        seen = []
+        for row in self.api.iter_rows('corp/AssetList', {'a': 1}):
+            seen.append((row.attrib['id'], [r.attrib['id'] for r in row.findall('rowset/row')]))
+            # Nothing but the current row is kept in the tree
+            self.assertEqual(self.cache.put.called, False)
+
+        self.assertEqual(seen, [('1', []), ('2', ['3'])])
+        self.api.send_request.assert_called_once_with(
+            'https://api.eveonline.com/corp/AssetList.xml.aspx', {'a': '1'})
+        self.cache.put.assert_called_once_with(
+            self.api._cache_key('corp/AssetList', {'a': '1'}),
+            self.test_xml, 1258563931 - 1255885531)
+        self.assertEqual(self.api.last_timestamps, {
+            'current_time': 1255885531,
+            'cached_until': 1258563931,
+        })
+
+    def test_iter_rows_clears_rows(self):
+        self.api.send_request = mock.Mock(return_value=(self.test_xml, None))
+        rows = list(self.api.iter_rows('corp/AssetList'))
+        self.assertEqual([r.attrib for r in rows], [{}, {}])
+
+    def test_iter_rows_cached(self):
+        self.cache.get.return_value = self.test_xml
+        self.api.send_request = mock.Mock()
+
+        rows = [r.attrib['id'] for r in self.api.iter_rows('corp/AssetList')]
+
+        self.assertEqual(rows, ['1', '2'])
+        self.assertFalse(self.api.send_request.called)
+        self.assertFalse(self.cache.put.called)
+
+    def test_iter_rows_error(self):
+        self.api.send_request = mock.Mock(return_value=(self.error_xml, None))
+
+        self.assertRaises(evelink_api.APIError, list, self.api.iter_rows('eve/Error'))
+        self.assertTrue(self.cache.put.called)
+        self.assertEqual(self.api.last_timestamps, {
+            'current_time': 1255885531,
+            'cached_until': 1258571131,
+        })
+
+    def test_iter_rows_parse_error(self):
+        self.api.send_request = mock.Mock(return_value=(b"Not good xml", None))
+        self.assertRaises(_xml_error, list, self.api.iter_rows('foo/Bar'))
+
+    def test_stream_rows(self):
+        client = mock.Mock()
+        client.api.iter_rows.return_value = iter([1, 2])
+
+        @evelink_api.auto_call('foo/bar', map_params={'limit': 'rowCount'})
+        def func(self, limit=None, api_result=None):
+            pass
+
+        rows = evelink_api.stream_rows(client, func, lambda row: row * 10, limit=5)
+
+        self.assertEqual(list(rows), [10, 20])
+        client.api.iter_rows.assert_called_once_with('foo/bar', params={'rowCount': 5})
+
+
+class WalkPagesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.fetches = []
+
+    def make_fetch(self, ids, page_size):
+        def fetch(before_id):
+            self.fetches.append(before_id)
+            older = [i for i in ids if before_id is None or i < before_id]
+            return iter([{'id': i, 'timestamp': i * 100} for i in older[:page_size]])
+        return fetch
+
+    def test_walk_pages(self):
+        fetch = self.make_fetch(list(range(10, 0, -1)), 4)
+        entries = evelink_api.walk_pages(fetch, 4)
+
+        self.assertEqual([e['id'] for e in entries], list(range(10, 0, -1)))
+        self.assertEqual(self.fetches, [None, 7, 3])
+
+    def test_walk_pages_full_last_page(self):
+        fetch = self.make_fetch(list(range(8, 0, -1)), 4)
+        self.assertEqual(len(list(evelink_api.walk_pages(fetch, 4))), 8)
+        self.assertEqual(self.fetches, [None, 5, 1])
+
+    def test_walk_pages_no_page_size(self):
+        fetch = self.make_fetch(list(range(8, 0, -1)), 3)
+        self.assertEqual(len(list(evelink_api.walk_pages(fetch))), 8)
+        self.assertEqual(self.fetches, [None, 6, 3, 1])
+
+    def test_walk_pages_is_lazy(self):
+        fetch = self.make_fetch(list(range(10, 0, -1)), 4)
+        entries = evelink_api.walk_pages(fetch, 4)
+
+        self.assertEqual(self.fetches, [])
+        self.assertEqual([next(entries)['id'] for _ in range(5)], [10, 9, 8, 7, 6])
+        self.assertEqual(self.fetches, [None, 7])
+
+    def test_walk_pages_stop_id(self):
+        fetch = self.make_fetch(list(range(10, 0, -1)), 4)
+        entries = evelink_api.walk_pages(fetch, 4, stop_id=5)
+
+        self.assertEqual([e['id'] for e in entries], [10, 9, 8, 7, 6])
+        self.assertEqual(self.fetches, [None, 7])
+
+    def test_walk_pages_stop_ts(self):
+        fetch = self.make_fetch([10, 8, 9, 7, 6, 5], 3)
+        entries = evelink_api.walk_pages(fetch, 3, stop_ts=850)
+
+        # Unsorted pages are read to the end before stopping.
+        self.assertEqual([e['id'] for e in entries], [10, 9])
+        self.assertEqual(self.fetches, [None])
+
+
+    def test_walk_pages_checkpoint(self):
+        checkpoint = evelink_api.Checkpoint()
+        fetch = self.make_fetch(list(range(10, 0, -1)), 4)
+
+        self.assertEqual(len(list(evelink_api.walk_pages(fetch, 4, checkpoint=checkpoint))), 10)
+        self.assertEqual(checkpoint.get(), 10)
+
+        self.fetches = []
+        fetch = self.make_fetch(list(range(13, 0, -1)), 4)
+        entries = evelink_api.walk_pages(fetch, 4, checkpoint=checkpoint)
+        self.assertEqual([e['id'] for e in entries], [13, 12, 11])
+        self.assertEqual(self.fetches, [None])
+        self.assertEqual(checkpoint.get(), 13)
+
+    def test_walk_pages_checkpoint_partial_walk(self):
+        checkpoint = evelink_api.Checkpoint(2)
+        fetch = self.make_fetch(list(range(10, 0, -1)), 4)
+
+        entries = evelink_api.walk_pages(fetch, 4, checkpoint=checkpoint)
+        next(entries)
+        entries.close()
+
+        # Unconsumed entries must be returned by the next walk.
+        self.assertEqual(checkpoint.get(), 2)
+
+
+class FileCheckpointTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'checkpoint')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_file_checkpoint(self):
+        checkpoint = evelink_api.FileCheckpoint(self.path)
+        self.assertEqual(checkpoint.get(), None)
+
+        checkpoint.set(15640551)
+        self.assertEqual(evelink_api.FileCheckpoint(self.path).get(), 15640551)
+        self.assertEqual(os.listdir(self.tmp_dir), ['checkpoint'])
+
+    def test_corrupt_file_checkpoint(self):
+        with open(self.path, 'w') as f:
+            f.write('garbage')
+        self.assertEqual(evelink_api.FileCheckpoint(self.path).get(), None)
+
+
+class InFlightTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = mock.MagicMock(spec=evelink_api.APICache)
+        self.cache.get.return_value = None
+        self.api = evelink_api.API(cache=self.cache)
+        self.test_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result><rowset><row foo="bar" /></rowset></result>
+                    <cachedUntil>2009-11-18 17:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+        # Keep track of how many threads are waiting on a request in flight
+        self.waiting = []
+        original_wait = evelink_api._Flight.wait
+        def wait(flight):
+            self.waiting.append(flight)
+            return original_wait(flight)
+        patcher = mock.patch.object(evelink_api._Flight, 'wait', wait)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _concurrent_gets(self, send_request, num_threads=5):
+        release = threading.Event()
+        started = threading.Event()
+        def send(full_path, params):
+            started.set()
+            release.wait(5)
+            return send_request(full_path, params)
+        self.api.send_request = mock.Mock(side_effect=send)
+
+        results = []
+        def fetch():
+            try:
+                results.append(self.api.get('eve/SkillTree'))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=fetch) for _ in range(num_threads)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+
+        deadline = time.time() + 5
+        while len(self.waiting) < num_threads - 1 and time.time() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_identical_requests_coalesced(self):
+        results = self._concurrent_gets(lambda *args: (self.test_xml, None))
+
+        self.assertEqual(self.api.send_request.call_count, 1)
+        self.assertEqual(self.cache.put.call_count, 1)
+        self.assertEqual(len(results), 5)
+        for result in results:
+            self.assertEqual(result.timestamp, 1255885531)
+            self.assertEqual(result.result.find('rowset/row').attrib['foo'], 'bar')
+        self.assertEqual(evelink_api._in_flight, {})
+
+    def test_request_errors_shared(self):
+        error = ValueError('connection reset')
+        def fail(*args):
+            raise error
+
+        results = self._concurrent_gets(fail, num_threads=3)
+
+        self.assertEqual(self.api.send_request.call_count, 1)
+        self.assertEqual(results, [error] * 3)
+        self.assertEqual(evelink_api._in_flight, {})
+
+    def test_base_exception_finishes_flight(self):
+        self.api.send_request = mock.Mock(side_effect=KeyboardInterrupt)
+        self.assertRaises(KeyboardInterrupt, self.api.get, 'eve/SkillTree')
+        self.assertEqual(evelink_api._in_flight, {})
+
+    def test_fetched_error_finishes_flight(self):
+        self.api.send_request = mock.Mock(return_value=(self.test_xml, None))
+        with mock.patch.object(self.api, '_fetched', side_effect=RuntimeError):
+            self.assertRaises(RuntimeError, self.api.get, 'eve/SkillTree')
+        self.assertEqual(evelink_api._in_flight, {})
+        self.assertEqual(self.api.get('eve/SkillTree').timestamp, 1255885531)
+
+    def test_different_requests_not_coalesced(self):
+        self.api.send_request = mock.Mock(return_value=(self.test_xml, None))
+        self.api.get('eve/SkillTree')
+        self.api.get('eve/AllianceList')
+        self.assertEqual(self.api.send_request.call_count, 2)
+
+
 class AutoCallTestCase(unittest.TestCase):
 
     def test_python_func(self):
@@ -417,7 +754,8 @@ class AutoCallTestCase(unittest.TestCase):
                 ],
                 'defaults': dict(limit=None, before_kill=None),
                 'prop_to_param': tuple(),
-                'map_params': {}
+                'map_params': {},
+                'result_modes': ('dict',),
             },
             func._request_specs
             )
@@ -445,6 +783,49 @@ class AutoCallTestCase(unittest.TestCase):
             params={'id':1, 'prev': 3, 'limit': 2}
         )
 
+    def test_modes_need_parsers(self):
+        def func(self, api_result=None):
+            pass
+        self.assertRaises(TypeError, evelink_api.auto_call, 'foo/bar',
+                          result_modes=('dict', 'columns'))
+        self.assertRaises(TypeError, evelink_api.auto_call, 'foo/bar', column_parser=func)
+        self.assertRaises(TypeError, evelink_api.auto_call, 'foo/bar',
+                          result_modes=('dict', 'records'))
+        self.assertRaises(TypeError, evelink_api.auto_call, 'foo/bar', record_parser=func)
+
+    def test_call_wrapped_method_records(self):
+        client = mock.Mock(name='foo')
+        method = mock.Mock()
+        record_parser = mock.Mock(return_value=mock.sentinel.records)
+
+        @evelink_api.auto_call('foo/bar', result_modes=('dict', 'records'),
+                               record_parser=record_parser)
+        def func(self, api_result=None):
+            method()
+
+        client.api.get.return_value = evelink_api.APIResult(mock.sentinel.result, 1, 2)
+        self.assertEqual(func(client, result_mode='records'), (mock.sentinel.records, 1, 2))
+        record_parser.assert_called_once_with(mock.sentinel.result)
+        self.assertFalse(method.called)
+
+    def test_call_wrapped_method_columns(self):
+        client = mock.Mock(name='foo')
+        client.api.result_mode = 'columns'
+        method = mock.Mock()
+        column_parser = mock.Mock(return_value=mock.sentinel.columns)
+
+        @evelink_api.auto_call('foo/bar', result_modes=('dict', 'columns'),
+                               column_parser=column_parser)
+        def func(self, api_result=None):
+            method()
+
+        client.api.get.return_value = evelink_api.APIResult(mock.sentinel.result, 1, 2)
+        self.assertEqual(func(client), (mock.sentinel.columns, 1, 2))
+        column_parser.assert_called_once_with(mock.sentinel.result)
+        self.assertFalse(method.called)
+        func(client, result_mode='dict')
+        self.assertTrue(method.called)
+
     def test_call_wrapped_method_raise_key_error(self):
         repeat = mock.Mock()
         client = mock.Mock(name='foo')
@@ -519,5 +900,380 @@ class AutoCallTestCase(unittest.TestCase):
         self.assertFalse(client.get.called)
 
 
+class ResultCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.result_cache = evelink_api.APICache()
+        self.api = evelink_api.API(api_key=(1, 'code'), result_cache=self.result_cache)
+        self.api.get = mock.Mock(return_value=evelink_api.APIResult(
+            mock.sentinel.api_result, 12345, 67890))
+        self.parse = mock.Mock(return_value=mock.sentinel.parsed)
+
+        class Client(object):
+            def __init__(client, char_id):
+                client.api = self.api
+                client.char_id = char_id
+
+            @evelink_api.auto_call('foo/bar', prop_to_param=('char_id',),
+                                   map_params={'char_id': 'id', 'limit': 'limit'},
+                                   result_modes=('dict', 'records'), record_parser=self.parse)
+            def func(client, limit=None, api_result=None):
+                return evelink_api.APIResult(self.parse(api_result.result),
+                                             api_result.timestamp, api_result.expires)
+
+            @evelink_api.auto_call('foo/bar', prop_to_param=('char_id',),
+                                   map_params={'char_id': 'id', 'limit': 'limit'})
+            def other_func(client, limit=None, api_result=None):
+                return evelink_api.APIResult(mock.sentinel.other,
+                                             api_result.timestamp, api_result.expires)
+
+        self.Client = Client
+
+    def test_invalid_result_cache(self):
+        self.assertRaises(ValueError, evelink_api.API, result_cache={})
+
+    def test_cached_result(self):
+        client = self.Client(1)
+        first = client.func(limit=10)
+        self.api._set_last_timestamps()
+        second = client.func(limit=10)
+
+        self.assertEqual(first, (mock.sentinel.parsed, 12345, 67890))
+        self.assertTrue(first is second)
+        self.assertEqual(self.api.get.call_count, 1)
+        self.assertEqual(self.parse.call_count, 1)
+        self.assertEqual(self.api.last_timestamps,
+                         {'current_time': 12345, 'cached_until': 67890})
+
+    def test_cache_key_varies(self):
+        self.Client(1).func(limit=10)
+        self.Client(1).func(limit=20)
+        self.Client(2).func(limit=10)
+        self.assertEqual(self.Client(1).other_func(limit=10).result, mock.sentinel.other)
+        self.api.api_key = (2, 'code')
+        self.Client(1).func(limit=10)
+
+        self.assertEqual(self.api.get.call_count, 5)
+
+    def test_cache_key_varies_by_result_mode(self):
+        self.Client(1).func(limit=10)
+        self.Client(1).func(limit=10, result_mode='records')
+        self.api.result_mode = 'records'
+        self.Client(1).func(limit=10)
+        self.assertEqual(self.api.get.call_count, 2)
+
+    def test_expired_result(self):
+        self.api.get.return_value = evelink_api.APIResult(mock.sentinel.api_result, 100, 99)
+        self.Client(1).func()
+        self.Client(1).func()
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_explicit_api_result(self):
+        api_result = evelink_api.APIResult(mock.sentinel.api_result, 12345, 67890)
+        self.Client(1).func(api_result=api_result)
+        self.assertFalse(self.api.get.called)
+        self.assertEqual(self.result_cache.cache, {})
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.api = evelink_api.API(metrics=self.metrics, cache=evelink_api.APICache())
+        self.response = (b'<eveapi version="2"><currentTime>2009-10-18 17:05:31</currentTime>'
+                         b'<result/><cachedUntil>2009-11-18 17:05:31</cachedUntil></eveapi>')
+        self.error = (b'<eveapi version="2"><currentTime>2009-10-18 17:05:31</currentTime>'
+                      b'<error code="203">Authentication failure.</error>'
+                      b'<cachedUntil>2009-11-18 17:05:31</cachedUntil></eveapi>')
+        self.api.send_request = mock.Mock(return_value=(self.response, None))
+
+    def test_invalid_metrics(self):
+        self.assertRaises(ValueError, evelink_api.API, metrics={})
+
+    def test_get(self):
+        self.api.get('foo/Bar')
+        self.api.get('foo/Bar')
+
+        labels = {'path': 'foo/Bar'}
+        self.assertEqual(self.metrics.counter('http_requests_total', **labels), 1)
+        self.assertEqual(self.metrics.counter('cache_misses_total', **labels), 1)
+        self.assertEqual(self.metrics.counter('cache_hits_total', **labels), 1)
+        self.assertEqual(self.metrics.counter('cache_bytes_stored_total', **labels),
+                         len(self.response))
+        self.assertEqual(self.metrics.histogram('http_request_seconds', **labels).count, 1)
+        self.assertEqual(self.metrics.histogram('xml_parse_seconds', **labels).count, 2)
+        self.assertEqual(self.metrics.histogram(
+            'cache_get_seconds', cache='APICache', **labels).count, 2)
+        self.assertEqual(self.metrics.histogram(
+            'cache_put_seconds', cache='APICache', **labels).count, 1)
+
+    def test_error(self):
+        self.api.send_request.return_value = (self.error, None)
+        self.assertRaises(evelink_api.APIError, self.api.get, 'foo/Bar')
+        self.assertEqual(self.metrics.counter('api_errors_total', path='foo/Bar', code='203'), 1)
+
+    def test_iter_rows(self):
+        list(self.api.iter_rows('foo/Bar'))
+        self.assertEqual(self.metrics.counter('http_requests_total', path='foo/Bar'), 1)
+        self.assertEqual(self.metrics.counter('cache_misses_total', path='foo/Bar'), 1)
+
+    def test_wrapped_method(self):
+        self.api.result_cache = evelink_api.APICache()
+
+        class Client(object):
+            api = self.api
+
+            @evelink_api.auto_call('foo/Bar')
+            def func(client, api_result=None):
+                return api_result
+
+        Client().func()
+        Client().func()
+        self.assertEqual(self.metrics.histogram('result_parse_seconds', path='foo/Bar').count, 1)
+        self.assertEqual(self.metrics.counter('result_cache_misses_total', path='foo/Bar'), 1)
+        self.assertEqual(self.metrics.counter('result_cache_hits_total', path='foo/Bar'), 1)
+
+
+class RecordingHooks(Hooks):
+
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, path, key):
+        self.calls.append(('before_request', path, key))
+
+    def after_fetch(self, path, key, seconds, cached):
+        self.calls.append(('after_fetch', path, key, cached))
+
+    def after_xml_parse(self, path, key, seconds):
+        self.calls.append(('after_xml_parse', path, key))
+
+    def after_result_parse(self, path, key, seconds):
+        self.calls.append(('after_result_parse', path, key))
+
+
+class HooksTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.hooks = RecordingHooks()
+        self.api = evelink_api.API(hooks=[self.hooks], cache=evelink_api.APICache())
+        self.api.send_request = mock.Mock(return_value=(
+            b'<eveapi version="2"><currentTime>2009-10-18 17:05:31</currentTime>'
+            b'<result/><cachedUntil>2009-11-18 17:05:31</cachedUntil></eveapi>', None))
+        self.key = self.api._cache_key('foo/Bar', {})
+
+    def test_invalid_hooks(self):
+        self.assertRaises(ValueError, evelink_api.API, hooks=[object()])
+
+    def test_get(self):
+        self.api.get('foo/Bar')
+        self.api.get('foo/Bar')
+        self.assertEqual(self.hooks.calls, [
+            ('before_request', 'foo/Bar', self.key),
+            ('after_fetch', 'foo/Bar', self.key, False),
+            ('after_xml_parse', 'foo/Bar', self.key),
+            ('before_request', 'foo/Bar', self.key),
+            ('after_fetch', 'foo/Bar', self.key, True),
+            ('after_xml_parse', 'foo/Bar', self.key),
+        ])
+
+    def test_iter_rows(self):
+        list(self.api.iter_rows('foo/Bar'))
+        self.assertEqual(self.hooks.calls, [
+            ('before_request', 'foo/Bar', self.key),
+            ('after_fetch', 'foo/Bar', self.key, False),
+        ])
+
+    def test_wrapped_method(self):
+        class Client(object):
+            api = self.api
+
+            @evelink_api.auto_call('foo/Bar')
+            def func(client, api_result=None):
+                return api_result
+
+        Client().func()
+        self.assertEqual(self.hooks.calls[-1], ('after_result_parse', 'foo/Bar', self.key))
+
+    def test_failing_hook(self):
+        failing = mock.Mock(spec=Hooks)
+        failing.before_request.side_effect = RuntimeError
+        self.api.hooks.insert(0, failing)
+        self.api.get('foo/Bar')
+        self.assertEqual(len(self.hooks.calls), 3)
+        self.assertTrue(failing.after_xml_parse.called)
+
+
+class StaleWhileRevalidateTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache()
+        self.metrics = Metrics()
+        self.api = evelink_api.API(cache=self.cache, metrics=self.metrics,
+                                   stale_while_revalidate=60)
+        self.old = (b'<eveapi version="2"><currentTime>2009-10-18 17:05:31</currentTime>'
+                    b'<result>old</result><cachedUntil>2009-10-18 17:05:32</cachedUntil></eveapi>')
+        self.new = (b'<eveapi version="2"><currentTime>2009-10-18 17:05:31</currentTime>'
+                    b'<result>new</result><cachedUntil>2009-10-18 18:05:31</cachedUntil></eveapi>')
+        self.released = threading.Event()
+        self.released.set()
+
+        def send_request(full_path, params):
+            self.released.wait()
+            return self.new, None
+        self.api.send_request = mock.Mock(side_effect=send_request)
+        self.key = self.api._cache_key('foo/Bar', {})
+
+    def wait_for_refresh(self):
+        for _ in range(100):
+            if (self.api.base_url, self.key) not in evelink_api._in_flight:
+                return
+            time.sleep(0.01)
+        self.fail("Refresh didn't finish")
+
+    def test_keeps_responses_longer(self):
+        with mock.patch('time.time', return_value=1000):
+            self.api.get('foo/Bar')
+            self.assertEqual(self.cache.get_entry(self.key), (self.new, 1000 + 3600 + 60))
+
+    def test_fresh(self):
+        self.cache.put(self.key, self.old, 3600)
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'old')
+        self.assertFalse(self.api.send_request.called)
+
+    def test_stale(self):
+        self.cache.put(self.key, self.old, 30)
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'old')
+        self.wait_for_refresh()
+
+        self.assertEqual(self.api.send_request.call_count, 1)
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'new')
+        self.assertEqual(self.metrics.counter('cache_stale_total', path='foo/Bar'), 1)
+
+    def test_single_refresh(self):
+        self.released.clear()
+        self.cache.put(self.key, self.old, 30)
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'old')
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'old')
+        self.released.set()
+        self.wait_for_refresh()
+        self.assertEqual(self.api.send_request.call_count, 1)
+
+    def test_refresh_error(self):
+        self.api.send_request.side_effect = IOError
+        self.cache.put(self.key, self.old, 30)
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'old')
+        self.wait_for_refresh()
+        self.assertEqual(self.cache.get(self.key), self.old)
+
+    def test_too_stale(self):
+        self.cache.put(self.key, self.old, -1)
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'new')
+
+    def test_refresh_thread(self):
+        self.released.clear()
+        for n in range(10):
+            self.cache.put(self.api._cache_key('foo/Bar', {'n': n}), self.old, 30)
+            self.assertEqual(self.api.get('foo/Bar', {'n': n}).result.text, 'old')
+        refresh_threads = [thread for thread in threading.enumerate()
+                           if thread.name == 'evelink-refresh']
+        self.assertEqual(len(refresh_threads), 1)
+
+        self.released.set()
+        for _ in range(100):
+            if self.api.send_request.call_count == 10:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.api.send_request.call_count, 10)
+
+    def test_unknown_expiration(self):
+        self.cache.get_entry = mock.Mock(return_value=(self.old, None))
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'new')
+        self.assertEqual(self.metrics.counter('cache_misses_total', path='foo/Bar'), 1)
+
+    def test_default_cache(self):
+        self.cache = evelink_api.APICache()
+        self.api.cache = self.cache
+        self.cache.put(self.key, self.old, 30)
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'old')
+        self.wait_for_refresh()
+        self.assertEqual(self.api.send_request.call_count, 1)
+        self.assertEqual(self.api.get('foo/Bar').result.text, 'new')
+
+    def test_cache_without_expirations(self):
+        class Cache(evelink_api.APICache):
+            def get(self, key):
+                return None
+        self.assertEqual(Cache().get_entry(self.key), None)
+        self.assertRaises(ValueError, evelink_api.API, cache=Cache(),
+                          stale_while_revalidate=60)
+
+
+class ErrorCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache()
+        self.api = evelink_api.API(cache=self.cache)
+        self.error_xml = (b'<eveapi version="2"><currentTime>2009-10-18 17:05:31</currentTime>'
+                          b'<error code="203">Authentication failure.</error>'
+                          b'<cachedUntil>2009-10-18 18:05:31</cachedUntil></eveapi>')
+        self.api.send_request = mock.Mock(return_value=(self.error_xml, None))
+        self.key = self.api._cache_key('account/APIKeyInfo', {})
+
+    def assert_error(self, func, *args):
+        with self.assertRaises(evelink_api.APIError) as cm:
+            func(*args)
+        self.assertEqual((cm.exception.code, cm.exception.message), ('203', 'Authentication failure.'))
+        self.assertEqual((cm.exception.timestamp, cm.exception.expires), (1255885531, 1255889131))
+        return cm.exception
+
+    def test_cached_parsed(self):
+        with mock.patch('time.time', return_value=1000):
+            self.assert_error(self.api.get, 'account/APIKeyInfo')
+            value, expiration = self.cache.get_entry(self.key)
+        self.assertTrue(isinstance(value, evelink_api.APIError))
+        self.assertEqual(expiration, 1000 + 3600)
+
+    def test_cached_error_not_parsed(self):
+        first = self.assert_error(self.api.get, 'account/APIKeyInfo')
+        self.api._set_last_timestamps()
+        with mock.patch.object(evelink_api.ElementTree, 'fromstring') as fromstring:
+            second = self.assert_error(self.api.get, 'account/APIKeyInfo')
+        self.assertFalse(fromstring.called)
+        self.assertFalse(first is second)
+        self.assertEqual(self.api.send_request.call_count, 1)
+        self.assertEqual(self.api.last_timestamps, {
+            'current_time': 1255885531,
+            'cached_until': 1255889131,
+        })
+
+    def test_error_ttl(self):
+        self.api.error_ttl = 300
+        with mock.patch('time.time', return_value=1000):
+            self.assert_error(self.api.get, 'account/APIKeyInfo')
+            self.assertEqual(self.cache.get_entry(self.key)[1], 1000 + 300)
+        self.api.error_ttl = 7200
+        self.cache.clear()
+        with mock.patch('time.time', return_value=1000):
+            self.assert_error(self.api.get, 'account/APIKeyInfo')
+            self.assertEqual(self.cache.get_entry(self.key)[1], 1000 + 3600)
+
+    def test_iter_rows(self):
+        self.assert_error(list, self.api.iter_rows('account/APIKeyInfo'))
+        self.assertTrue(isinstance(self.cache.get(self.key), evelink_api.APIError))
+        self.assert_error(list, self.api.iter_rows('account/APIKeyInfo'))
+        self.assert_error(self.api.get, 'account/APIKeyInfo')
+        self.assertEqual(self.api.send_request.call_count, 1)
+
+    def test_metrics(self):
+        self.api.metrics = Metrics()
+        self.assert_error(self.api.get, 'account/APIKeyInfo')
+        self.assert_error(self.api.get, 'account/APIKeyInfo')
+        self.assertEqual(self.api.metrics.counter('api_errors_total', path='account/APIKeyInfo',
+                                                  code='203'), 2)
+        self.assertEqual(self.api.metrics.counter('cache_bytes_stored_total',
+                                                  path='account/APIKeyInfo'), 0)
+
+
 if __name__ == "__main__":
     unittest.main()
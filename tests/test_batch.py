@@ -0,0 +1,115 @@
+import threading
+import time
+
+import mock
+
+from tests.compat import unittest
+from tests.utils import make_api_result
+
+import evelink.api as evelink_api
+import evelink.batch as evelink_batch
+import evelink.char as evelink_char
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.api = mock.MagicMock(spec=evelink_api.API)
+        self.api.base_url = 'api.eveonline.com'
+        self.api._cache_key.side_effect = (
+            lambda path, params: evelink_api.API._cache_key(self.api, path, params))
+        self.api.CACHE_VERSION = '1'
+        self.api.get.return_value = make_api_result('char/wallet_info.xml')
+
+    def test_run_in_order(self):
+        def work(x):
+            time.sleep(0.01 * (5 - x))
+            return x * 2
+
+        results = evelink_batch.run([(work, i) for i in range(5)], concurrency=5)
+
+        self.assertEqual([r.result for r in results], [0, 2, 4, 6, 8])
+        self.assertEqual([r.error for r in results], [None] * 5)
+        self.assertEqual(results[3].call, (work, 3))
+
+    def test_run_collects_errors(self):
+        def fail():
+            raise ValueError('nope')
+
+        results = evelink_batch.run([fail, (lambda: 1,)])
+
+        self.assertTrue(isinstance(results[0].error, ValueError))
+        self.assertEqual(results[0].result, None)
+        self.assertEqual(results[1].result, 1)
+
+    def test_as_completed(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return 'slow'
+
+        def fast():
+            release.set()
+            return 'fast'
+
+        results = list(evelink_batch.as_completed([slow, fast], concurrency=2))
+
+        self.assertEqual([(i, r.result) for i, r in results],
+                         [(1, 'fast'), (0, 'slow')])
+
+    def test_concurrency_limit(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        evelink_batch.run([work] * 10, concurrency=3)
+        self.assertTrue(running[1] <= 3)
+
+    def test_per_host_limit(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def work(api_result=None):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return make_api_result('char/wallet_info.xml')
+
+        self.api.get.side_effect = lambda *a, **kw: work()
+        chars = [evelink_char.Char(i, self.api) for i in range(8)]
+
+        evelink_batch.run([c.wallet_info for c in chars], concurrency=8, per_host=2)
+        self.assertEqual(self.api.get.call_count, 8)
+        self.assertTrue(running[1] <= 2)
+
+    def test_coalesce_duplicate_calls(self):
+        calls = [
+            evelink_char.Char(1, self.api).wallet_info,
+            evelink_char.Char(1, self.api).wallet_info,
+            evelink_char.Char(2, self.api).wallet_info,
+            (evelink_char.Char(1, self.api).wallet_journal, 10),
+            (evelink_char.Char(1, self.api).wallet_journal, 10),
+        ]
+
+        results = evelink_batch.run(calls)
+
+        self.assertEqual(self.api.get.call_count, 3)
+        self.assertTrue(results[0].result is results[1].result)
+        self.assertFalse(results[0].result is results[2].result)
+        self.assertEqual(self.api.get.mock_calls[0],
+                         mock.call.get('char/AccountBalance', params={'characterID': 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()
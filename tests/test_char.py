@@ -5,6 +5,7 @@ from tests.utils import APITestCase
 
 import evelink.api as evelink_api
 import evelink.char as evelink_char
+from evelink.parsing import records
 
 
 API_RESULT_SENTINEL = evelink_api.APIResult(mock.sentinel.api_result, 12345, 67890)
@@ -112,6 +113,30 @@ class CharTestCase(APITestCase):
                 mock.call.get('char/WalletJournal', params={'characterID': 1, 'rowCount': 100}),
             ])
 
+    def test_wallet_journal_records(self):
+        self.api.get.return_value = self.make_api_result("char/wallet_journal.xml")
+        expected = self.char.wallet_journal().result
+
+        result, current, expires = self.char.wallet_journal(result_mode='records')
+        self.assertEqual(result, expected)
+        self.assertEqual(result[0].party_1.name, expected[0]['party_1']['name'])
+        self.assertTrue(isinstance(result[0], records.Record))
+        self.assertEqual((current, expires), (12345, 67890))
+        self.assertEqual(self.api.get.call_args_list[-1],
+                         mock.call('char/WalletJournal', params={'characterID': 1}))
+
+    def test_api_result_mode(self):
+        self.api.result_mode = 'records'
+        self.api.get.return_value = self.make_api_result("char/orders.xml")
+        result, _, _ = self.char.orders()
+        self.assertTrue(all(isinstance(o, records.Record) for o in result.values()))
+        self.assertTrue(isinstance(self.char.orders(result_mode='dict').result, dict))
+
+        # Methods without a records mode fall back to dicts
+        self.api.get.return_value = self.make_api_result("char/wallet_info.xml")
+        self.assertTrue(isinstance(self.char.wallet_info().result, dict))
+        self.assertRaises(ValueError, self.char.wallet_info, result_mode='records')
+
     def test_wallet_info(self):
         self.api.get.return_value = self.make_api_result("char/wallet_info.xml")
 
@@ -142,6 +167,41 @@ class CharTestCase(APITestCase):
                 mock.call.get('char/AccountBalance', params={'characterID': 1}),
             ])
 
+    def test_iter_wallet_journal(self):
+        def iter_rows(path, params):
+            rows = self.make_api_rows("char/wallet_journal.xml")
+            before_id = params.get('fromID')
+            return [r for r in rows
+                    if before_id is None or int(r.attrib['refID']) < before_id][:2]
+        self.api.iter_rows.side_effect = iter_rows
+
+        entries = list(self.char.iter_wallet_journal(limit=2, stop_id=3605301231))
+
+        self.assertEqual([e['id'] for e in entries],
+                         [3605306236, 3605305292, 3605303380, 3605302609])
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('char/WalletJournal', params={'characterID': 1, 'rowCount': 2}),
+                mock.call('char/WalletJournal', params={'characterID': 1, 'rowCount': 2,
+                                                        'fromID': 3605305292}),
+                mock.call('char/WalletJournal', params={'characterID': 1, 'rowCount': 2,
+                                                        'fromID': 3605302609}),
+            ])
+
+    def test_iter_wallet_transactions(self):
+        self.api.iter_rows.side_effect = [
+            self.make_api_rows("char/wallet_transactions.xml"),
+            iter([]),
+        ]
+
+        entries = list(self.char.iter_wallet_transactions(limit=4))
+
+        self.assertEqual(len(entries), 4)
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('char/WalletTransactions', params={'characterID': 1, 'rowCount': 4}),
+                mock.call('char/WalletTransactions', params={'characterID': 1, 'rowCount': 4,
+                                                             'fromID': 1298649939}),
+            ])
+
     @mock.patch('evelink.char.parse_wallet_transactions')
     def test_wallet_transcations(self, mock_parse):
         self.api.get.return_value = API_RESULT_SENTINEL
@@ -316,6 +376,69 @@ class CharTestCase(APITestCase):
                 mock.call(mock.sentinel.api_result),
             ])
 
+    def test_stream_kills(self):
+        self.api.get.return_value = self.make_api_result("char/kills.xml")
+        self.api.iter_rows.return_value = self.make_api_rows("char/kills.xml")
+
+        kills = list(self.char.stream_kills(before_kill=12345))
+
+        self.assertEqual(dict((k['id'], k) for k in kills), self.char.kills().result)
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('char/KillMails', params={'characterID': 1, 'beforeKillID': 12345}),
+            ])
+
+    def test_asset_index(self):
+        self.api.get.return_value = self.make_api_result("corp/assets.xml")
+
+        result, current, expires = self.char.asset_index()
+        self.assertEqual(result.root_location(1007353294812), 30003719)
+        self.assertEqual(len(result), 5)
+        self.assertEqual(self.api.mock_calls, [
+                mock.call.get('char/AssetList', params={'characterID': 1}),
+            ])
+        self.assertEqual((current, expires), (12345, 67890))
+
+    def test_stream_assets(self):
+        self.api.get.return_value = self.make_api_result("corp/assets.xml")
+        self.api.iter_rows.return_value = self.make_api_rows("corp/assets.xml")
+
+        items = list(self.char.stream_assets())
+
+        expected = [item for location in self.char.assets().result.values()
+                    for item in location['contents']]
+        self.assertEqual(sorted(items, key=lambda i: i['id']),
+                         sorted(expected, key=lambda i: i['id']))
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('char/AssetList', params={'characterID': 1}),
+            ])
+
+    def test_iter_kills(self):
+        self.api.iter_rows.side_effect = lambda path, params: (
+            iter([]) if 'beforeKillID' in params else self.make_api_rows("char/kills.xml"))
+        checkpoint = evelink_api.Checkpoint()
+
+        kills = list(self.char.iter_kills(checkpoint=checkpoint))
+
+        self.assertEqual([k['id'] for k in kills], [15640551, 15640545])
+        self.assertEqual(checkpoint.get(), 15640551)
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('char/KillMails', params={'characterID': 1}),
+                mock.call('char/KillMails', params={'characterID': 1, 'beforeKillID': 15640545}),
+            ])
+
+        # Resuming from the checkpoint doesn't walk the history again.
+        self.api.iter_rows.reset_mock()
+        self.assertEqual(list(self.char.iter_kills(checkpoint=checkpoint)), [])
+        self.assertEqual(self.api.iter_rows.call_count, 1)
+
+    def test_iter_kills_stop_kill(self):
+        self.api.iter_rows.return_value = self.make_api_rows("char/kills.xml")
+
+        kills = list(self.char.iter_kills(stop_kill=15640545))
+
+        self.assertEqual([k['id'] for k in kills], [15640551])
+        self.assertEqual(self.api.iter_rows.call_count, 1)
+
     def test_kills_paged(self):
         self.api.get.return_value = self.make_api_result("char/kills_paged.xml")
 
@@ -5,6 +5,7 @@ from tests.utils import APITestCase
 
 import evelink.api as evelink_api
 import evelink.corp as evelink_corp
+from evelink.parsing import columns
 
 
 API_RESULT_SENTINEL = evelink_api.APIResult(mock.sentinel.api_result, 12345, 67890)
@@ -292,6 +293,16 @@ class CorpTestCase(APITestCase):
         self.assertEqual(current, 12345)
         self.assertEqual(expires, 67890)
 
+    def test_wallet_journal_columns(self):
+        self.api.get.return_value = self.make_api_result("char/wallet_journal.xml")
+
+        result, current, expires = self.corp.wallet_journal(account=1000, result_mode='columns')
+        self.assertTrue(isinstance(result, columns.Columns))
+        self.assertEqual(list(result['id']), sorted(e['id'] for e in self.corp.wallet_journal().result))
+        self.assertEqual(self.api.get.call_args_list[0],
+                         mock.call('corp/WalletJournal', params={'accountKey': 1000}))
+        self.assertEqual((current, expires), (12345, 67890))
+
     def test_wallet_journal_paged(self):
         self.api.get.return_value = self.make_api_result("char/wallet_journal.xml")
 
@@ -316,6 +327,50 @@ class CorpTestCase(APITestCase):
                 mock.call.get('corp/WalletJournal', params={'accountKey': '0003'}),
             ])
 
+    def test_stream_wallet_journal(self):
+        self.api.get.return_value = self.make_api_result("char/wallet_journal.xml")
+        self.api.iter_rows.return_value = self.make_api_rows("char/wallet_journal.xml")
+
+        entries = list(self.corp.stream_wallet_journal(before_id=1234, account='0003'))
+
+        self.assertEqual(sorted(entries, key=lambda e: e['id']),
+                         self.corp.wallet_journal().result)
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('corp/WalletJournal', params={'fromID': 1234, 'accountKey': '0003'}),
+            ])
+
+    def test_stream_wallet_transactions(self):
+        self.api.get.return_value = self.make_api_result("char/wallet_transactions.xml")
+        self.api.iter_rows.return_value = self.make_api_rows("char/wallet_transactions.xml")
+
+        entries = list(self.corp.stream_wallet_transactions(limit=10))
+
+        self.assertEqual(entries, self.corp.wallet_transactions().result)
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('corp/WalletTransactions', params={'rowCount': 10}),
+            ])
+
+    def test_iter_wallet_journal(self):
+        self.api.iter_rows.return_value = self.make_api_rows("char/wallet_journal.xml")
+
+        entries = list(self.corp.iter_wallet_journal(account=1001, stop_ts=1291962720))
+
+        self.assertEqual([e['id'] for e in entries], [3605306236, 3605305292])
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('corp/WalletJournal', params={'accountKey': 1001, 'rowCount': 2560}),
+            ])
+
+    def test_iter_kills(self):
+        self.api.iter_rows.side_effect = [self.make_api_rows("char/kills.xml"), iter([])]
+
+        kills = list(self.corp.iter_kills())
+
+        self.assertEqual([k['id'] for k in kills], [15640551, 15640545])
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('corp/KillMails', params={}),
+                mock.call('corp/KillMails', params={'beforeKillID': 15640545}),
+            ])
+
     @mock.patch('evelink.corp.parse_wallet_transactions')
     def test_wallet_transcations(self, mock_parse):
         self.api.get.return_value = API_RESULT_SENTINEL
@@ -589,6 +644,17 @@ class CorpTestCase(APITestCase):
         self.assertEqual(current, 12345)
         self.assertEqual(expires, 67890)
 
+    def test_stream_members(self):
+        self.api.get.return_value = self.make_api_result("corp/members.xml")
+        self.api.iter_rows.return_value = self.make_api_rows("corp/members.xml")
+
+        members = list(self.corp.stream_members())
+
+        self.assertEqual(members, list(self.corp.members().result.values()))
+        self.assertEqual(self.api.iter_rows.mock_calls, [
+                mock.call('corp/MemberTracking', params={'extended': 1}),
+            ])
+
     def test_permissions(self):
         self.api.get.return_value = self.make_api_result("corp/permissions.xml")
 
@@ -0,0 +1,61 @@
+from tests.compat import unittest
+
+from evelink.metrics import Histogram, Metrics
+
+class HistogramTestCase(unittest.TestCase):
+
+    def test_observe(self):
+        histogram = Histogram(buckets=(1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.sum, 14.5)
+        self.assertEqual(histogram.cumulative_counts(),
+                         [(1, 2), (5, 3), (float('inf'), 4)])
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics(buckets=(0.1, 1))
+
+    def test_counters(self):
+        self.metrics.inc('cache_hits_total', path='foo/Bar')
+        self.metrics.inc('cache_hits_total', 2, path='foo/Bar')
+        self.metrics.inc('cache_hits_total', path='foo/Baz')
+        self.assertEqual(self.metrics.counter('cache_hits_total', path='foo/Bar'), 3)
+        self.assertEqual(self.metrics.counter('cache_hits_total', path='foo/Baz'), 1)
+        self.assertEqual(self.metrics.counter('cache_hits_total', path='foo/Qux'), 0)
+
+    def test_histograms(self):
+        self.metrics.observe('xml_parse_seconds', 0.5, path='foo/Bar')
+        self.assertEqual(self.metrics.histogram('xml_parse_seconds', path='foo/Bar').count, 1)
+        self.assertEqual(self.metrics.histogram('xml_parse_seconds', path='foo/Baz'), None)
+
+    def test_reset(self):
+        self.metrics.inc('cache_hits_total', path='foo/Bar')
+        self.metrics.observe('xml_parse_seconds', 0.5, path='foo/Bar')
+        self.metrics.reset()
+        self.assertEqual(self.metrics.counter('cache_hits_total', path='foo/Bar'), 0)
+        self.assertEqual(self.metrics.histogram('xml_parse_seconds', path='foo/Bar'), None)
+        self.assertEqual(self.metrics.to_prometheus(), '')
+
+    def test_to_prometheus(self):
+        self.metrics.inc('cache_hits_total', path='foo/Bar')
+        self.metrics.inc('api_errors_total', path='foo/"Baz"', code='203')
+        self.metrics.observe('http_request_seconds', 0.5, path='foo/Bar')
+        self.assertEqual(self.metrics.to_prometheus(), '\n'.join([
+            '# HELP evelink_api_errors_total Error responses returned by the API.',
+            '# TYPE evelink_api_errors_total counter',
+            'evelink_api_errors_total{code="203",path="foo/\\"Baz\\""} 1',
+            '# HELP evelink_cache_hits_total Responses found in the cache.',
+            '# TYPE evelink_cache_hits_total counter',
+            'evelink_cache_hits_total{path="foo/Bar"} 1',
+            '# HELP evelink_http_request_seconds Time spent making requests to the API.',
+            '# TYPE evelink_http_request_seconds histogram',
+            'evelink_http_request_seconds_bucket{path="foo/Bar",le="0.1"} 0',
+            'evelink_http_request_seconds_bucket{path="foo/Bar",le="1"} 1',
+            'evelink_http_request_seconds_bucket{path="foo/Bar",le="+Inf"} 1',
+            'evelink_http_request_seconds_sum{path="foo/Bar"} 0.5',
+            'evelink_http_request_seconds_count{path="foo/Bar"} 1',
+        ]) + '\n')
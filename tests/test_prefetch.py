@@ -0,0 +1,126 @@
+import time
+
+import mock
+
+from tests.compat import unittest
+
+from evelink import api as evelink_api
+from evelink.cache.lru import LRUCache
+from evelink.prefetch import Prefetcher
+
+RESPONSE = (b'<eveapi version="2"><currentTime>2009-10-18 17:00:00</currentTime>'
+            b'<result/><cachedUntil>2009-10-18 18:00:00</cachedUntil></eveapi>')
+UNCACHED = (b'<eveapi version="2"><currentTime>2009-10-18 17:00:00</currentTime>'
+            b'<result/><cachedUntil>2009-10-18 17:00:00</cachedUntil></eveapi>')
+ERROR = (b'<eveapi version="2"><currentTime>2009-10-18 17:00:00</currentTime>'
+         b'<error code="203">Authentication failure.</error>'
+         b'<cachedUntil>2009-10-18 17:10:00</cachedUntil></eveapi>')
+
+
+class PrefetcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.api = evelink_api.API(cache=LRUCache())
+        self.api.send_request = mock.Mock(return_value=(RESPONSE, None))
+        self.prefetcher = Prefetcher(self.api, jitter=0)
+        self.now = 1000
+        patcher = mock.patch('time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_register(self):
+        self.prefetcher.register('foo/Bar', {'a': 1})
+        self.assertEqual(self.prefetcher.run_pending(), 1)
+        self.api.send_request.assert_called_once_with(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', {'a': '1'})
+
+        # Not again until the response expires.
+        self.now = 4600
+        self.assertEqual(self.prefetcher.run_pending(), 0)
+        self.now = 4601
+        self.assertEqual(self.prefetcher.run_pending(), 1)
+        self.assertEqual(self.api.send_request.call_count, 2)
+
+    def test_register_call(self):
+        parse = mock.Mock()
+
+        class Client(object):
+            def __init__(client, api):
+                client.api = api
+
+            @evelink_api.auto_call('foo/Bar', map_params={'limit': 'limit'})
+            def func(client, limit=None, api_result=None):
+                parse(limit)
+                return api_result
+
+        self.prefetcher.register_call(Client(self.api).func, limit=5)
+        self.assertEqual(self.prefetcher.run_pending(), 1)
+        self.api.send_request.assert_called_once_with(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', {'limit': '5'})
+        parse.assert_called_once_with(5)
+
+        self.assertRaises(ValueError, self.prefetcher.register_call,
+                          Client(evelink_api.API()).func)
+
+    def test_unregister(self):
+        key = self.prefetcher.register('foo/Bar')
+        self.prefetcher.unregister(key)
+        self.assertEqual(self.prefetcher.run_pending(), 0)
+
+    def test_jitter(self):
+        self.prefetcher.jitter = 30
+        with mock.patch('random.uniform', return_value=20) as uniform:
+            self.prefetcher.register('foo/Bar')
+            self.now = 1019
+            self.assertEqual(self.prefetcher.run_pending(), 0)
+            self.now = 1020
+            self.assertEqual(self.prefetcher.run_pending(), 1)
+            uniform.assert_called_with(0, 30)
+            self.now = 4640
+            self.assertEqual(self.prefetcher.run_pending(), 0)
+            self.now = 4641
+            self.assertEqual(self.prefetcher.run_pending(), 1)
+
+    def test_api_error(self):
+        self.api.send_request.return_value = (ERROR, None)
+        self.prefetcher.register('foo/Bar')
+        self.prefetcher.run_pending()
+        self.now = 1601
+        self.assertEqual(self.prefetcher.run_pending(), 1)
+
+    def test_failure(self):
+        self.api.send_request.side_effect = IOError
+        self.prefetcher.register('foo/Bar')
+        self.prefetcher.run_pending()
+        self.now = 1299
+        self.assertEqual(self.prefetcher.run_pending(), 0)
+        self.now = 1300
+        self.assertEqual(self.prefetcher.run_pending(), 1)
+
+    def test_min_interval(self):
+        self.api.send_request.return_value = (UNCACHED, None)
+        self.prefetcher.register('foo/Bar')
+        self.prefetcher.run_pending()
+        self.now = 1029
+        self.assertEqual(self.prefetcher.run_pending(), 0)
+        self.now = 1030
+        self.assertEqual(self.prefetcher.run_pending(), 1)
+
+
+class PrefetcherThreadTestCase(unittest.TestCase):
+
+    def test_start_stop(self):
+        api = evelink_api.API(cache=LRUCache())
+        api.send_request = mock.Mock(return_value=(RESPONSE, None))
+        prefetcher = Prefetcher(api, jitter=0)
+        prefetcher.start()
+        self.addCleanup(prefetcher.stop)
+        prefetcher.register('foo/Bar')
+        for _ in range(100):
+            if api.send_request.called:
+                break
+            time.sleep(0.01)
+        self.assertTrue(api.send_request.called)
+        prefetcher.stop()
+        prefetcher._thread.join(1)
+        self.assertFalse(prefetcher._thread.is_alive())
@@ -13,6 +13,12 @@ def make_api_result(xml_path):
         return evelink_api.APIResult(ElementTree.parse(f), 12345, 67890)
 
 
+def make_api_rows(xml_path):
+    """Return the rows of a test response, as API.iter_rows would."""
+    api_result, _, _ = make_api_result(xml_path)
+    return iter(api_result.find('rowset').findall('row'))
+
+
 class APITestCase(unittest.TestCase):
     def setUp(self):
         super(APITestCase, self).setUp()
@@ -20,3 +26,6 @@ class APITestCase(unittest.TestCase):
 
     def make_api_result(self, xml_path):
         return make_api_result(xml_path)
+
+    def make_api_rows(self, xml_path):
+        return make_api_rows(xml_path)